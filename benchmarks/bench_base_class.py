@@ -0,0 +1,56 @@
+"""
+Latency distributions of BaseClass primitives and InventoryPage flows on the static copies of the login, inventory and item pages.
+
+    python -m benchmarks.bench_base_class [--backend {chrome,fake}] [--rounds 50] [--save [PATH]] [--compare BASELINE] [--threshold 10]
+"""
+import sys
+import typing as t
+
+from benchmarks.harness import BenchmarkCase, argument_parser, finish, open_driver, run_cases
+from core.base_class import BaseClass
+from page_classes.Inventory.InventoryItemPage import InventoryItemPage
+from page_classes.Inventory.InventoryPage import InventoryPage
+from resources.pages_locators import base_page, inventory_page
+
+BENCHMARK = "base_class"
+ITEM = "Sauce Labs Backpack"
+
+
+def build_cases(driver: t.Any, base_url: str) -> t.List[BenchmarkCase]:
+    base = BaseClass(driver)  # element cache disabled: every call resolves the element
+    inventory = InventoryPage(driver)
+    item = InventoryItemPage(driver)
+
+    def add_and_remove_item() -> None:
+        inventory.add_item_to_shopping_cart(ITEM)
+        inventory.remove_item_from_shopping_cart(ITEM)
+
+    return [
+        BenchmarkCase("_get_element", lambda: base._get_element(inventory_page.inventory_item_name(ITEM)), page="inventory.html"),
+        BenchmarkCase("click", lambda: base.click(base_page.button_with_id("react-burger-menu-btn"))),
+        BenchmarkCase("get_text", lambda: base.get_text(inventory_page.inventory_item_price(ITEM))),
+        BenchmarkCase("is_visible", lambda: base.is_visible(inventory_page.inventory_list)),
+        BenchmarkCase("validate_element_appear", lambda: base.validate_element_appear(inventory_page.inventory_list, need_assert=True)),
+        BenchmarkCase("validate_element_appear[3 xpaths]", lambda: base.validate_element_appear(inventory_page.inventory_list, inventory_page.shopping_cart, inventory_page.sidemenu_wrap, need_assert=True)),
+        BenchmarkCase("wait_element_disappear", lambda: base.wait_element_disappear(base_page.login_box_error_message)),
+        BenchmarkCase("type_text[keys]", lambda: base.type_text(base_page.input_with_id("user-name"), "standard_user", input_mode="keys"), page="login.html"),
+        BenchmarkCase("type_text[native]", lambda: base.type_text(base_page.input_with_id("user-name"), "standard_user", input_mode="native")),
+        BenchmarkCase("InventoryPage.get_item_details", lambda: inventory.get_item_details(ITEM), page="inventory.html"),
+        BenchmarkCase("InventoryPage.get_items_details", inventory.get_items_details),
+        BenchmarkCase("InventoryPage.check_shopping_cart_counter", lambda: inventory.check_shopping_cart_counter("0")),
+        BenchmarkCase("InventoryPage.select_sidemenu", lambda: inventory.select_sidemenu("All Items")),
+        BenchmarkCase("InventoryPage.add+remove_item", add_and_remove_item, scripts=True),
+        BenchmarkCase("InventoryPage.open_item_page", lambda: inventory.open_item_page(ITEM), setup=lambda: inventory.open(base_url + "inventory.html")),
+        BenchmarkCase("InventoryItemPage.get_item_details", item.get_item_details, page="inventory-item.html?id=0"),
+    ]
+
+
+def main() -> int:
+    args = argument_parser(__doc__).parse_args()
+    with open_driver(args.backend, args.headed, args.latency_ms) as (driver, base_url):
+        results = run_cases(build_cases(driver, base_url), driver, base_url, args.backend, args.rounds, args.warmup)
+    return finish(BENCHMARK, args, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""
+Config lookups of the hot paths: DictConfig of get_config() vs the frozen snapshot of get_frozen_config() (no browser, every round is a batch of lookups).
+
+    python -m benchmarks.bench_config [--rounds 50] [--lookups 10000] [--save [PATH]] [--compare BASELINE] [--threshold 10]
+"""
+import sys
+import typing as t
+
+from benchmarks.harness import BenchmarkCase, argument_parser, finish, run_cases
+from utils.config import Config, get_config, get_frozen_config
+
+BENCHMARK = "config"
+LOOKUPS = {
+    # after_allure_step, after every step
+    "screen_each_step": lambda config: config.get("reporting").get("screen_each_step"),
+    # pytest_runtest_makereport, every phase of every test
+    "testrun_type": lambda config: config.testrun_type.lower(),
+    # is_enabled of the optional features, several per test and step
+    "section enabled": lambda config: (config.get("failure_bundle", None) or {}).get("enabled", False),
+    # interpolated value: "https://${env}.saucedemo.com/"
+    "base_url": lambda config: config.base_url,
+}
+
+
+def batch(lookup: t.Callable[[t.Any], t.Any], get: t.Callable[[], t.Any], lookups: int) -> t.Callable[[], None]:
+    def run() -> None:
+        for _ in range(lookups):
+            lookup(get())
+
+    return run
+
+
+def main() -> int:
+    parser = argument_parser(__doc__, backends=("python",))
+    parser.add_argument("--lookups", type=int, default=10000, help="lookups per round")
+    args = parser.parse_args()
+    Config.freeze()
+
+    cases = []
+    for name, lookup in LOOKUPS.items():
+        cases.append(BenchmarkCase(f"DictConfig {name} x{args.lookups}", batch(lookup, get_config, args.lookups)))
+        cases.append(BenchmarkCase(f"frozen {name} x{args.lookups}", batch(lookup, get_frozen_config, args.lookups)))
+    results = run_cases(cases, None, "", args.backend, args.rounds, args.warmup)
+    return finish(BENCHMARK, args, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
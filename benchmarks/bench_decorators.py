@@ -0,0 +1,80 @@
+"""
+Overhead of the decorated calls: log_exception and allure_step wrappers (no browser, every round is a batch of calls).
+
+    python -m benchmarks.bench_decorators [--rounds 50] [--calls 1000] [--save [PATH]] [--compare BASELINE] [--threshold 10]
+"""
+import logging
+import sys
+import typing as t
+
+import allure
+
+from benchmarks.harness import BenchmarkCase, argument_parser, finish, run_cases, without_step_screenshots
+from core.allure_helper import allure_step
+from core.decorators import log_exception
+
+BENCHMARK = "decorators"
+XPATH = "//div[@data-test='inventory-item']"
+
+
+class Target:
+    logger = logging.getLogger("benchmarks.decorators")
+
+    def plain(self, xpath: str, wait: int = 10) -> str:
+        return xpath
+
+    @log_exception("Failed to get element by xpath: {}. Timeout: {wait}s")
+    def logged(self, xpath: str, wait: int = 10) -> str:
+        return xpath
+
+    @log_exception("Failed to get element by xpath: {}. Timeout: {wait}s")
+    def logged_raising(self, xpath: str, wait: int = 10) -> str:
+        raise ValueError(xpath)
+
+    @allure_step("I get all items details.")
+    def step_static(self, xpath: str, wait: int = 10) -> str:
+        return xpath
+
+    @allure_step("I get item '{xpath}' details in {wait}s.")
+    def step_named(self, xpath: str, wait: int = 10) -> str:
+        return xpath
+
+    @allure_step("I get item {} details.")
+    def step_positional(self, xpath: str, wait: int = 10) -> str:
+        return xpath
+
+    @allure.step("I get item '{xpath}' details in {wait}s.")
+    def stock_step_named(self, xpath: str, wait: int = 10) -> str:
+        return xpath
+
+
+def batch(func: t.Callable[..., t.Any], calls: int) -> t.Callable[[], None]:
+    def run() -> None:
+        for _ in range(calls):
+            try:
+                func(XPATH, wait=5)
+            except ValueError:
+                pass
+
+    return run
+
+
+def main() -> int:
+    parser = argument_parser(__doc__, backends=("python",))
+    parser.add_argument("--calls", type=int, default=1000, help="calls per round")
+    args = parser.parse_args()
+    Target.logger.addHandler(logging.NullHandler())
+    Target.logger.propagate = False
+
+    target = Target()
+    cases = [
+        BenchmarkCase(f"{name} x{args.calls}", batch(getattr(target, name), args.calls))
+        for name in ("plain", "logged", "logged_raising", "step_static", "step_named", "step_positional", "stock_step_named")
+    ]
+    with without_step_screenshots():  # step screenshots need a browser, failures would be logged to stderr
+        results = run_cases(cases, None, "", args.backend, args.rounds, args.warmup)
+    return finish(BENCHMARK, args, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
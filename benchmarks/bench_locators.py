@@ -0,0 +1,50 @@
+"""
+Locator resolution benchmark: raw xpath vs strategy compiled by core.locator, on the static inventory page.
+
+    python -m benchmarks.bench_locators [--backend {chrome,fake}] [--rounds 200] [--save [PATH]] [--compare BASELINE] [--threshold 10]
+"""
+import sys
+import typing as t
+
+from selenium.webdriver.common.by import By
+
+from benchmarks.harness import BenchmarkCase, argument_parser, finish, open_driver, run_cases
+from core.locator import compile_xpath
+from resources.pages_locators import base_page, inventory_item_page, inventory_page
+
+BENCHMARK = "locators"
+XPATHS = [
+    str(locator)
+    for locator in (
+        inventory_page.inventory_list,
+        inventory_page.inventory_items,
+        inventory_page.sidemenu_wrap,
+        inventory_page.shopping_cart,
+        inventory_item_page.inventory_container,
+        inventory_item_page.inventory_container + inventory_page.card_name,
+        base_page.button_with_id("react-burger-menu-btn"),
+        base_page.input_with_id("user-name"),
+        inventory_page.inventory_item_name("Sauce Labs Backpack"),
+        inventory_page.sidemenu_item("Logout"),
+    )
+]
+
+
+def build_cases(driver: t.Any) -> t.List[BenchmarkCase]:
+    cases = [BenchmarkCase(f"compile (uncached) of {len(XPATHS)} xpaths", lambda: [compile_xpath.__wrapped__(xpath) for xpath in XPATHS], page="inventory.html")]
+    for xpath in XPATHS:
+        strategy = compile_xpath(xpath)
+        cases.append(BenchmarkCase(f"raw xpath: {xpath}", lambda xpath=xpath: driver.find_elements(By.XPATH, xpath)))
+        cases.append(BenchmarkCase(f"compiled {strategy[0]}: {xpath}", lambda strategy=strategy: driver.find_elements(*strategy)))
+    return cases
+
+
+def main() -> int:
+    args = argument_parser(__doc__, rounds=200).parse_args()
+    with open_driver(args.backend, args.headed, args.latency_ms) as (driver, base_url):
+        results = run_cases(build_cases(driver), driver, base_url, args.backend, args.rounds, args.warmup)
+    return finish(BENCHMARK, args, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
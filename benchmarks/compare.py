@@ -0,0 +1,27 @@
+"""
+Compare benchmark results with a baseline, exits with code 1 if some case is slower than the threshold allows.
+
+    python -m benchmarks.compare BASELINE.json CURRENT.json [--threshold 10] [--metric p50] [--min-delta-ms 0.05]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks.harness import METRICS, compare_results, load_results, print_comparison
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=10, help="allowed slowdown, percent")
+    parser.add_argument("--metric", choices=METRICS, default="p50")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="slowdowns below it are never regressions (timer noise)")
+    args = parser.parse_args()
+
+    rows = compare_results(load_results(args.baseline), load_results(args.current), args.threshold, args.metric, args.min_delta_ms)
+    return 0 if print_comparison(rows, args.metric) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Shared part of the benchmarks: local server of the static pages, driver backends, latency distributions and JSON baselines.
+"""
+import argparse
+import functools
+import json
+import platform
+import statistics
+import threading
+import time
+import typing as t
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import conftest  # noqa: F401 - core.allure_helper imports conftest, it has to be imported first
+import definitions
+from core.fake_webdriver import FakeWebDriver
+from utils.config import Config, get_config
+
+PAGES_DIR = Path(__file__).resolve().parent / "pages"
+RESULTS_DIR = definitions.log_dir / "benchmarks"
+FAKE_BASE_URL = "http://benchmarks.local/"
+BACKENDS = ("chrome", "fake")
+METRICS = ("min", "mean", "p50", "p90", "p95", "p99", "max")
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args: t.Any) -> None:
+        pass
+
+
+@contextmanager
+def serve_pages(folder: Path = PAGES_DIR) -> t.Iterator[str]:
+    """Serve the folder by http.server on a free local port, yields base url"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=str(folder)))
+    thread = threading.Thread(target=server.serve_forever, name="benchmark-pages", daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def without_step_screenshots() -> t.Iterator[None]:
+    """Disable screen_each_step for the block (screenshots would be taken by the driver of DriverHelper), the config is restored after it"""
+    reporting = get_config().reporting
+    screen_each_step = reporting.screen_each_step
+    reporting.screen_each_step = False
+    Config.freeze()
+    try:
+        yield
+    finally:
+        reporting.screen_each_step = screen_each_step
+        Config.freeze()
+
+
+@contextmanager
+def open_driver(backend: str, headed: bool = False, latency_ms: float = 0) -> t.Iterator[t.Tuple[t.Any, str]]:
+    """
+    Driver of the backend with base url of the static pages
+    :param backend: str - "chrome" (pages served by local http.server) or "fake" (core.fake_webdriver, no browser)
+    :param latency_ms: float - emulated round-trip of every command of the fake driver
+    """
+    # benchmarks measure the helpers themselves
+    with without_step_screenshots():
+        if backend == "fake":
+            driver = FakeWebDriver({"/" + page.name: page for page in PAGES_DIR.glob("*.html")}, latency_ms)
+            try:
+                yield driver, FAKE_BASE_URL
+            finally:
+                driver.quit()
+            return
+        from selenium import webdriver
+
+        options = webdriver.ChromeOptions()
+        if not headed:
+            options.add_argument("--headless=new")
+        with serve_pages() as base_url:
+            driver = webdriver.Chrome(options=options)
+            try:
+                yield driver, base_url
+            finally:
+                driver.quit()
+
+
+def measure(func: t.Callable[[], t.Any], rounds: int, warmup: int = 0, setup: t.Optional[t.Callable[[], t.Any]] = None) -> t.List[float]:
+    """Durations of the calls in ms (setup is called before every call and is not measured)"""
+    durations = []
+    for round_num in range(warmup + rounds):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        if round_num >= warmup:
+            durations.append((time.perf_counter() - started) * 1000)
+    return durations
+
+
+def percentile(sorted_durations: t.Sequence[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted durations"""
+    return sorted_durations[min(len(sorted_durations) - 1, max(0, round(percent / 100 * len(sorted_durations)) - 1))]
+
+
+def distribution(durations: t.Sequence[float]) -> t.Dict[str, float]:
+    durations = sorted(durations)
+    return {
+        "rounds": len(durations),
+        "min": round(durations[0], 4),
+        "mean": round(statistics.fmean(durations), 4),
+        "p50": round(percentile(durations, 50), 4),
+        "p90": round(percentile(durations, 90), 4),
+        "p95": round(percentile(durations, 95), 4),
+        "p99": round(percentile(durations, 99), 4),
+        "max": round(durations[-1], 4),
+        "stdev": round(statistics.stdev(durations), 4) if len(durations) > 1 else 0.0,
+    }
+
+
+@dataclass
+class BenchmarkCase:
+    """
+    :param name: str - unique name of the case in the results
+    :param func: callable - measured call
+    :param page: str - page (relative to the base url) opened once before the rounds
+    :param setup: callable - not measured preparation before every call
+    :param scripts: bool - case relies on the page scripts, which are not executed by the fake driver
+    """
+
+    name: str
+    func: t.Callable[[], t.Any]
+    page: t.Optional[str] = None
+    setup: t.Optional[t.Callable[[], t.Any]] = None
+    scripts: bool = False
+
+
+def run_cases(cases: t.Sequence[BenchmarkCase], driver: t.Any, base_url: str, backend: str, rounds: int, warmup: int) -> t.Dict[str, t.Dict[str, float]]:
+    """Run the cases and print their distributions, returns case name -> distribution"""
+    results = {}
+    width = max(len(case.name) for case in cases) + 2
+    print(f"{'case':<{width}}{'p50, ms':>10}{'p95, ms':>10}{'p99, ms':>10}{'max, ms':>10}")
+    for case in cases:
+        if case.scripts and backend == "fake":
+            print(f"{case.name:<{width}}{'skipped: needs page scripts':>40}")
+            continue
+        if case.page is not None:
+            driver.get(base_url + case.page)
+        results[case.name] = distribution(measure(case.func, rounds, warmup, case.setup))
+        result = results[case.name]
+        print(f"{case.name:<{width}}{result['p50']:>10.3f}{result['p95']:>10.3f}{result['p99']:>10.3f}{result['max']:>10.3f}")
+    return results
+
+
+def save_results(benchmark: str, backend: str, results: t.Dict[str, t.Dict[str, float]], file_path: t.Optional[Path] = None) -> Path:
+    """Write results as JSON baseline (default path: logs/benchmarks/<benchmark>_<backend>.json)"""
+    file_path = Path(file_path or RESULTS_DIR / f"{benchmark}_{backend}.json")
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "benchmark": benchmark,
+        "backend": backend,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    file_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    return file_path
+
+
+def load_results(file_path: Path) -> t.Dict[str, t.Dict[str, float]]:
+    return json.loads(Path(file_path).read_text(encoding="utf-8"))["results"]
+
+
+def compare_results(
+    baseline: t.Dict[str, t.Dict[str, float]],
+    current: t.Dict[str, t.Dict[str, float]],
+    threshold: float = 10,
+    metric: str = "p50",
+    min_delta_ms: float = 0.05,
+) -> t.List[t.Dict[str, t.Any]]:
+    """
+    Compare metric of the cases with the baseline
+    :param threshold: float - allowed slowdown, percent
+    :param min_delta_ms: float - slowdowns below it are noise of the timer, they never count as regressions
+    :return: list of dict - case, baseline, current, change (percent) and status: "ok", "improved", "regression", "new" or "missing"
+    """
+    rows = []
+    for case in [*baseline, *(name for name in current if name not in baseline)]:
+        if case not in current:
+            rows.append({"case": case, "baseline": baseline[case][metric], "current": None, "change": None, "status": "missing"})
+            continue
+        if case not in baseline:
+            rows.append({"case": case, "baseline": None, "current": current[case][metric], "change": None, "status": "new"})
+            continue
+        before, after = baseline[case][metric], current[case][metric]
+        change = (after - before) / before * 100 if before else 0.0
+        if change > threshold and after - before > min_delta_ms:
+            status = "regression"
+        elif change < -threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({"case": case, "baseline": before, "current": after, "change": round(change, 2), "status": status})
+    return rows
+
+
+def print_comparison(rows: t.List[t.Dict[str, t.Any]], metric: str) -> bool:
+    """Print comparison table, returns whether there are no regressions"""
+    width = max([len(row["case"]) for row in rows] + [4]) + 2
+    print(f"{'case':<{width}}{'baseline ' + metric:>16}{'current ' + metric:>16}{'change':>10}  status")
+    for row in rows:
+        before = "-" if row["baseline"] is None else f"{row['baseline']:.3f}"
+        after = "-" if row["current"] is None else f"{row['current']:.3f}"
+        change = "-" if row["change"] is None else f"{row['change']:+.1f}%"
+        print(f"{row['case']:<{width}}{before:>16}{after:>16}{change:>10}  {row['status']}")
+    return not any(row["status"] == "regression" for row in rows)
+
+
+def argument_parser(description: str, rounds: int = 50, warmup: int = 3, backends: t.Sequence[str] = BACKENDS) -> argparse.ArgumentParser:
+    """Common options of the benchmarks"""
+    parser = argparse.ArgumentParser(description=description, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=backends, default=backends[0], help="chrome (headless, pages served locally) or fake (in-process driver, framework overhead only)")
+    parser.add_argument("--rounds", type=int, default=rounds)
+    parser.add_argument("--warmup", type=int, default=warmup, help="not measured rounds before the measured ones")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--latency-ms", type=float, default=0, help="emulated round-trip of every command of the fake driver")
+    parser.add_argument("--save", nargs="?", type=Path, const=True, default=None, help="save results as JSON baseline (default path: logs/benchmarks/<benchmark>_<backend>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="baseline JSON to compare with, exits with code 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=10, help="allowed slowdown of --compare, percent")
+    parser.add_argument("--metric", choices=METRICS, default="p50", help="compared metric")
+    return parser
+
+
+def finish(benchmark: str, args: argparse.Namespace, results: t.Dict[str, t.Dict[str, float]]) -> int:
+    """Save and/or compare results as requested by the common options, returns exit code"""
+    if args.save is not None:
+        file_path = save_results(benchmark, args.backend, results, None if args.save is True else args.save)
+        print(f"results saved: {file_path}")
+    if args.compare is not None:
+        return 0 if print_comparison(compare_results(load_results(args.compare), results, args.threshold, args.metric), args.metric) else 1
+    return 0
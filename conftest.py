@@ -1,5 +1,7 @@
+import json
 import logging
 import os
+import shutil
 import typing as t
 from datetime import datetime
 from pathlib import Path
@@ -9,12 +11,21 @@ import pytest
 
 import definitions
 from core.allure_helper import write_report_env_details, write_report_executor_details
+from core.base_class import BaseClass
+from core.command_profiler import CommandProfiler
 from core.driver_helper import DriverHelper
+from core.failure_bundle import FailureBundle
+from core.network_tracker import NetworkTracker
+from core.screencast import Screencast
+from core.time_accounting import TimeAccounting
 from page_classes import BasePage
 from page_classes.Inventory import InventoryItemPage, InventoryPage
-from utils.common import remove_empty_logs
-from utils.config import Config, get_config
+from utils.allure_index import ResultsIndexWriter
+from utils.common import remove_empty_logs, save_test_artifact
+from utils.config import Config, get_config, get_frozen_config
+from utils.queue_logging import QueueLogging
 from utils.screenshots import take_screenshot
+from utils.step_screenshots import StepScreenshots
 
 
 def pytest_addoption(parser: pytest.Parser) -> None:
@@ -25,7 +36,7 @@ def pytest_addoption(parser: pytest.Parser) -> None:
     # Browser Settings Section
     parser.addoption("--browser", action="store", type=str.lower, default=None, choices=["chrome", "firefox", "edge", "opera", "ie"], help="Browser name to be used during the tests")
     parser.addoption("--is_headless", action="store", type=bool, default=False, help="Should browser executed in headless mode")
-    parser.addoption("--testrun_type", action="store", type=str.lower, default=None, choices=["local", "remote"], help="Testrun type - may be local or remote (usually LambdaTest)")
+    parser.addoption("--testrun_type", action="store", type=str.lower, default=None, choices=["local", "remote", "fake"], help="Testrun type - may be local, remote (usually LambdaTest) or fake (in-process driver over static pages, for benchmarks)")
     # Remote only section
     parser.addoption("--remote_options.platform", action="store", type=str, default=None, help="Remote Selenium Grid (LambdaTest) vm platform (Windows 10, etc.)")
     parser.addoption("--remote_options.browser_version", action="store", type=int, default=None, help="Remote Selenium Grid (LambdaTest) browser version")
@@ -41,10 +52,24 @@ def pytest_addoption(parser: pytest.Parser) -> None:
 def pytest_configure(config: pytest.Config) -> None:
     # Config updates
     Config.update_config_with_cl_args(config)
+    BaseClass.default_input_mode = (get_config().get("input", None) or {}).get("type_text_mode", "keys")
+    TimeAccounting.configure()
+    Screencast.configure()
+    if StepScreenshots.is_enabled():
+        StepScreenshots.check_options()
     # logs work
     definitions.log_dir.mkdir(parents=True, exist_ok=True)  # create if don't have allure dir
-    if get_config().reporting.save_logs_to_file:
+    if QueueLogging.is_enabled():
+        # live, file and report handlers of pytest format records on the test thread, queue replaces them
+        config.pluginmanager.set_blocked("logging-plugin")
+        if not hasattr(config, "workerinput"):
+            shutil.rmtree(definitions.log_dir / "queue_logging", ignore_errors=True)  # workers files of the previous run
+        worker_id = config.workerinput["workerid"] if hasattr(config, "workerinput") else "main"
+        QueueLogging.start(definitions.log_dir / "queue_logging" / f"{worker_id}.log", config.getini("log_file_level") or "INFO", config.getini("log_file_format"), config.getini("log_file_date_format"))
+    elif get_config().reporting.save_logs_to_file:
         config.option.log_file = definitions.log_dir / f"logs_{str(datetime.now().strftime('%Y-%m-%d_%H-%M-%S-%f'))}.log"
+    if TimeAccounting.enabled and not hasattr(config, "workerinput"):
+        shutil.rmtree(definitions.log_dir / "time_accounting", ignore_errors=True)  # workers files of the previous run
     # Allure stuff
     allure_dir = get_config().get("alluredir", None)  # this option could be received through cli args
     if allure_dir:
@@ -52,6 +77,9 @@ def pytest_configure(config: pytest.Config) -> None:
         write_report_env_details(allure_dir)  # and add some details
         if get_config().reporting.add_executor_details:  # it is more complicated stuff, so I decided to put it to the config
             write_report_executor_details(allure_dir)
+        if ResultsIndexWriter.is_enabled():
+            # finished tests are indexed as they are written, report builder reads only the new ones
+            ResultsIndexWriter.start(Path(allure_dir), config.workerinput["workerid"] if hasattr(config, "workerinput") else "main")
     # some cleanup because of strange vscode autorun of pytest_configure in background
     if get_config().testrun_type.lower() == "local":
         remove_empty_logs()
@@ -74,7 +102,7 @@ def pytest_collection_modifyitems(items: t.List[pytest.Item]) -> t.Iterator[None
                 item.add_marker(mark.args[0])
         # simplify access to allure title and modifying it
         # allure creates attrib with this name if case is marked by @allure.title(...)
-        if hasattr(item.function, "__allure_display_name__") and get_config().get("reporting").get("add_ids_to_titles") and hasattr(item, "allure_id") and f"[{item.allure_id}]" not in item.function.__allure_display_name__:
+        if hasattr(item.function, "__allure_display_name__") and get_frozen_config().get("reporting").get("add_ids_to_titles") and hasattr(item, "allure_id") and f"[{item.allure_id}]" not in item.function.__allure_display_name__:
             item.function.__allure_display_name__ = f"[{item.allure_id}] " + item.function.__allure_display_name__
             item.allure_title = item.function.__allure_display_name__
     yield
@@ -93,18 +121,44 @@ def driver(request: pytest.FixtureRequest) -> t.Iterator[DriverHelper]:
 
     logger.info("Started test: %s", test_title)
     driver = DriverHelper.get_driver(test_title)
+    lean_profile_marker = current_item.get_closest_marker("lean_profile")
+    DriverHelper.apply_lean_profile(driver, **(lean_profile_marker.kwargs if lean_profile_marker else {}))
+    network_tracker = NetworkTracker.get(driver)
+    if network_tracker:
+        network_tracker.reset_stats()  # session may be reused from the previous test
+    command_profiler = CommandProfiler.get(driver)
+    if command_profiler:
+        command_profiler.reset()
+    Screencast.start_test(driver)
     yield driver
-    DriverHelper.close_driver()
+    # reports are stored to the item by pytest_runtest_makereport
+    test_failed = any(report.failed for report in getattr(current_item, "reports", {}).values())
+    DriverHelper.close_driver(failed=test_failed)
 
 
 @pytest.fixture(autouse=True)
-def pages_init(request: pytest.FixtureRequest, driver: DriverHelper) -> None:
+def pages_init(request: pytest.FixtureRequest, driver: DriverHelper) -> t.Iterator[None]:
     """pages initialization for tests.
     'requests.cls.' will be equal to 'self.' in the tests methods.
     """
     request.cls.base_page = BasePage.BasePage(driver)
     request.cls.inventory = InventoryPage.InventoryPage(driver)
     request.cls.inventory.item = InventoryItemPage.InventoryItemPage(driver)
+    yield
+    logger = logging.getLogger(__name__)
+    for page in (request.cls.base_page, request.cls.inventory, request.cls.inventory.item):
+        if page.element_cache is not None:
+            logger.info("Element cache of %s: %s", page.__class__.__name__, page.element_cache.stats())
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item: pytest.Item) -> t.Iterator[None]:
+    if not TimeAccounting.enabled:
+        yield
+        return
+    TimeAccounting.start_test()
+    yield
+    TimeAccounting.finish_test(item.nodeid)
 
 
 def before_allure_step() -> None:
@@ -112,8 +166,12 @@ def before_allure_step() -> None:
 
 
 def after_allure_step() -> None:
-    if get_config().get("reporting").get("screen_each_step"):
-        allure.attach(DriverHelper.get_driver().get_screenshot_as_png(), "step screenshot", allure.attachment_type.PNG)
+    if get_frozen_config().get("reporting").get("screen_each_step"):
+        with TimeAccounting.measure("screenshots"):
+            if StepScreenshots.is_enabled():
+                StepScreenshots.capture(DriverHelper.get_driver())  # processed and attached in background
+            else:
+                allure.attach(DriverHelper.get_driver().get_screenshot_as_png(), "step screenshot", allure.attachment_type.PNG)
 
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
@@ -122,17 +180,51 @@ def pytest_runtest_makereport(item: pytest.Item, call: pytest.CallInfo) -> t.Gen
 
     outcome = yield
     result = outcome.get_result()
+    if not hasattr(item, "reports"):
+        item.reports = {}
+    item.reports[result.when] = result
+    if StepScreenshots.is_enabled():
+        # step screenshots of the phase have to be attached before allure writes the test result
+        step_screenshot_stats = StepScreenshots.drain()
+        if step_screenshot_stats:
+            logger.info("Step screenshots (%s): %s", result.when, step_screenshot_stats)
     # if result.when == 'setup':
-    if result.when == "call":  # ? after test finished
+    if result.when == "call" and item.funcargs.get("driver") is not None:  # ? after test finished (unit tests have no browser)
         driver = DriverHelper.get_driver()
         if result.failed:
-            screen = take_screenshot(driver, f"{item.nodeid}_FAILED")
-            if screen is not None:
-                allure.attach.file(screen, "_Fail Screenshot_", allure.attachment_type.PNG)
+            if FailureBundle.is_enabled():
+                with TimeAccounting.measure("screenshots"):
+                    artifacts = FailureBundle.collect(driver)
+                    if artifacts.get("screenshot") is not None:
+                        allure.attach(artifacts["screenshot"], "_Fail Screenshot_", allure.attachment_type.PNG)
+                    bundle = FailureBundle.save(item.nodeid, artifacts)
+                    if bundle is not None:
+                        allure.attach.file(bundle, "failure bundle", extension="zip")
+            else:
+                screen = take_screenshot(driver, f"{item.nodeid}_FAILED")
+                if screen is not None:
+                    allure.attach.file(screen, "_Fail Screenshot_", allure.attachment_type.PNG)
+            screencast = Screencast.get(driver)
+            filmstrip = screencast.filmstrip(item.nodeid) if screencast else None
+            if filmstrip:
+                allure.attach(filmstrip, "screencast filmstrip", allure.attachment_type.HTML)
+                save_test_artifact(item.nodeid, "screencast", "html", filmstrip)
             logger.info("Test failed: %s", item.name)
         else:
             logger.info("Test successful: %s", item.name)
-        if get_config().testrun_type.lower() == "remote":
+        network_tracker = NetworkTracker.get(driver)
+        if network_tracker:
+            network_stats = network_tracker.stats()
+            logger.info("Network: %s requests (%s failed), %s bytes", network_stats["requests"], network_stats["failed"], network_stats["bytes"])
+            allure.attach(json.dumps(network_stats, indent=2), "network stats", allure.attachment_type.JSON)
+        command_profiler = CommandProfiler.get(driver)
+        if command_profiler:
+            command_stats = command_profiler.stats()
+            logger.info("WebDriver commands: %s (%s failed), %s ms", command_stats["commands"], command_stats["failed"], command_stats["total_ms"])
+            command_stats_json = json.dumps(command_stats, indent=2)
+            allure.attach(command_stats_json, "webdriver command stats", allure.attachment_type.JSON)
+            save_test_artifact(item.nodeid, "commands", "json", command_stats_json)
+        if get_frozen_config().testrun_type.lower() == "remote":
             # set status to lambdatest test-session
             if result.failed:
                 driver.execute_script("lambda-status=failed")
@@ -141,5 +233,32 @@ def pytest_runtest_makereport(item: pytest.Item, call: pytest.CallInfo) -> t.Gen
     # if result.when == 'teardown':
 
 
-# def pytest_unconfigure():
-#   pass
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    if TimeAccounting.enabled:
+        worker_id = session.config.workerinput["workerid"] if hasattr(session.config, "workerinput") else "main"
+        TimeAccounting.save(definitions.log_dir / "time_accounting" / f"{worker_id}.json")
+
+
+def pytest_terminal_summary(terminalreporter: pytest.TerminalReporter, config: pytest.Config) -> None:
+    if not TimeAccounting.enabled or hasattr(config, "workerinput"):
+        return
+    # xdist controller merges files of all workers
+    summary = TimeAccounting.merge(definitions.log_dir / "time_accounting")
+    (definitions.log_dir / "time_accounting.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    terminalreporter.write_sep("=", f"time accounting: {summary['total']:.2f}s in {len(summary['tests'])} tests")
+    for bucket, seconds in summary["buckets"].items():
+        terminalreporter.write_line(f"{bucket:<16}{seconds:>10.2f}s{seconds / (summary['total'] or 1):>8.1%}")
+    terminalreporter.write_line(f"details: {definitions.log_dir / 'time_accounting.json'}")
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    # pooled sessions outlive the tests, so they are closed together with the worker
+    DriverHelper.shutdown()
+    StepScreenshots.shutdown()
+    FailureBundle.shutdown()
+    ResultsIndexWriter.stop()
+    if QueueLogging.is_enabled():
+        QueueLogging.stop()
+        # xdist controller is unconfigured after the workers exit, their files are complete
+        if not hasattr(config, "workerinput") and get_config().reporting.save_logs_to_file:
+            QueueLogging.merge(definitions.log_dir / "queue_logging", definitions.log_dir / f"logs_{str(datetime.now().strftime('%Y-%m-%d_%H-%M-%S-%f'))}.log")
@@ -7,8 +7,11 @@ from pathlib import Path
 from allure_commons._allure import StepContext
 
 import conftest
+from core.command_profiler import CommandProfiler
+from core.screencast import Screencast
+from core.time_accounting import TimeAccounting
 from utils.config import get_config
-from utils.func_args_helper import func_parameters, represent
+from utils.func_args_helper import LazyParameters, TitleTemplate, signature
 
 T = t.TypeVar("T")
 logger_prefix = "\n" * 2 + " " * 4  # for beautifying  output we decided to use such a prefix
@@ -26,36 +29,48 @@ class CustomStepContext(StepContext):
     logger = logging.getLogger(__name__)
 
     def __enter__(self) -> None:
-        self.logger.info(logger_prefix + "Step Started: " + self.title + "\n")
+        self.logger.info("%sStep Started: %s\n", logger_prefix, self.title)
         super().__enter__()
+        CommandProfiler.step_started(self.title)
+        Screencast.step_started(self.title)
         conftest.before_allure_step()
 
     def __exit__(self, exc_type: t.Optional[t.Type[BaseException]], exc_val: t.Optional[BaseException], exc_tb: t.Optional[BaseException]) -> None:
         if exc_type is not None:
-            self.logger.exception(logger_prefix + "Step FAILED: " + self.title + "\n")
+            self.logger.exception("%sStep FAILED: %s\n", logger_prefix, self.title)
         conftest.after_allure_step()
+        CommandProfiler.step_finished()
+        Screencast.step_finished()
         super().__exit__(exc_type, exc_val, exc_tb)
-        self.logger.info(logger_prefix + "Step Finished: " + self.title + "\n")
+        self.logger.info("%sStep Finished: %s\n", logger_prefix, self.title)
 
     def __call__(self, func: t.Callable) -> t.Callable:
+        # signature and title fields are parsed once, parameters are bound and represented only when needed
+        func_signature = signature(func)
+        title_template = TitleTemplate(self.title)
+        logger = logging.getLogger(func.__qualname__)  # getting class_name + function_name
+
         @wraps(func)
+        @TimeAccounting.timed("framework")
         def impl(*args: t.Tuple, **kwargs: t.Dict) -> T:
-            logger = logging.getLogger(func.__qualname__)  # getting class_name + function_name
-
-            f_args = [represent(x) for x in args]
-            f_params = func_parameters(func, *args, **kwargs)
-            parametrized_title = self.title.format(*f_args, **f_params)
-            with StepContext(parametrized_title, {key: represent(value) for key, value in f_params.items()}):
-                conftest.before_allure_step()
-                logger.info(logger_prefix + "Step Started: " + parametrized_title + "\n")
+            parametrized_title = title_template.format(func_signature, args, kwargs)
+            with StepContext(parametrized_title, LazyParameters(func_signature, args, kwargs)):
+                CommandProfiler.step_started(parametrized_title)
+                Screencast.step_started(parametrized_title)
                 try:
-                    step_result = func(*args, **kwargs)
-                    logger.info(logger_prefix + "Step Finished: " + parametrized_title + "\n")
-                except Exception:
-                    logger.exception(logger_prefix + "Step FAILED: " + parametrized_title + "\n")
-                    raise
-                conftest.after_allure_step()
-                return step_result
+                    conftest.before_allure_step()
+                    logger.info("%sStep Started: %s\n", logger_prefix, parametrized_title)
+                    try:
+                        step_result = func(*args, **kwargs)
+                        logger.info("%sStep Finished: %s\n", logger_prefix, parametrized_title)
+                    except Exception:
+                        logger.exception("%sStep FAILED: %s\n", logger_prefix, parametrized_title)
+                        raise
+                    conftest.after_allure_step()
+                    return step_result
+                finally:
+                    CommandProfiler.step_finished()
+                    Screencast.step_finished()
 
         return impl
 
@@ -0,0 +1,100 @@
+import logging
+import time
+import typing as t
+import weakref
+from dataclasses import dataclass, field
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from utils.config import get_frozen_config
+
+GET_STORAGE_SCRIPT = """
+const dump = (storage) => Object.fromEntries(Object.keys(storage).map((key) => [key, storage.getItem(key)]));
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+SET_STORAGE_SCRIPT = """
+for (const [key, value] of Object.entries(arguments[0])) window.localStorage.setItem(key, value);
+for (const [key, value] of Object.entries(arguments[1])) window.sessionStorage.setItem(key, value);
+"""
+
+
+@dataclass
+class AuthState:
+    cookies: t.List[t.Dict[str, t.Any]]
+    local_storage: t.Dict[str, str] = field(default_factory=dict)
+    session_storage: t.Dict[str, str] = field(default_factory=dict)
+    expires_at: float = 0
+
+    @property
+    def expired(self) -> bool:
+        return time.time() > self.expires_at
+
+
+class AuthCache:
+    """
+    Authenticated browser state (cookies + web storage) of test users.
+    Lives in the worker process, so every user logs in through the UI once per xdist worker.
+    """
+
+    logger = logging.getLogger(__name__)
+    _states: t.Dict[str, AuthState] = {}
+    # user whose cached state is in the browser session, logout of the session invalidates it
+    _session_users: "weakref.WeakKeyDictionary[WebDriver, str]" = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return bool((get_frozen_config().get("auth_cache", None) or {}).get("enabled", False))
+
+    @staticmethod
+    def get_ttl() -> int:
+        return int((get_frozen_config().get("auth_cache", None) or {}).get("ttl", 0) or 0)
+
+    @classmethod
+    def get(cls, user_name: str) -> t.Optional[AuthState]:
+        state = cls._states.get(user_name)
+        if state is not None and state.expired:
+            cls.invalidate(user_name)
+            return None
+        return state
+
+    @classmethod
+    def capture(cls, user_name: str, driver: WebDriver) -> AuthState:
+        """Store authenticated state of the current page origin"""
+        cookies = driver.get_cookies()
+        storage = driver.execute_script(GET_STORAGE_SCRIPT)
+        expires_at = time.time() + cls.get_ttl()
+        # state can't outlive the cookies it consists of
+        cookies_expiry = [cookie["expiry"] for cookie in cookies if "expiry" in cookie]
+        if cookies_expiry:
+            expires_at = min(expires_at, *cookies_expiry)
+        cls._states[user_name] = AuthState(cookies, storage["local"], storage["session"], expires_at)
+        cls._session_users[driver] = user_name
+        cls.logger.info("Cached authenticated state of user: %s", user_name)
+        return cls._states[user_name]
+
+    @classmethod
+    def restore(cls, user_name: str, driver: WebDriver) -> bool:
+        """Inject cached state of the user into the current page origin.
+        :return: bool - False if there is no valid state for the user
+        """
+        state = cls.get(user_name)
+        if state is None:
+            return False
+        for cookie in state.cookies:
+            driver.add_cookie(cookie)
+        driver.execute_script(SET_STORAGE_SCRIPT, state.local_storage, state.session_storage)
+        cls._session_users[driver] = user_name
+        cls.logger.info("Restored authenticated state of user: %s", user_name)
+        return True
+
+    @classmethod
+    def invalidate(cls, user_name: str) -> None:
+        if cls._states.pop(user_name, None) is not None:
+            cls.logger.info("Invalidated authenticated state of user: %s", user_name)
+
+    @classmethod
+    def logout(cls, driver: WebDriver) -> None:
+        """Cached cookies of the user logged out in the session are not valid anymore (server side session is over)"""
+        user_name = cls._session_users.pop(driver, None)
+        if user_name is not None:
+            cls.invalidate(user_name)
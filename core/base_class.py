@@ -3,20 +3,32 @@ import platform
 import re
 import time
 import typing as t
+import warnings
+import weakref
 from contextlib import suppress
 
 from selenium.common.exceptions import *
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as ec
-from selenium.webdriver.support.ui import WebDriverWait
 
-from core.decorators import log_exception
-from definitions import long_timeout, short_timeout
+from core import js_scripts
+from core.decorators import log_exception, retry_on_stale
+from core.element_cache import ElementCache
+from core.locator import Locator, LocatorType, compile_relative_xpath, to_selenium_locator
+from core.network_tracker import NetworkTracker
+from core.time_accounting import TimeAccounting, TimedWebDriverWait
+from definitions import long_timeout, polling_timeout, script_wait_timeout, settle_quiet_time, settle_timeout, short_timeout
 from utils.common import timeout
 
+# conditions which may be checked on the cached element: locator condition -> state of js_scripts.CHECK_CACHED_ELEMENT
+CACHED_ELEMENT_CONDITIONS = {
+    ec.presence_of_element_located: "present",
+    ec.visibility_of_element_located: "visible",
+    ec.element_to_be_clickable: "clickable",
+}
+
 
 class BaseClass:
     """
@@ -25,17 +37,32 @@ class BaseClass:
     All pages will be inherited from this class.
     """
 
+    # opt-in cache of resolved elements (xpath -> WebElement) for pages which interact with the same controls repeatedly
+    element_cache_enabled = False
+    # default strategy of type_text: "keys", "native" or "cdp"
+    default_input_mode = "keys"
+    # sessions which add the page tracker to every new document, it is registered by the first settle wait of the session
+    _new_document_trackers: "weakref.WeakSet[t.Any]" = weakref.WeakSet()
+
     def __init__(self, driver: t.no_type_check) -> None:
         """
         :param browser: selenium.webdriver.*
         """
         self.driver = driver
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.element_cache = ElementCache() if self.element_cache_enabled else None
 
     @staticmethod
+    @TimeAccounting.timed("sleep")
     def sleep(s: t.Union[float, int]) -> None:
         time.sleep(s)
 
+    @staticmethod
+    @TimeAccounting.timed("polling")
+    def _polling_pause(s: t.Union[float, int]) -> None:
+        """Pause between checks of the waits (accounted separately from explicit sleeps)"""
+        time.sleep(s)
+
     @log_exception("Failed open URL: {}")
     def open(self, url: str, confidential: bool = False) -> None:
         """
@@ -44,35 +71,94 @@ class BaseClass:
         :param confidential: bool - whether log url part with possible credentials https://<login>:<pass>@url  ->  https://***url
         """
         self.driver.get(url)
+        self.invalidate_element_cache()
         self.logger.info("Opened URL: %s", re.sub(r"://(.+@)", "://***", url) if confidential else url)
 
     @log_exception("Failed to get element by xpath: {}. Timeout: {wait}s")
-    def _get_element(self, element: t.Union[str, WebElement], ec: ec = ec.presence_of_element_located, wait: int = short_timeout) -> WebElement:
+    def _get_element(self, element: t.Union[LocatorType, WebElement], ec: ec = ec.presence_of_element_located, wait: int = short_timeout) -> WebElement:
         """Function for getting WebElement from given xpath.
 
         Args:
-            element (Union[str, WebElement]): web element xpath or can be selenium.webdriver.remote.webelement.WebElement
+            element (Union[str, Locator, WebElement]): web element xpath, Locator or can be selenium.webdriver.remote.webelement.WebElement
             ec (ec, optional): selenium expected condition. Defaults to ec.presence_of_element_located.
             wait (int, optional): element max wait time. Defaults to short_timeout.
 
         Returns:
             WebElement: single webelement
         """
-        if isinstance(element, str):
-            self.logger.debug("Trying to find element by locator: %s", element)
-
-            wait = WebDriverWait(self.driver, wait)
-            element = wait.until(
-                ec((By.XPATH, element)),
-                message=f"Failed to get element by xpath: {element}",
-            )
+        if isinstance(element, (str, Locator)):
+            xpath = str(element)
+            cached_element = self.element_cache.get(xpath) if self.element_cache is not None else None
+            if cached_element is not None and ec in CACHED_ELEMENT_CONDITIONS:
+                try:
+                    if self._check_cached_element(cached_element, xpath, ec):
+                        return cached_element
+                    self.element_cache.invalidate(xpath, mismatch=True)
+                except StaleElementReferenceException:
+                    self.element_cache.invalidate(xpath, stale=True)
+
+            self.logger.debug("Trying to find element by locator: %s", xpath)
+
+            parent_xpath, parent_element, relative_path = self._get_cached_parent(element) if self.element_cache is not None and isinstance(element, Locator) else (None, None, None)
+            if parent_element is not None:
+                try:
+                    # search only inside already resolved parent instead of the whole document
+                    element = TimedWebDriverWait(parent_element, wait).until(
+                        ec(compile_relative_xpath(relative_path)),
+                        message=f"Failed to get element by xpath: {xpath}",
+                    )
+                except StaleElementReferenceException:
+                    self.element_cache.invalidate(parent_xpath, stale=True)
+                    parent_element = None
+            if parent_element is None:
+                element = TimedWebDriverWait(self.driver, wait).until(
+                    ec(to_selenium_locator(element)),
+                    message=f"Failed to get element by xpath: {xpath}",
+                )
+            if self.element_cache is not None and ec in CACHED_ELEMENT_CONDITIONS:
+                self.element_cache.put(xpath, element)
 
             self.logger.info("Got element with locator: %s", element)
 
         return element
 
+    def _get_cached_parent(self, locator: Locator) -> t.Tuple[t.Optional[str], t.Optional[WebElement], str]:
+        """
+        Nearest parent of the locator which is resolved in element cache and is the only match of its xpath:
+        (parent xpath, parent element, locator path relative to it).
+        Parent with several matches is skipped, the locator may be inside any of them, not only inside the cached first one.
+        """
+        path, parent = locator.path, locator.parent
+        while parent is not None:
+            parent_element = self.element_cache.peek(parent.xpath)
+            if parent_element is not None and self._is_unique_parent(parent):
+                self.element_cache.scoped += 1
+                return parent.xpath, parent_element, path
+            path, parent = parent.path + path, parent.parent
+        return None, None, path
+
+    def _is_unique_parent(self, parent: Locator) -> bool:
+        """Whether the parent locator has single match (checked once while the parent is cached)"""
+        unique = self.element_cache.is_unique(parent.xpath)
+        if unique is None:
+            unique = len(self.driver.find_elements(*parent.strategy)) == 1
+            self.element_cache.set_unique(parent.xpath, unique)
+        return unique
+
+    def _check_cached_element(self, element: WebElement, xpath: str, ec: ec) -> bool:
+        """
+        Whether the cached element is still the element of the xpath (pages reuse nodes for other content) and meets the condition,
+        checked in one round-trip. Element which doesn't is searched and waited for as usual.
+        """
+        self.logger.debug("Checking cached element: %s", element)
+        return bool(self.driver.execute_script(js_scripts.CHECK_CACHED_ELEMENT, element, xpath, CACHED_ELEMENT_CONDITIONS[ec]))
+
+    def invalidate_element_cache(self) -> None:
+        if self.element_cache is not None:
+            self.element_cache.invalidate()
+
     @log_exception("Failed to get elements by xpath: {}. Timeout: {wait}s")
-    def get_elements(self, xpath: str, wait: int = short_timeout) -> t.List[WebElement]:
+    def get_elements(self, xpath: LocatorType, wait: int = short_timeout) -> t.List[WebElement]:
         """Function for getting multiple elements by xpath.
 
         Args:
@@ -83,23 +169,25 @@ class BaseClass:
             List[WebElement]: list of selenium WebElements
         """
         self.logger.debug("Trying to find elements by locator: %s", xpath)
-        return WebDriverWait(self.driver, wait).until(
-            ec.presence_of_all_elements_located((By.XPATH, xpath)),
+        return TimedWebDriverWait(self.driver, wait).until(
+            ec.presence_of_all_elements_located(to_selenium_locator(xpath)),
             message=f"Failed to get elements by xpath: {xpath}",
         )
 
-    def _get_attribute(self, attribute: str, element: t.Union[str, WebElement], ec: ec = ec.presence_of_element_located, wait: int = short_timeout) -> str:
+    @retry_on_stale
+    def _get_attribute(self, attribute: str, element: t.Union[LocatorType, WebElement], ec: ec = ec.presence_of_element_located, wait: int = short_timeout) -> str:
         return self._get_element(element=element, ec=ec, wait=wait).get_attribute(attribute)
 
     @log_exception("Failed to count elements by xpath: {}. Timeout: {wait}s")
-    def get_elements_count(self, xpath: str, wait: int = short_timeout) -> int:
+    def get_elements_count(self, xpath: LocatorType, wait: int = short_timeout) -> int:
         try:
             return len(self.get_elements(xpath, wait))
         except TimeoutException:
             return 0
 
     @log_exception("Failed to execute script: {script}")
-    def execute_script(self, element: t.Union[str, WebElement], script: str) -> str:
+    @retry_on_stale
+    def execute_script(self, element: t.Union[LocatorType, WebElement], script: str) -> str:
         """
         Execute JavaScript on the web element
         :param element: selenium.webdriver.remote.webelement.WebElement
@@ -108,7 +196,51 @@ class BaseClass:
         """
         return self.driver.execute_script(f"return arguments[0].{script}", self._get_element(element))
 
-    def scroll_to_element(self, element: t.Union[str, WebElement]) -> None:
+    @log_exception("Failed to get values of elements: {}. Timeout: {wait}s")
+    def get_values(self, fields: t.Dict[str, t.Tuple[str, str]], wait: int = short_timeout) -> t.Dict[str, str]:
+        """
+        Read text and attributes of several elements in one round-trip.
+        :param fields: dict - field name -> (web element xpath, "text" or attribute name)
+        :param wait: int - wait time for all elements presence (and visibility of the text ones, as get_text does)
+        :return: dict - field name -> value
+        """
+        script_fields = {name: [str(xpath), attribute] for name, (xpath, attribute) in fields.items()}
+        with timeout(wait) as t:
+            while True:
+                result = self.driver.execute_script(js_scripts.GET_ELEMENTS_VALUES, script_fields, None)
+                if not result["missing"] and not result["hidden"]:
+                    self.logger.info("Got values of elements: %s", list(fields))
+                    return result["values"]
+                if t.expired:
+                    if result["missing"]:
+                        raise TimeoutException(f"Failed to get elements by xpath: {[fields[name][0] for name in result['missing']]}")
+                    raise TimeoutException(f"Elements are not visible, xpath: {[fields[name][0] for name in result['hidden']]}")
+                self._polling_pause(polling_timeout)
+
+    @log_exception("Failed to get values of elements: {}. Timeout: {wait}s")
+    def get_values_list(self, xpath: LocatorType, fields: t.Dict[str, t.Tuple[str, str]], wait: int = short_timeout) -> t.List[t.Dict[str, t.Optional[str]]]:
+        """
+        Read text and attributes of a repeated structure (every element found by xpath) in one round-trip.
+        :param xpath: LocatorType - xpath of the repeated element (list item, card, table row)
+        :param fields: dict - field name -> (xpath relative to the repeated element, "text" or attribute name)
+        :param wait: int - wait time for the first repeated element and visibility of the text fields
+        :return: list of dicts - field name -> value (None if there is no such element inside)
+        """
+        script_fields = {name: [str(field_xpath), attribute] for name, (field_xpath, attribute) in fields.items()}
+        result = self.driver.execute_script(js_scripts.GET_ELEMENTS_VALUES, script_fields, str(xpath))
+        if not result and self.wait_element_appear(xpath, wait):
+            result = self.driver.execute_script(js_scripts.GET_ELEMENTS_VALUES, script_fields, str(xpath))
+        with timeout(wait) as t:
+            while any(item["hidden"] for item in result):
+                if t.expired:
+                    raise TimeoutException(f"Elements are not visible, xpath: {[fields[name][0] for name in {name for item in result for name in item['hidden']}]}")
+                self._polling_pause(polling_timeout)
+                result = self.driver.execute_script(js_scripts.GET_ELEMENTS_VALUES, script_fields, str(xpath))
+        self.logger.info("Got values of %s elements with xpath: %s", len(result), xpath)
+        return [item["values"] for item in result]
+
+    @retry_on_stale
+    def scroll_to_element(self, element: t.Union[LocatorType, WebElement]) -> None:
         """
         Function for scroll to element.
         :param element: str - web element xpath or can be selenium.webdriver.remote.webelement.WebElement
@@ -116,10 +248,11 @@ class BaseClass:
         self.execute_script(self._get_element(element), "scrollIntoView(true);")
 
     @log_exception("Failed to click web element with xpath: {}")
-    def click(self, xpath: str, wait: int = short_timeout, scroll: bool = True) -> None:
+    @retry_on_stale
+    def click(self, xpath: LocatorType, wait: int = short_timeout, scroll: bool = True) -> None:
         """
         Click web element with given xpath
-        :param xpath: str - web element xpath
+        :param xpath: LocatorType - web element xpath
         :param wait: int - wait time for object
         """
         self.logger.debug("Clicking web element with xpath: %s", xpath)
@@ -129,10 +262,10 @@ class BaseClass:
         self.logger.info("Clicked web element with xpath: %s", xpath)
 
     @log_exception("Failed presence check of web element with xpath: {}. Timeout: {wait}s")
-    def is_present(self, xpath: str, expected: bool = True, wait: int = short_timeout) -> bool:
+    def is_present(self, xpath: LocatorType, expected: bool = True, wait: int = short_timeout) -> bool:
         """
         Presence check of web element on the UI.
-        :param xpath: str - web element xpath
+        :param xpath: LocatorType - web element xpath
         :param wait: int - wait time for object
         :param expected: boolean - expected to find it
         :return: boolean - element presence
@@ -148,10 +281,10 @@ class BaseClass:
         return found
 
     @log_exception("Failed visible check of web element with xpath: {}. Timeout: {wait}s")
-    def is_visible(self, xpath: str, wait: int = short_timeout) -> bool:
+    def is_visible(self, xpath: LocatorType, wait: int = short_timeout) -> bool:
         """
         Visibility check of web element on the UI.
-        :param xpath: str - web element xpath
+        :param xpath: LocatorType - web element xpath
         :param wait: int - wait time for object
         :return: boolean - element visibility
         """
@@ -163,10 +296,11 @@ class BaseClass:
         return result
 
     @log_exception("Failed to mouse over web element with xpath: {}")
-    def mouse_over(self, xpath: str, wait: int = short_timeout) -> None:
+    @retry_on_stale
+    def mouse_over(self, xpath: LocatorType, wait: int = short_timeout) -> None:
         """
         Simulate mouse cursor over given web element.
-        :param xpath: str - web element xpath
+        :param xpath: LocatorType - web element xpath
         :param wait: int - wait time for object
         """
         actions = ActionChains(self.driver)
@@ -176,14 +310,14 @@ class BaseClass:
     @log_exception("Failed to mouse over web element with xpath: {}")
     def mouse_over_with_offset(
         self,
-        xpath: str,
+        xpath: LocatorType,
         xoffset: t.Union[int, str],
         yoffset: t.Union[int, str],
         wait: int = short_timeout,
     ) -> None:
         """
         Simulate mouse cursor over given web element.
-        :param xpath: str - web element xpath
+        :param xpath: LocatorType - web element xpath
         :param wait: int - wait time for object
         """
         actions = ActionChains(self.driver)
@@ -209,12 +343,12 @@ class BaseClass:
     ) -> None:
         """
         Simulate drag mouse from x1 y1 to x2 y2.
-        :param xpath: str - web element xpath
+        :param xpath: LocatorType - web element xpath
         """
         actions = ActionChains(self.driver)
         actions.move_by_offset(x1, y1).click_and_hold()
         actions.move_by_offset(x2 - x1, y2 - y1).release().perform()
-        self.logger.info(f"Mouse drag for: %s, %s", x2 - x1, y2 - y1)
+        self.logger.info("Mouse drag for: %s, %s", x2 - x1, y2 - y1)
 
     @log_exception("Failed open new tab: {}. Timeout: {wait}s")
     def open_new_tab(self, wait: int = short_timeout) -> None:
@@ -222,11 +356,12 @@ class BaseClass:
         Open new tab in browser
         """
         win_handles_before = self.driver.window_handles
-        self.driver.execute_script("window.open('');")
+        self.driver.execute_script(js_scripts.OPEN_NEW_WINDOW)
         win_handles_after = self.driver.window_handles
-        WebDriverWait(self.driver, wait).until(ec.number_of_windows_to_be(len(win_handles_before) + 1))
+        TimedWebDriverWait(self.driver, wait).until(ec.number_of_windows_to_be(len(win_handles_before) + 1))
         new_window = [x for x in win_handles_after if x not in win_handles_before][0]
-        self.driver.switch_to_window(new_window)
+        self.driver.switch_to.window(new_window)
+        self.invalidate_element_cache()
 
     @log_exception("Failed to switch tab: {}. Timeout: {wait}s")
     def switch_to_tab_with_num(self, tab_num: int, wait: int = long_timeout) -> None:
@@ -235,16 +370,18 @@ class BaseClass:
         """
         with timeout(wait) as t:
             while not dict(enumerate(self.driver.window_handles)).get(tab_num, False):
-                self.sleep(1)
+                self._polling_pause(1)
                 if t.expired:
                     raise AssertionError(f"Browser tab with num {tab_num} was not appeared. Timeout: {wait}s")
-            self.driver.switch_to_window(self.driver.window_handles[tab_num])
+            self.driver.switch_to.window(self.driver.window_handles[tab_num])
+            self.invalidate_element_cache()
 
     @log_exception("Cannot get text located: {}. Timeout: {wait}s")
-    def get_text(self, xpath: t.Union[str, WebElement], wait: int = short_timeout) -> str:
+    @retry_on_stale
+    def get_text(self, xpath: t.Union[LocatorType, WebElement], wait: int = short_timeout) -> str:
         """
         Get text of the web element
-        :param xpath: str - web element xpath
+        :param xpath: LocatorType - web element xpath
         :param wait: int - wait time for object
         """
         self.logger.info("Trying to get text from field with xpath: %s", xpath)
@@ -252,7 +389,7 @@ class BaseClass:
         self.logger.info('Got text "%s" from field with xpath: %s', result, xpath)
         return result
 
-    def clear_input_field(self, element: t.Union[str, WebElement], wait: str = short_timeout) -> None:
+    def clear_input_field(self, element: t.Union[LocatorType, WebElement], wait: str = short_timeout) -> None:
         input_field = self._get_element(element, ec.visibility_of_element_located, wait=wait)
         if platform.system() == "Darwin":  # mac os
             input_field.clear()
@@ -261,24 +398,35 @@ class BaseClass:
             input_field.send_keys(Keys.CONTROL, "a", Keys.DELETE)
 
     @log_exception("Failed to type text into web element with xpath: {}. Timeout: {wait}s")
+    @retry_on_stale
     def type_text(
         self,
-        xpath: str,
+        xpath: LocatorType,
         text: str,
         wait: str = short_timeout,
         scroll: bool = False,
         confidential: bool = False,
+        input_mode: t.Optional[str] = None,
     ) -> None:
         """
         Type text into input field with given xpath
-        :param xpath: str - web element xpath
+        :param xpath: LocatorType - web element xpath
         :param text: str - text to type
         :param wait: int - wait time for object
+        :param input_mode: str - how text gets into the field (default_input_mode if not set):
+            "keys" - real key events (default), "native" - value setter + input/change events,
+            "cdp" - chrome Input.insertText. Fast modes fall back to "keys" if resulting value differs
         """
+        input_mode = input_mode or self.default_input_mode
         self.logger.info('Typing "%s" into field with xpath: %s', "***" if confidential else text[:50], xpath)
         if scroll:
             self.execute_script(self._get_element(xpath, wait=wait), "scrollIntoView(true);")
         input_field = self._get_element(xpath, ec.visibility_of_element_located, wait=wait)
+        if input_mode == "keys" or not self._insert_text(input_field, text, input_mode):
+            self._send_text_keys(input_field, text)
+        self.logger.info('Typed "%s" into field with xpath: %s', "***" if confidential else text[:50] + "...", xpath)
+
+    def _send_text_keys(self, input_field: WebElement, text: str) -> None:
         self.clear_input_field(input_field)
         if len(text) <= 100:
             input_field.send_keys(text)
@@ -288,180 +436,319 @@ class BaseClass:
             for chunk in chunks:
                 input_field.send_keys(chunk)
                 self.sleep(0.1)
-        self.logger.info('Typed "%s" into field with xpath: %s', "***" if confidential else text[:50] + "...", xpath)
 
-    def send_keys_shadow(self, keys: Keys, sleep: t.Optional[float] = 1) -> None:
+    def _insert_text(self, input_field: WebElement, text: str, input_mode: str) -> bool:
+        """
+        Put whole text into the field without key events.
+        :return: bool - whether resulting value of the field equals to the text
+        """
+        if input_mode == "cdp" and text and hasattr(self.driver, "execute_cdp_cmd"):
+            self.driver.execute_script(js_scripts.FOCUS_AND_SELECT, input_field)
+            self.driver.execute_cdp_cmd("Input.insertText", {"text": text})
+            value = input_field.get_property("value")
+        else:  # "native" (and "cdp" where it isn't available)
+            value = self.driver.execute_script(js_scripts.SET_INPUT_VALUE, input_field, text)
+        if value != text:
+            self.logger.warning("Field value differs from the text after '%s' input, typing it with keys", input_mode)
+            return False
+        return True
+
+    def send_keys_shadow(self, keys: Keys, max_wait: t.Optional[float] = settle_timeout, sleep: t.Optional[float] = None) -> None:
         """
         Emulate sending keys from keyboard. Enter is default
         :param keys: selenium.webdriver.common.keys or str text
+        :param max_wait: float - max wait for the page to settle after keys
+        :param sleep: float - deprecated alias of max_wait (the helper used to sleep for given time)
         """
+        if sleep is not None:
+            warnings.warn("send_keys_shadow(sleep=...) is deprecated, use max_wait", DeprecationWarning, stacklevel=2)
+            max_wait = sleep
+        self.install_page_tracker()
         ActionChains(self.driver).send_keys(keys).perform()
-        self.sleep(sleep)
+        self.wait_page_settle(max_wait=max_wait)
 
-    def send_keys_to_element(self, xpath: str, keys: Keys = Keys.ENTER, wait: int = short_timeout) -> None:
+    @retry_on_stale
+    def send_keys_to_element(self, xpath: LocatorType, keys: Keys = Keys.ENTER, wait: int = short_timeout, max_wait: t.Optional[float] = settle_timeout) -> None:
         """
         Emulate sending keys from keyboard to the given web element. Enter is default
-        :param xpath: str - web element xpath
+        :param xpath: LocatorType - web element xpath
         :param keys: selenium.webdriver.common.keys or str text
         :param wait: int - wait time for object
+        :param max_wait: float - max wait for the page to settle after keys
         """
-        self._get_element(xpath, wait=wait).send_keys(keys)
-        self.sleep(1)
+        element = self._get_element(xpath, wait=wait)
+        self.install_page_tracker()
+        element.send_keys(keys)
+        self.wait_page_settle(max_wait=max_wait)
 
-    def submit_search(self, xpath: str, text: str, wait: int = short_timeout, delay_timeout: t.Optional[int] = 1) -> None:
+    def submit_search(self, xpath: LocatorType, text: str, wait: int = short_timeout, delay_timeout: t.Optional[float] = settle_timeout) -> None:
         """
         Type text into input field with given xpath and send ENTER key
-        :param xpath: str - web element xpath
+        :param xpath: LocatorType - web element xpath
         :param text: str - text to type
         :param wait: int - wait time for object
+        :param delay_timeout: float - max wait for the page to settle after typing and after ENTER
         """
         self.type_text(xpath, text, wait=wait)
-        self.sleep(delay_timeout)
-        self.send_keys_to_element(xpath, wait=wait)
+        self.wait_page_settle(max_wait=delay_timeout)
+        self.send_keys_to_element(xpath, wait=wait, max_wait=delay_timeout)
+
+    def install_page_tracker(self) -> None:
+        """Start counting fetch/XHR requests and DOM changes of the current document before an action, so wait_page_settle sees everything the action started"""
+        self._track_new_documents()
+        try:
+            self.driver.execute_script(js_scripts.INSTALL_PAGE_TRACKER)
+        except WebDriverException:
+            self.logger.debug("Failed to install page tracker", exc_info=True)
+
+    def _track_new_documents(self) -> None:
+        """
+        Add the page tracker to every new document of the session (CDP only), so later navigations are tracked from their start.
+        Done once per session on its first settle wait, sessions which never wait for the page don't get the tracker
+        """
+        if not hasattr(self.driver, "execute_cdp_cmd") or self.driver in BaseClass._new_document_trackers:
+            return
+        try:
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": js_scripts.INSTALL_PAGE_TRACKER})
+            BaseClass._new_document_trackers.add(self.driver)
+        except WebDriverException:
+            self.logger.debug("Failed to add page tracker to new documents", exc_info=True)
+
+    def wait_page_settle(self, quiet_time: float = settle_quiet_time, max_wait: t.Optional[float] = settle_timeout) -> bool:
+        """
+        Wait until the page is quiet: document loaded, no pending fetch/XHR requests and no DOM changes for quiet_time.
+        :param quiet_time: float - required quiet period
+        :param max_wait: float - maximum wait time
+        :return: bool - whether page settled before max_wait
+        """
+        self._track_new_documents()
+        with timeout(max_wait or 0) as t:
+            while True:
+                try:
+                    if self.driver.execute_async_script(js_scripts.WAIT_PAGE_SETTLE, int(quiet_time * 1000), int(min(t.remaining, script_wait_timeout) * 1000)):
+                        return True
+                except WebDriverException:
+                    # page is being unloaded (or scripts are blocked)
+                    self.logger.debug("Page settle check failed", exc_info=True)
+                    if not t.expired:
+                        self._polling_pause(polling_timeout)
+                if t.expired:
+                    self.logger.debug("Page didn't settle in %ss", max_wait)
+                    return False
+
+    def wait_network_idle(self, idle_ms: int = 500, max_wait: t.Optional[float] = long_timeout) -> bool:
+        """
+        Wait until browser has no requests in flight for idle_ms.
+        Uses CDP network events when network tracking is enabled (local chrome),
+        otherwise falls back to the in-page fetch/XHR counter of wait_page_settle.
+        :param idle_ms: int - required period without requests
+        :param max_wait: float - maximum wait time
+        :return: bool - whether network became idle before max_wait
+        """
+        tracker = NetworkTracker.get(self.driver)
+        if tracker is None:
+            return self.wait_page_settle(quiet_time=idle_ms / 1000, max_wait=max_wait)
+        with timeout(max_wait or 0) as t:
+            while True:
+                tracker.pump()
+                if tracker.idle_time * 1000 >= idle_ms:
+                    return True
+                if t.expired:
+                    self.logger.debug("Network didn't become idle in %ss, requests in flight: %s", max_wait, [record.url for record in tracker.in_flight.values()])
+                    return False
+                self._polling_pause(0.05)
 
     # CUSTOM WAITS
 
-    def check_obj_exists(self, xpath: str) -> bool:
+    def check_obj_exists(self, xpath: LocatorType) -> bool:
         """
         Return True if object exists
         """
         with suppress(Exception):
-            self.driver.find_element(By.XPATH, xpath)
+            self.driver.find_element(*to_selenium_locator(xpath))
             return True
         return False
 
+    def check_obj_displayed(self, xpath: LocatorType) -> bool:
+        """
+        Return True if object exists and displayed
+        """
+        with suppress(Exception):
+            return self.driver.find_element(*to_selenium_locator(xpath)).is_displayed()
+        return False
+
+    def check_elements_state(self, xpaths: t.Sequence[LocatorType], state: str) -> t.List[bool]:
+        """
+        Single check of elements state made by webdriver commands (used when in-page waits are not available)
+        """
+        checks = {
+            "appear": self.check_obj_exists,
+            "disappear": lambda xpath: not self.check_obj_exists(xpath),
+            "visible": self.check_obj_displayed,
+            "invisible": lambda xpath: not self.check_obj_displayed(xpath),
+        }
+        return [checks[state](xpath) for xpath in xpaths]
+
+    def wait_elements_state(
+        self,
+        xpaths: t.Sequence[LocatorType],
+        state: str,
+        wait: t.Optional[float] = long_timeout,
+        polling_time: t.Optional[float] = polling_timeout,
+    ) -> t.List[bool]:
+        """
+        Wait until all elements are in the given state.
+        Waiting is done inside the page by MutationObserver, so it returns as soon as the state is reached.
+        Falls back to polling when scripts can't be executed (blocked by CSP, page is being unloaded, etc.)
+        :param xpaths: list of str - web elements xpaths
+        :param state: str - "appear", "disappear", "visible" or "invisible"
+        :param wait: float - maximum wait time
+        :param polling_time: float - polling interval of the fallback
+        :return: list of bool - state of every element at the end of the wait
+        """
+        script_xpaths = [str(xpath) for xpath in xpaths]
+        script_failures = 0
+        with timeout(wait) as t:
+            while True:
+                statuses = None
+                if script_failures < 3:  # give up on in-page waits after several failures in a row
+                    try:
+                        statuses = self.driver.execute_async_script(js_scripts.WAIT_FOR_ELEMENTS_STATE, script_xpaths, state, int(min(t.remaining, script_wait_timeout) * 1000))
+                        script_failures = 0
+                    except WebDriverException:
+                        self.logger.debug("In-page wait failed, checking elements state by polling", exc_info=True)
+                        script_failures += 1
+                if statuses is None:
+                    statuses = self.check_elements_state(xpaths, state)
+                    if not all(statuses) and not t.expired:
+                        self._polling_pause(polling_time)
+                if all(statuses) or t.expired:
+                    return statuses
+
     def wait_element_appear(
         self,
-        xpath: str,
+        xpath: LocatorType,
         wait: t.Optional[int] = long_timeout,
-        polling_time: t.Optional[int] = 1,
+        polling_time: t.Optional[float] = polling_timeout,
     ) -> bool:
-        with timeout(wait) as t:
-            while not self.check_obj_exists(xpath=xpath):
-                self.sleep(polling_time)
-                if t.expired:
-                    return False
-            return True
+        return all(self.wait_elements_state([xpath], "appear", wait, polling_time))
 
     def wait_element_disappear(
         self,
-        xpath: str,
+        xpath: LocatorType,
         wait: t.Optional[int] = long_timeout,
-        polling_time: t.Optional[int] = 1,
+        polling_time: t.Optional[float] = polling_timeout,
     ) -> bool:
-        with timeout(wait) as t:
-            while self.check_obj_exists(xpath=xpath):
-                self.sleep(polling_time)
-                if t.expired:
-                    return False
-            return True
+        return all(self.wait_elements_state([xpath], "disappear", wait, polling_time))
 
     def wait_element_visible(
         self,
-        xpath: str,
+        xpath: LocatorType,
         wait: t.Optional[int] = long_timeout,
-        polling_time: t.Optional[int] = 1,
+        polling_time: t.Optional[float] = polling_timeout,
     ) -> bool:
-        with timeout(wait) as t:
-            while not self.is_visible(xpath=xpath, wait=2):
-                self.sleep(polling_time)
-                if t.expired:
-                    return False
-            return True
+        return all(self.wait_elements_state([xpath], "visible", wait, polling_time))
 
     def wait_element_invisible(
         self,
-        xpath: str,
+        xpath: LocatorType,
         wait: t.Optional[int] = long_timeout,
-        polling_time: t.Optional[int] = 1,
+        polling_time: t.Optional[float] = polling_timeout,
     ) -> bool:
-        with timeout(wait) as t:
-            while self.is_visible(xpath=xpath, wait=2):
-                self.sleep(polling_time)
-                if t.expired:
-                    return False
-            return True
+        return all(self.wait_elements_state([xpath], "invisible", wait, polling_time))
+
+    def validate_elements_state(
+        self,
+        xpaths: t.Sequence[LocatorType],
+        state: str,
+        need_assert: bool = False,
+        assert_message: t.Optional[str] = None,
+        wait: int = long_timeout,
+        batch: bool = False,
+    ) -> None:
+        """
+        Validate all elements reach the given state.
+        :param xpaths: list of str - web elements xpaths
+        :param state: str - "appear", "disappear", "visible" or "invisible"
+        :param wait: int - maximum wait time
+        :param batch: bool - check all elements at once with one shared timeout (single round-trip per check),
+            by default elements are checked one by one and every element gets its own timeout
+        """
+        failure_description = {"appear": "don't appear", "disappear": "don't disappear", "visible": "is not visible", "invisible": "is still visible"}[state]
+        for group in [xpaths] if batch else [[xpath] for xpath in xpaths]:
+            self.logger.debug("Checking web elements with xpaths: %s", group)
+
+            statuses = self.wait_elements_state(group, state, wait)
+            if not all(statuses):
+                if len(group) == 1:
+                    message = f"Element with xpath '{group[0]}' {failure_description}. Timeout: {wait}s"
+                else:
+                    message = f"Some of elements {failure_description}. Timeout: {wait}s" + "".join(f"\n    [{'OK' if status else 'FAILED'}] {xpath}" for xpath, status in zip(group, statuses))
+                message = assert_message or message
+                raise AssertionError(message) if need_assert else TimeoutException(message)
+
+            self.logger.info("Checked web elements with xpaths: %s", group)
 
     @log_exception("Failed check web element state with xpath: {}. Timeout: {wait}s")
     def validate_element_appear(
         self,
-        *xpaths: str,
+        *xpaths: LocatorType,
         need_assert: bool = False,
         assert_message: t.Optional[str] = None,
         wait: int = long_timeout,
+        batch: bool = False,
     ) -> None:
         """
-        :param xpath: str - web element xpath
+        :param xpath: LocatorType - web element xpath
         :param wait: int - maximum wait time
+        :param batch: bool - check all xpaths at once with one shared timeout instead of the timeout per xpath
         """
-        for xpath in xpaths:
-            self.logger.debug("Checking web element with xpath: %s", xpath)
-
-            if not self.wait_element_appear(xpath, wait):
-                message = assert_message or f"Element with xpath '{xpath}' don't appear. Timeout: {wait}s"
-                raise AssertionError(message) if need_assert else TimeoutException(message)
-
-            self.logger.info("Checked web element with xpath: %s", xpath)
+        self.validate_elements_state(xpaths, "appear", need_assert=need_assert, assert_message=assert_message, wait=wait, batch=batch)
 
     @log_exception("Failed check web element state with xpath: {}. Timeout: {wait}s")
     def validate_element_disappear(
         self,
-        *xpaths: str,
+        *xpaths: LocatorType,
         need_assert: bool = False,
         assert_message: t.Optional[str] = None,
         wait: int = long_timeout,
+        batch: bool = False,
     ) -> None:
         """
-        :param xpath: str - web element xpath
+        :param xpath: LocatorType - web element xpath
         :param wait: int - maximum wait time
+        :param batch: bool - check all xpaths at once with one shared timeout instead of the timeout per xpath
         """
-        for xpath in xpaths:
-            self.logger.debug("Checking web element with xpath: %s", xpath)
-
-            if not self.wait_element_disappear(xpath, wait):
-                message = assert_message or f"Element with xpath '{xpath}' don't disappear. Timeout: {wait}s"
-                raise AssertionError(message) if need_assert else TimeoutException(message)
-
-            self.logger.info("Checked web element with xpath: %s", xpath)
+        self.validate_elements_state(xpaths, "disappear", need_assert=need_assert, assert_message=assert_message, wait=wait, batch=batch)
 
     @log_exception("Failed check web element state with xpath: {}. Timeout: {wait}s")
     def validate_element_visible(
         self,
-        *xpaths: str,
+        *xpaths: LocatorType,
         need_assert: bool = False,
         assert_message: t.Optional[str] = None,
         wait: int = long_timeout,
+        batch: bool = False,
     ) -> None:
         """
-        :param xpath: str - web element xpath
+        :param xpath: LocatorType - web element xpath
         :param wait: int - maximum wait time
+        :param batch: bool - check all xpaths at once with one shared timeout instead of the timeout per xpath
         """
-        for xpath in xpaths:
-            self.logger.debug("Checking web element with xpath: %s", xpath)
-
-            if not self.wait_element_visible(xpath, wait):
-                message = assert_message or f"Element with xpath '{xpath}' is not visible. Timeout: {wait}s"
-                raise AssertionError(message) if need_assert else TimeoutException(message)
-
-            self.logger.info("Checked web element with xpath: %s", xpath)
+        self.validate_elements_state(xpaths, "visible", need_assert=need_assert, assert_message=assert_message, wait=wait, batch=batch)
 
     @log_exception("Failed check web element state with xpath: {}. Timeout: {wait}s")
     def validate_element_invisible(
         self,
-        *xpaths: str,
+        *xpaths: LocatorType,
         need_assert: bool = False,
         assert_message: t.Optional[str] = None,
         wait: int = long_timeout,
+        batch: bool = False,
     ) -> None:
         """
-        :param xpath: str - web element xpath
+        :param xpath: LocatorType - web element xpath
         :param wait: int - maximum wait time
+        :param batch: bool - check all xpaths at once with one shared timeout instead of the timeout per xpath
         """
-        for xpath in xpaths:
-            self.logger.debug("Checking web element with xpath: %s", xpath)
-
-            if not self.wait_element_invisible(xpath, wait):
-                message = assert_message or f"Element with xpath '{xpath}' is still visible. Timeout: {wait}s"
-                raise AssertionError(message) if need_assert else TimeoutException(message)
-
-            self.logger.info("Checked web element with xpath: %s", xpath)
+        self.validate_elements_state(xpaths, "invisible", need_assert=need_assert, assert_message=assert_message, wait=wait, batch=batch)
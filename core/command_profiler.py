@@ -0,0 +1,182 @@
+import logging
+import itertools
+import threading
+import time
+import typing as t
+import weakref
+from collections import deque
+from dataclasses import asdict, dataclass
+from functools import wraps
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from utils.config import get_frozen_config
+
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+PAYLOAD_SAMPLE_ITEMS = 20  # items of the list/dict measured by payload_size, the rest is extrapolated
+PAYLOAD_MAX_DEPTH = 4  # nested values deeper than that are not measured
+
+
+@dataclass
+class CommandRecord:
+    command: str
+    duration_ms: float
+    request_bytes: int  # estimated by payload_size
+    response_bytes: int
+    step: t.Optional[str] = None
+    failed: bool = False
+
+
+def payload_size(value: t.Any, depth: int = 0) -> int:
+    """
+    Cheap estimate of the json size of the command payload without serializing it again:
+    str/bytes values (screenshots, page sources) are measured by len(), lists and dicts by their first items only
+    :param value: params or response value of the command
+    :param depth: int - nesting level of the value
+    :return: int - estimated size in characters
+    """
+    if value is None or isinstance(value, bool):
+        return 4
+    if isinstance(value, (str, bytes)):
+        return len(value) + 2
+    if isinstance(value, (int, float)):
+        return 8
+    if depth >= PAYLOAD_MAX_DEPTH or not isinstance(value, (dict, list, tuple)):
+        return 0
+    items = list(itertools.islice(value.items() if isinstance(value, dict) else value, PAYLOAD_SAMPLE_ITEMS))
+    if not items:
+        return 2
+    if isinstance(value, dict):
+        sample = sum(len(str(key)) + 4 + payload_size(item, depth + 1) for key, item in items)
+    else:
+        sample = sum(payload_size(item, depth + 1) + 1 for item in items)
+    return 2 + sample * len(value) // len(items)
+
+
+class CommandProfiler:
+    """
+    Records name, duration and payload size of every WebDriver command of the driver
+    (wraps its command executor, so drivers without profiler have no overhead at all).
+    Commands are attributed to the innermost running allure step of the thread and aggregated into histograms.
+    The last commands are kept across tests for failure diagnostics.
+    """
+
+    logger = logging.getLogger(__name__)
+    _profilers: "weakref.WeakKeyDictionary[WebDriver, CommandProfiler]" = weakref.WeakKeyDictionary()
+    _steps = threading.local()
+
+    def __init__(self, recent_commands: int = 50) -> None:
+        self.records: t.List[CommandRecord] = []
+        self.recent: t.Deque[CommandRecord] = deque(maxlen=recent_commands)
+
+    @staticmethod
+    def get_options() -> t.Dict[str, t.Any]:
+        return get_frozen_config().get("command_profiling", None) or {}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return bool(cls.get_options().get("enabled", False))
+
+    @classmethod
+    def attach(cls, driver: WebDriver) -> "CommandProfiler":
+        profiler = cls(cls.get_options().get("recent_commands", 50))
+        executor = driver.command_executor
+        execute = executor.execute
+
+        @wraps(execute)
+        def profiled_execute(command: str, params: t.Optional[t.Dict] = None) -> t.Dict:
+            return profiler.execute(execute, command, params)
+
+        executor.execute = profiled_execute
+        cls._profilers[driver] = profiler
+        return profiler
+
+    @classmethod
+    def get(cls, driver: WebDriver) -> t.Optional["CommandProfiler"]:
+        return cls._profilers.get(driver)
+
+    @classmethod
+    def _step_stack(cls) -> t.List[str]:
+        if not hasattr(cls._steps, "stack"):
+            cls._steps.stack = []
+        return cls._steps.stack
+
+    @classmethod
+    def step_started(cls, title: str) -> None:
+        cls._step_stack().append(title)
+
+    @classmethod
+    def step_finished(cls) -> None:
+        stack = cls._step_stack()
+        if stack:
+            stack.pop()
+
+    @classmethod
+    def current_step(cls) -> t.Optional[str]:
+        stack = cls._step_stack()
+        return stack[-1] if stack else None
+
+    def execute(self, execute: t.Callable, command: str, params: t.Optional[t.Dict]) -> t.Dict:
+        response = None
+        started = time.perf_counter()
+        try:
+            response = execute(command, params)
+            return response
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            value = response.get("value") if isinstance(response, dict) else None
+            record = CommandRecord(
+                command,
+                round(duration_ms, 2),
+                payload_size(params) if params else 0,
+                payload_size(value) if value is not None else 0,
+                self.current_step(),
+                failed=response is None or (isinstance(value, dict) and "error" in value),
+            )
+            self.records.append(record)
+            self.recent.append(record)
+
+    def reset(self) -> None:
+        self.records = []
+
+    @staticmethod
+    def histogram(durations: t.List[float]) -> t.Dict[str, t.Any]:
+        durations = sorted(durations)
+        buckets = {f"<={bound}ms": 0 for bound in HISTOGRAM_BUCKETS_MS}
+        buckets[f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] = 0
+        for duration in durations:
+            bound = next((bound for bound in HISTOGRAM_BUCKETS_MS if duration <= bound), None)
+            buckets[f"<={bound}ms" if bound is not None else f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] += 1
+        return {
+            "count": len(durations),
+            "total_ms": round(sum(durations), 2),
+            "p50_ms": durations[len(durations) // 2],
+            "p95_ms": durations[min(len(durations) - 1, int(len(durations) * 0.95))],
+            "max_ms": durations[-1],
+            "buckets": {bucket: count for bucket, count in buckets.items() if count},
+        }
+
+    @classmethod
+    def _histograms(cls, records: t.List[CommandRecord]) -> t.Dict[str, t.Dict[str, t.Any]]:
+        durations: t.Dict[str, t.List[float]] = {}
+        for record in records:
+            durations.setdefault(record.command, []).append(record.duration_ms)
+        return {command: cls.histogram(command_durations) for command, command_durations in sorted(durations.items())}
+
+    def stats(self) -> t.Dict[str, t.Any]:
+        """Statistics of commands executed since the last reset: per command and per step histograms"""
+        steps: t.Dict[str, t.List[CommandRecord]] = {}
+        for record in self.records:
+            steps.setdefault(record.step or "<no step>", []).append(record)
+        return {
+            "commands": len(self.records),
+            "failed": sum(record.failed for record in self.records),
+            "total_ms": round(sum(record.duration_ms for record in self.records), 2),
+            "request_bytes": sum(record.request_bytes for record in self.records),
+            "response_bytes": sum(record.response_bytes for record in self.records),
+            "by_command": self._histograms(self.records),
+            "by_step": {step: {"total_ms": round(sum(record.duration_ms for record in records), 2), "by_command": self._histograms(records)} for step, records in steps.items()},
+        }
+
+    def recent_commands(self) -> t.List[t.Dict[str, t.Any]]:
+        return [asdict(record) for record in self.recent]
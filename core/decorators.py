@@ -1,8 +1,12 @@
+import inspect
 import logging
 import typing as t
 from functools import wraps
 
-from utils.func_args_helper import func_parameters, represent
+from selenium.common.exceptions import StaleElementReferenceException
+
+from core.time_accounting import TimeAccounting
+from utils.func_args_helper import represent, signature
 
 T = t.TypeVar("T")
 
@@ -14,19 +18,42 @@ def log_exception(message: str) -> t.Callable:
     """
 
     def decorator(func: t.Callable) -> t.Callable:
+        func_signature = signature(inspect.unwrap(func))
+
         @wraps(func)
         def wrapper(self: object, *args: t.Tuple, **kwargs: t.Dict) -> T:
-            try:
-                return func(self, *args, **kwargs)
-            except Exception:
-                log = self.logger if hasattr(self, "logger") else logging.getLogger(self.__class__.__name__)
+            with TimeAccounting.measure("framework"):
+                try:
+                    return func(self, *args, **kwargs)
+                except Exception:
+                    log = self.logger if hasattr(self, "logger") else logging.getLogger(self.__class__.__name__)
 
-                f_args = [represent(x) for x in args]
-                f_params = func_parameters(func, *args, **kwargs)
+                    f_args = [represent(x) for x in args]
+                    f_params = func_signature.bind((self, *args), kwargs)
 
-                log.error(message.format(*f_args, **f_params))
-                raise
+                    log.error(message.format(*f_args, **f_params))
+                    raise
 
         return wrapper
 
     return decorator
+
+
+def retry_on_stale(func: t.Callable) -> t.Callable:
+    """
+    Decorator for page actions: if element taken from the element cache became stale,
+    cache is invalidated and action is repeated once with re-resolved elements.
+    """
+
+    @wraps(func)
+    def wrapper(self: object, *args: t.Tuple, **kwargs: t.Dict) -> T:
+        try:
+            return func(self, *args, **kwargs)
+        except StaleElementReferenceException:
+            element_cache = getattr(self, "element_cache", None)
+            if element_cache is None:
+                raise
+            element_cache.invalidate(stale=True)
+            return func(self, *args, **kwargs)
+
+    return wrapper
@@ -1,7 +1,14 @@
 import logging
+import typing as t
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
 
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.chromium.webdriver import ChromiumDriver
 from selenium.webdriver.edge.service import Service as EdgeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.ie.service import Service as IEService
@@ -9,17 +16,68 @@ from selenium.webdriver.remote.remote_connection import RemoteConnection
 from selenium.webdriver.remote.webdriver import WebDriver
 
 import definitions
+from core import js_scripts
+from core.command_profiler import CommandProfiler
+from core.fake_webdriver import FakeWebDriver
 from core.lambdatest_caps import get_lt_caps, get_lt_url
-from utils.config import get_config
+from core.network_tracker import NetworkTracker
+from core.screencast import Screencast
+from core.time_accounting import TimeAccounting
+from utils.config import get_frozen_config
+
+# chrome switches for the "lean" profile: no background services and throttling which are useless for the tests
+LEAN_CHROME_ARGUMENTS = [
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-features=Translate,OptimizationHints,MediaRouter",
+    "--no-first-run",
+    "--mute-audio",
+]
+# Network.setBlockedURLs accepts url patterns only, so resource types are mapped to the file extensions
+RESOURCE_TYPE_EXTENSIONS = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "svg", "ico"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "ogg", "mp3", "wav"),
+    "stylesheet": ("css",),
+}
+# blocked url patterns support "*" wildcard only, urls with query string ("logo.png?v=2") need own pattern
+RESOURCE_TYPE_URL_PATTERNS = {
+    resource_type: [pattern for extension in extensions for pattern in (f"*.{extension}", f"*.{extension}?*")] for resource_type, extensions in RESOURCE_TYPE_EXTENSIONS.items()
+}
+
+
+@dataclass
+class DriverState:
+    """Browser sessions of the process (xdist worker)"""
+
+    driver: t.Optional[WebDriver] = None
+    # pooled mode: warm session parked between tests
+    idle_driver: t.Optional[WebDriver] = None
+    driver_uses: int = 0
+    # prefetch mode: session for the next test started in background
+    prefetched_driver: t.Optional[Future] = None
+    # lean profile: url patterns currently blocked in the browser
+    blocked_url_patterns: t.List[str] = field(default_factory=list)
 
 
 class DriverHelper:
-    _driver = None
+    _state = DriverState()
+    _prefetch_executor: t.Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def get_state(cls) -> DriverState:
+        return cls._state
 
     @classmethod
     def init_local_driver(cls) -> WebDriver:
-        config_browser = get_config().browser.lower()
-        is_headless = get_config().is_headless
+        config_browser = get_frozen_config().browser.lower()
+        is_headless = get_frozen_config().is_headless
         if config_browser == "chrome":
             # configure options
             chrome_options = webdriver.ChromeOptions()
@@ -38,60 +96,278 @@ class DriverHelper:
             chrome_options.add_argument("--ignore-certificate-errors")
             chrome_options.add_argument("--ignore-ssl-errors")
             # chrome_options.add_argument("--incognito") # clear chrome cache didn't work with '--incognito'
+            if cls.get_lean_options()["enabled"]:
+                for argument in LEAN_CHROME_ARGUMENTS:
+                    chrome_options.add_argument(argument)
+            if cls.is_network_tracking_enabled():
+                # CDP Network domain events are delivered through performance log
+                chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+                chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
             if is_headless:
                 chrome_options.add_argument("--headless=new")
                 chrome_options.add_argument("--no-sandbox")
                 chrome_options.add_argument("--disable-gpu")
                 chrome_options.add_argument("--disable-dev-shm-usage")
             # and get driver
-            cls._driver = webdriver.Chrome(service=ChromeService(), options=chrome_options)
+            driver = webdriver.Chrome(service=ChromeService(), options=chrome_options)
+            if cls.is_network_tracking_enabled():
+                NetworkTracker.attach(driver)
+            if Screencast.enabled:
+                Screencast.attach(driver)
         elif config_browser == "firefox":
-            cls._driver = webdriver.Firefox(service=FirefoxService())
+            driver = webdriver.Firefox(service=FirefoxService())
         elif config_browser == "opera":
-            cls._driver = webdriver.Opera()
+            driver = webdriver.Opera()
         elif config_browser == "edge":
-            cls._driver = webdriver.Edge(service=EdgeService())
+            driver = webdriver.Edge(service=EdgeService())
         elif config_browser == "ie":
-            cls._driver = webdriver.Ie(service=IEService())
+            driver = webdriver.Ie(service=IEService())
 
-        cls._driver.set_window_size(get_config().browser_resolution["width"], get_config().browser_resolution["height"])
-        # cls._driver.maximize_window()
+        driver.set_window_size(get_frozen_config().browser_resolution["width"], get_frozen_config().browser_resolution["height"])
+        # driver.maximize_window()
 
-        return cls._driver
+        return driver
 
     @classmethod
     def init_remote_driver(cls, scenario_name: str) -> WebDriver:
         logger = logging.getLogger(__name__)
 
-        config_browser = get_config().browser.lower()
+        config_browser = get_frozen_config().browser.lower()
         if config_browser == "chrome":
             # configure options
             opts = webdriver.ChromeOptions()
-            opts.set_capability("browserVersion", get_config().remote_options.browser_version)
+            opts.set_capability("browserVersion", get_frozen_config().remote_options.browser_version)
             opts.set_capability("LT:Options", get_lt_caps(scenario_name))
         try:
-            cls._driver = webdriver.Remote(
+            return webdriver.Remote(
                 command_executor=RemoteConnection(get_lt_url()),
                 options=opts,
             )
-            return cls._driver
         except Exception:
-            logger.error("Failed to start browser: %s", get_config().browser, exc_info=True)
+            logger.error("Failed to start browser: %s", get_frozen_config().browser, exc_info=True)
             raise
 
+    @classmethod
+    def init_fake_driver(cls) -> WebDriver:
+        """In-process fake driver over static html pages (see core.fake_webdriver), no browser is started"""
+        driver = FakeWebDriver.from_config()
+        driver.set_window_size(get_frozen_config().browser_resolution["width"], get_frozen_config().browser_resolution["height"])
+        return driver
+
+    @classmethod
+    def start_driver(cls, scenario_name: str = None) -> WebDriver:
+        testrun_type = get_frozen_config().testrun_type.lower()
+        driver = None
+        if testrun_type == "remote":
+            driver = cls.init_remote_driver(scenario_name)
+        elif testrun_type == "local":
+            driver = cls.init_local_driver()
+        elif testrun_type == "fake":
+            driver = cls.init_fake_driver()
+        if driver is not None and CommandProfiler.is_enabled():
+            CommandProfiler.attach(driver)
+        if driver is not None and TimeAccounting.enabled:
+            TimeAccounting.attach(driver)
+        return driver
+
     @classmethod
     def get_driver(cls, scenario_name: str = None) -> WebDriver:
-        if cls._driver:
-            return cls._driver
+        state = cls.get_state()
+        if state.driver:
+            return state.driver
+        if state.idle_driver:
+            state.driver, state.idle_driver = state.idle_driver, None
+            state.driver_uses += 1
+            cls.set_session_name(scenario_name)
+        elif state.prefetched_driver:
+            future, state.prefetched_driver = state.prefetched_driver, None
+            try:
+                state.driver = future.result()
+                cls.set_session_name(scenario_name)
+            except Exception:
+                logging.getLogger(__name__).warning("Prefetched browser session failed to start, starting a new one", exc_info=True)
+                if state.driver:
+                    cls.quit_driver(state.driver)  # started, but couldn't be taken by the test
+                state.driver = cls.start_driver(scenario_name)
+            state.driver_uses = 1
+        else:
+            state.driver = cls.start_driver(scenario_name)
+            state.driver_uses = 1
+        cls.prefetch_driver()
+        return state.driver
+
+    @classmethod
+    def prefetch_driver(cls) -> None:
+        """Start the session for the next test on background thread while current test is running.
+        Session is started with placeholder name and renamed when it is taken by the test.
+        """
+        state = cls.get_state()
+        if state.prefetched_driver or not (get_frozen_config().get("driver_prefetch", None) or {}).get("enabled", False):
+            return
+        pool_options = cls.get_pool_options()
+        if pool_options["enabled"] and (not pool_options["max_tests_per_session"] or state.driver_uses < pool_options["max_tests_per_session"]):
+            return  # current session is going to be reused
+        if cls._prefetch_executor is None:
+            cls._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="driver_prefetch")
+        state.prefetched_driver = cls._prefetch_executor.submit(cls.start_driver, "prefetched session")
+
+    @classmethod
+    def set_session_name(cls, scenario_name: str) -> None:
+        """Rename current remote session, so reused LambdaTest sessions are named after the running scenario"""
+        state = cls.get_state()
+        if state.driver and scenario_name and get_frozen_config().testrun_type.lower() == "remote":
+            state.driver.execute_script(f"lambda-name={scenario_name}")
+
+    @staticmethod
+    def get_pool_options() -> t.Dict[str, t.Any]:
+        pool_options = get_frozen_config().get("driver_pool", None) or {}
+        return {
+            "enabled": bool(pool_options.get("enabled", False)),
+            "max_tests_per_session": int(pool_options.get("max_tests_per_session", 0) or 0),
+            "recycle_on_failure": bool(pool_options.get("recycle_on_failure", True)),
+        }
+
+    @classmethod
+    def reset_driver_state(cls, driver: WebDriver) -> None:
+        """Bring reused session to the 'fresh browser' state: single blank window without cookies and web storage"""
+        use_cdp = hasattr(driver, "execute_cdp_cmd")
+        origins: t.Set[str] = set()
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            if use_cdp:
+                origins.update(cls.visited_origins(driver))
+            driver.close()
+        driver.switch_to.window(handles[0])
+        # storage of the current page origin, including sessionStorage of the tab which is kept
+        with suppress(WebDriverException):
+            driver.execute_script(js_scripts.CLEAR_STORAGE)
+        if use_cdp:
+            # cookies of all domains and storage of every origin the tabs have visited, not only of the current page
+            origins.update(cls.visited_origins(driver))
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            for origin in sorted(origins):
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
         else:
-            testrun_type = get_config().testrun_type.lower()
-            if testrun_type == "remote":
-                return cls.init_remote_driver(scenario_name)
-            elif testrun_type == "local":
-                return cls.init_local_driver()
+            # webdriver commands reach the origin of the current page only
+            driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    @staticmethod
+    def visited_origins(driver: WebDriver) -> t.Set[str]:
+        """Web origins of the navigation history of the current tab (CDP)"""
+        entries = driver.execute_cdp_cmd("Page.getNavigationHistory", {})["entries"]
+        urls = [urlsplit(entry["url"]) for entry in entries]
+        return {f"{url.scheme}://{url.netloc}" for url in urls if url.scheme in ("http", "https")}
+
+    @staticmethod
+    def get_lean_options() -> t.Dict[str, t.Any]:
+        lean_options = get_frozen_config().get("lean_profile", None) or {}
+        return {
+            "enabled": bool(lean_options.get("enabled", False)),
+            "blocked_resource_types": list(lean_options.get("blocked_resource_types", None) or []),
+            "blocked_url_patterns": list(lean_options.get("blocked_url_patterns", None) or []),
+        }
+
+    @staticmethod
+    def is_network_tracking_enabled() -> bool:
+        return bool((get_frozen_config().get("network_tracking", None) or {}).get("enabled", False))
+
+    @classmethod
+    def block_urls(cls, driver: WebDriver, url_patterns: t.List[str]) -> None:
+        state = cls.get_state()
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": url_patterns})
+        state.blocked_url_patterns = url_patterns
+
+    @classmethod
+    def apply_lean_profile(
+        cls,
+        driver: WebDriver,
+        blocked_resource_types: t.Optional[t.List[str]] = None,
+        blocked_url_patterns: t.Optional[t.List[str]] = None,
+    ) -> None:
+        """
+        Block requests in local chrome according to the lean profile.
+        :param blocked_resource_types: list - suite specific resource types to block ("image", "font", "media", "stylesheet") instead of configured ones
+        :param blocked_url_patterns: list - suite specific url patterns to block instead of configured ones
+        """
+        lean_options = cls.get_lean_options()
+        if not lean_options["enabled"] or not isinstance(driver, ChromiumDriver):
+            return
+        resource_types = lean_options["blocked_resource_types"] if blocked_resource_types is None else blocked_resource_types
+        url_patterns = lean_options["blocked_url_patterns"] if blocked_url_patterns is None else blocked_url_patterns
+        cls.block_urls(driver, cls.resource_url_patterns(resource_types) + url_patterns)
+
+    @staticmethod
+    def resource_url_patterns(resource_types: t.Iterable[str]) -> t.List[str]:
+        """Blocked url patterns of the resource types"""
+        unknown = [resource_type for resource_type in resource_types if resource_type not in RESOURCE_TYPE_URL_PATTERNS]
+        if unknown:
+            raise ValueError(f"Unknown resource types: {unknown}, supported: {list(RESOURCE_TYPE_URL_PATTERNS)}")
+        return [pattern for resource_type in resource_types for pattern in RESOURCE_TYPE_URL_PATTERNS[resource_type]]
+
+    @classmethod
+    @contextmanager
+    def allow_resources(cls, driver: WebDriver, *resource_types: str) -> t.Iterator[None]:
+        """Temporary unblock resource types for page objects which need them"""
+        state = cls.get_state()
+        blocked = state.blocked_url_patterns
+        allowed = set(cls.resource_url_patterns(resource_types))
+        if not allowed.intersection(blocked):
+            yield
+            return
+        cls.block_urls(driver, [pattern for pattern in blocked if pattern not in allowed])
+        if "image" in resource_types:
+            driver.execute_script(js_scripts.RELOAD_BROKEN_IMAGES)
+        try:
+            yield
+        finally:
+            cls.block_urls(driver, blocked)
+
+    @classmethod
+    def close_driver(cls, failed: bool = False) -> None:
+        """Finish the driver of current test.
+        In pooled mode session is reset and kept for the next test unless it failed or served its max number of tests.
+        """
+        state = cls.get_state()
+        if not state.driver:
+            return
+        driver, state.driver = state.driver, None
+        pool_options = cls.get_pool_options()
+        reuse = pool_options["enabled"] and not (failed and pool_options["recycle_on_failure"])
+        if reuse and pool_options["max_tests_per_session"]:
+            reuse = state.driver_uses < pool_options["max_tests_per_session"]
+        if reuse:
+            try:
+                cls.reset_driver_state(driver)
+                state.idle_driver = driver
+                return
+            except WebDriverException:
+                logging.getLogger(__name__).warning("Failed to reset browser session, it will be recycled", exc_info=True)
+        Screencast.detach(driver)
+        NetworkTracker.detach(driver)
+        driver.quit()
+
+    @staticmethod
+    def quit_driver(driver: WebDriver) -> None:
+        """Quit the session which is not needed anymore, errors of the already closed session are ignored"""
+        Screencast.detach(driver)
+        NetworkTracker.detach(driver)
+        with suppress(WebDriverException):
+            driver.quit()
 
     @classmethod
-    def close_driver(cls) -> None:
-        if cls._driver:
-            cls._driver.quit()  # close()
-            cls._driver = None
+    def shutdown(cls) -> None:
+        """Quit all sessions owned by the process (current, parked and prefetched ones)"""
+        state, cls._state = cls._state, DriverState()
+        drivers = [state.driver, state.idle_driver]
+        if state.prefetched_driver:
+            with suppress(Exception):
+                drivers.append(state.prefetched_driver.result())
+        for driver in drivers:
+            if driver:
+                cls.quit_driver(driver)
+        if cls._prefetch_executor:
+            cls._prefetch_executor.shutdown(wait=False)
+            cls._prefetch_executor = None
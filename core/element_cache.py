@@ -0,0 +1,62 @@
+import typing as t
+
+from selenium.webdriver.remote.webelement import WebElement
+
+
+class ElementCache:
+    """
+    Cache of resolved web elements keyed by xpath.
+    Elements are dropped on navigation, when they become stale and when they are no longer the element of their xpath
+    (checked on every hit), hit/miss counters show the savings.
+    Cached elements are also used as search roots for their child locators (scoped lookups) if they are the only match of their xpath.
+    """
+
+    def __init__(self) -> None:
+        self._elements: t.Dict[str, WebElement] = {}
+        self._unique: t.Dict[str, bool] = {}  # xpath -> whether it has single match, checked once for the scoped lookups
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.mismatch = 0
+        self.scoped = 0
+
+    def get(self, xpath: str) -> t.Optional[WebElement]:
+        element = self._elements.get(xpath)
+        if element is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return element
+
+    def peek(self, xpath: str) -> t.Optional[WebElement]:
+        """Cached element without counting hit/miss"""
+        return self._elements.get(xpath)
+
+    def put(self, xpath: str, element: WebElement) -> None:
+        self._elements[xpath] = element
+
+    def is_unique(self, xpath: str) -> t.Optional[bool]:
+        """Whether the cached xpath has single match, None if it wasn't checked yet"""
+        return self._unique.get(xpath)
+
+    def set_unique(self, xpath: str, unique: bool) -> None:
+        self._unique[xpath] = unique
+
+    def invalidate(self, xpath: t.Optional[str] = None, stale: bool = False, mismatch: bool = False) -> None:
+        """Drop element with given xpath or all elements
+        :param stale: bool - invalidation is caused by stale element
+        :param mismatch: bool - invalidation is caused by element which doesn't match its xpath anymore
+        """
+        if stale:
+            self.stale += 1
+        if mismatch:
+            self.mismatch += 1
+        if xpath is None:
+            self._elements.clear()
+            self._unique.clear()
+        else:
+            self._elements.pop(xpath, None)
+            self._unique.pop(xpath, None)
+
+    def stats(self) -> t.Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "stale": self.stale, "mismatch": self.mismatch, "scoped": self.scoped, "size": len(self._elements)}
@@ -0,0 +1,116 @@
+import io
+import json
+import logging
+import threading
+import time
+import typing as t
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from core import js_scripts
+from core.command_profiler import CommandProfiler
+from core.network_tracker import NetworkTracker
+from utils.common import save_test_artifact
+from utils.config import get_frozen_config
+
+
+class FailureBundle:
+    """
+    Failure artifacts of the test: screenshot, live DOM, browser console log, url, title, window handles,
+    the last WebDriver commands and network stats. Browser artifacts are requested concurrently: commands of one session
+    are still executed by the driver one after another, but their round-trips (remote grid) and client side work overlap.
+    Artifacts are written as one zip bundle next to the other test artifacts.
+    """
+
+    logger = logging.getLogger(__name__)
+    _executor: t.Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    def get_options(cls) -> t.Dict[str, t.Any]:
+        return get_frozen_config().get("failure_bundle", None) or {}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return bool(cls.get_options().get("enabled", False))
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="failure-bundle")
+            return cls._executor
+
+    @classmethod
+    def collect(cls, driver: WebDriver) -> t.Dict[str, t.Any]:
+        """
+        Gather artifacts of the driver, artifacts which failed or didn't make it in time are listed in "errors"
+        :return: dict - artifact name -> value (screenshot is png bytes)
+        """
+        timeout = float(cls.get_options().get("timeout", 10))
+        artifacts: t.Dict[str, t.Any] = {"collected": datetime.now().isoformat(timespec="milliseconds"), "errors": {}}
+        # taken first: commands of the collectors are recorded by the profiler as well
+        command_profiler = CommandProfiler.get(driver)
+        if command_profiler:
+            artifacts["commands"] = command_profiler.recent_commands()
+        network_tracker = NetworkTracker.get(driver)
+        if network_tracker:
+            artifacts["network"] = network_tracker.stats()
+        collectors = {
+            "screenshot": driver.get_screenshot_as_png,
+            "dom": lambda: driver.execute_script(js_scripts.GET_DOM_SNAPSHOT),
+            "console": lambda: driver.get_log("browser"),
+            "url": lambda: driver.current_url,
+            "title": lambda: driver.title,
+            "window_handles": lambda: driver.window_handles,
+            "current_window_handle": lambda: driver.current_window_handle,
+        }
+        executor = cls._get_executor()
+        futures = {name: executor.submit(collector) for name, collector in collectors.items()}
+        deadline = time.monotonic() + timeout
+        for name, future in futures.items():
+            try:
+                artifacts[name] = future.result(max(0.0, deadline - time.monotonic()))
+            except Exception as e:
+                artifacts["errors"][name] = f"{type(e).__name__}: {str(e).strip()}"[:500]
+        # collectors which didn't make it in time must not send commands after the test (pooled session is reset and reused):
+        # queued ones are cancelled, running ones are waited for (their commands end with the command timeout of the driver)
+        running = [future for future in futures.values() if not future.cancel() and not future.done()]
+        if running:
+            wait(running)
+        return artifacts
+
+    @staticmethod
+    def pack(artifacts: t.Dict[str, t.Any]) -> bytes:
+        """Zip bundle: screenshot.png, dom.html, console.json, commands.json, network.json and meta.json with the rest"""
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+            meta = dict(artifacts)
+            if meta.get("screenshot") is not None:
+                bundle.writestr("screenshot.png", meta.pop("screenshot"), compress_type=zipfile.ZIP_STORED)  # png is compressed already
+            if meta.get("dom") is not None:
+                bundle.writestr("dom.html", meta.pop("dom"))
+            for name in ("console", "commands", "network"):
+                if meta.get(name) is not None:
+                    bundle.writestr(f"{name}.json", json.dumps(meta.pop(name), indent=2, default=str))
+            bundle.writestr("meta.json", json.dumps(meta, indent=2, default=str))
+        return output.getvalue()
+
+    @classmethod
+    def save(cls, node_id: str, artifacts: t.Dict[str, t.Any]) -> t.Optional[Path]:
+        """Write the bundle to the test logs folder, returns its path"""
+        bundle = save_test_artifact(node_id, "failure", "zip", cls.pack(artifacts))
+        if artifacts["errors"]:
+            cls.logger.warning("Failure bundle of %s misses artifacts: %s", node_id, artifacts["errors"])
+        return bundle
+
+    @classmethod
+    def shutdown(cls) -> None:
+        with cls._executor_lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False)
+                cls._executor = None
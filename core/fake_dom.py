@@ -0,0 +1,642 @@
+"""
+Minimal in-memory DOM of static html pages for the fake WebDriver:
+html parsing by stdlib html.parser, XPath 1.0 subset and the CSS selectors produced by core.locator.
+"""
+import functools
+import math
+import re
+import typing as t
+from html.parser import HTMLParser
+
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+NOT_RENDERED_ELEMENTS = {"head", "script", "style", "template", "title", "meta", "link", "noscript"}
+HIDDEN_STYLE_RE = re.compile(r"(display\s*:\s*none|visibility\s*:\s*hidden)", re.I)
+
+
+class Node:
+    __slots__ = ("parent", "order")
+
+    def __init__(self, parent: t.Optional["Element"]) -> None:
+        self.parent = parent
+        self.order = 0
+
+    @property
+    def string_value(self) -> str:
+        raise NotImplementedError
+
+    def ancestors(self) -> t.Iterator["Element"]:
+        node = self.parent
+        while node is not None:
+            yield node
+            node = node.parent
+
+
+class Text(Node):
+    __slots__ = ("data",)
+
+    def __init__(self, data: str, parent: "Element") -> None:
+        super().__init__(parent)
+        self.data = data
+
+    @property
+    def string_value(self) -> str:
+        return self.data
+
+
+class Attribute(Node):
+    __slots__ = ("name", "value")
+
+    def __init__(self, name: str, value: str, parent: "Element") -> None:
+        super().__init__(parent)
+        self.name = name
+        self.value = value
+        self.order = parent.order
+
+    @property
+    def string_value(self) -> str:
+        return self.value
+
+
+class Element(Node):
+    __slots__ = ("tag", "attributes", "children", "value", "checked")
+
+    def __init__(self, tag: str, attributes: t.Dict[str, str], parent: t.Optional["Element"]) -> None:
+        super().__init__(parent)
+        self.tag = tag
+        self.attributes = attributes
+        self.children: t.List[Node] = []
+        self.value = attributes.get("value", "")  # current value of form controls
+        self.checked = "checked" in attributes
+
+    def descendants(self) -> t.Iterator[Node]:
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            yield node
+            if isinstance(node, Element):
+                stack.extend(reversed(node.children))
+
+    def element_descendants(self) -> t.Iterator["Element"]:
+        return (node for node in self.descendants() if isinstance(node, Element))
+
+    @property
+    def string_value(self) -> str:
+        return "".join(node.data for node in self.descendants() if isinstance(node, Text))
+
+    @property
+    def inner_text(self) -> str:
+        """Rendered text approximation: text of rendered descendants with collapsed whitespace"""
+        parts = []
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Text):
+                parts.append(node.data)
+            elif isinstance(node, Element) and node.tag not in NOT_RENDERED_ELEMENTS:
+                parts.append(" " if node.tag in ("br", "p", "div", "li") else "")
+                stack.extend(reversed(node.children))
+        return " ".join("".join(parts).split())
+
+    @property
+    def is_displayed(self) -> bool:
+        for element in (self, *self.ancestors()):
+            if isinstance(element, Document):
+                break
+            if element.tag in NOT_RENDERED_ELEMENTS or "hidden" in element.attributes or HIDDEN_STYLE_RE.search(element.attributes.get("style", "")):
+                return False
+            if element.tag == "input" and element.attributes.get("type", "").lower() == "hidden":
+                return False
+        return True
+
+
+class Document(Element):
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        super().__init__("#document", {}, None)
+
+    @property
+    def title(self) -> str:
+        title = next((element for element in self.element_descendants() if element.tag == "title"), None)
+        return title.string_value.strip() if title is not None else ""
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.document = Document()
+        self.stack: t.List[Element] = [self.document]
+
+    def _append(self, tag: str, attrs: t.List[t.Tuple[str, t.Optional[str]]]) -> Element:
+        attributes: t.Dict[str, str] = {}
+        for name, value in attrs:
+            attributes.setdefault(name, value or "")
+        element = Element(tag, attributes, self.stack[-1])
+        self.stack[-1].children.append(element)
+        return element
+
+    def handle_starttag(self, tag: str, attrs: t.List[t.Tuple[str, t.Optional[str]]]) -> None:
+        element = self._append(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(element)
+
+    def handle_startendtag(self, tag: str, attrs: t.List[t.Tuple[str, t.Optional[str]]]) -> None:
+        self._append(tag, attrs)
+
+    def handle_endtag(self, tag: str) -> None:
+        for index in range(len(self.stack) - 1, 0, -1):
+            if self.stack[index].tag == tag:
+                if tag == "textarea":
+                    self.stack[index].value = self.stack[index].string_value
+                del self.stack[index:]
+                return
+
+    def handle_data(self, data: str) -> None:
+        parent = self.stack[-1]
+        if parent.children and isinstance(parent.children[-1], Text):
+            parent.children[-1].data += data
+        else:
+            parent.children.append(Text(data, parent))
+
+
+def parse_html(html: str) -> Document:
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    for order, node in enumerate(builder.document.descendants(), start=1):
+        node.order = order
+    return builder.document
+
+
+### XPATH ###
+
+
+class XPathError(ValueError):
+    pass
+
+
+XPATH_TOKEN_RE = re.compile(
+    r"""\s*(?:
+    (?P<literal>"[^"]*"|'[^']*')
+    |(?P<number>\d+(?:\.\d*)?|\.\d+)
+    |(?P<operator>//|::|\.\.|!=|<=|>=|[/()\[\]@,|=<>.*])
+    |(?P<name>[A-Za-z_][\w.-]*)
+    )""",
+    re.X,
+)
+XPATH_AXES = (
+    "ancestor",
+    "ancestor-or-self",
+    "attribute",
+    "child",
+    "descendant",
+    "descendant-or-self",
+    "following-sibling",
+    "parent",
+    "preceding-sibling",
+    "self",
+)
+XPathValue = t.Union[t.List[Node], str, float, bool]
+Context = t.Tuple[Node, int, int]  # node, position, size
+Evaluator = t.Callable[[Context], XPathValue]
+
+
+def string_value(value: XPathValue) -> str:
+    if isinstance(value, list):
+        return value[0].string_value if value else ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else str(value)
+    return value
+
+
+def number_value(value: XPathValue) -> float:
+    if isinstance(value, (list, str)):
+        try:
+            return float(string_value(value).strip())
+        except ValueError:
+            return math.nan
+    return float(value)
+
+
+def boolean_value(value: XPathValue) -> bool:
+    if isinstance(value, float):
+        return value != 0 and not math.isnan(value)
+    return bool(value)
+
+
+def _compare_atoms(operator: str, left: XPathValue, right: XPathValue) -> bool:
+    if operator in ("=", "!="):
+        if isinstance(left, bool) or isinstance(right, bool):
+            left, right = boolean_value(left), boolean_value(right)
+        elif isinstance(left, float) or isinstance(right, float):
+            left, right = number_value(left), number_value(right)
+        return (left == right) if operator == "=" else (left != right)
+    left, right = number_value(left), number_value(right)
+    return {"<": left < right, ">": left > right, "<=": left <= right, ">=": left >= right}[operator]
+
+
+def _compare(operator: str, left: XPathValue, right: XPathValue) -> bool:
+    if isinstance(left, list) and isinstance(right, bool) or isinstance(right, list) and isinstance(left, bool):
+        return _compare_atoms(operator, boolean_value(left), boolean_value(right))
+    if isinstance(left, list):
+        return any(_compare(operator, number_value(node.string_value) if isinstance(right, float) else node.string_value, right) for node in left)
+    if isinstance(right, list):
+        return any(_compare(operator, left, number_value(node.string_value) if isinstance(left, float) else node.string_value) for node in right)
+    return _compare_atoms(operator, left, right)
+
+
+def _document_order(nodes: t.Iterable[Node]) -> t.List[Node]:
+    unique = {id(node): node for node in nodes}
+    return sorted(unique.values(), key=lambda node: node.order)
+
+
+def _axis(axis: str, node: Node) -> t.Iterator[Node]:
+    """Nodes of the axis in proximity order"""
+    if axis == "child":
+        return iter(node.children) if isinstance(node, Element) else iter(())
+    if axis == "descendant":
+        return node.descendants() if isinstance(node, Element) else iter(())
+    if axis == "descendant-or-self":
+        return iter((node, *node.descendants())) if isinstance(node, Element) else iter((node,))
+    if axis == "self":
+        return iter((node,))
+    if axis == "parent":
+        return iter((node.parent,) if node.parent is not None else ())
+    if axis == "ancestor":
+        return node.ancestors()
+    if axis == "ancestor-or-self":
+        return iter((node, *node.ancestors()))
+    if axis in ("following-sibling", "preceding-sibling"):
+        if node.parent is None or isinstance(node, Attribute):
+            return iter(())
+        siblings = node.parent.children
+        index = next(index for index, sibling in enumerate(siblings) if sibling is node)
+        return iter(siblings[index + 1 :]) if axis == "following-sibling" else iter(reversed(siblings[:index]))
+    if axis == "attribute":
+        return iter([Attribute(name, value, node) for name, value in node.attributes.items()] if isinstance(node, Element) and not isinstance(node, Document) else ())
+    raise XPathError(f"Unsupported axis: {axis}")
+
+
+def _node_test(axis: str, test: str) -> t.Callable[[Node], bool]:
+    if test == "node()":
+        return lambda node: True
+    if test == "text()":
+        return lambda node: isinstance(node, Text)
+    if axis == "attribute":
+        return (lambda node: True) if test == "*" else (lambda node: node.name == test)
+    if test == "*":
+        return lambda node: isinstance(node, Element) and not isinstance(node, Document)
+    return lambda node: isinstance(node, Element) and node.tag == test
+
+
+def _node_set(value: XPathValue) -> t.List[Node]:
+    if not isinstance(value, list):
+        raise XPathError("Expression is not a node-set")
+    return value
+
+
+def _function(name: str, args: t.List[Evaluator]) -> Evaluator:
+    def arg(index: int, context: Context) -> XPathValue:
+        return args[index](context) if index < len(args) else [context[0]]
+
+    functions: t.Dict[str, Evaluator] = {
+        "last": lambda context: float(context[2]),
+        "position": lambda context: float(context[1]),
+        "count": lambda context: float(len(_node_set(arg(0, context)))),
+        "string": lambda context: string_value(arg(0, context)),
+        "number": lambda context: number_value(arg(0, context)),
+        "boolean": lambda context: boolean_value(arg(0, context)),
+        "not": lambda context: not boolean_value(arg(0, context)),
+        "true": lambda context: True,
+        "false": lambda context: False,
+        "concat": lambda context: "".join(string_value(argument(context)) for argument in args),
+        "contains": lambda context: string_value(arg(1, context)) in string_value(arg(0, context)),
+        "starts-with": lambda context: string_value(arg(0, context)).startswith(string_value(arg(1, context))),
+        "ends-with": lambda context: string_value(arg(0, context)).endswith(string_value(arg(1, context))),
+        "normalize-space": lambda context: " ".join(string_value(arg(0, context)).split()),
+        "string-length": lambda context: float(len(string_value(arg(0, context)))),
+        "name": lambda context: next((getattr(node, "tag", getattr(node, "name", "")) for node in _node_set(arg(0, context))), ""),
+        "local-name": lambda context: next((getattr(node, "tag", getattr(node, "name", "")) for node in _node_set(arg(0, context))), ""),
+    }
+    if name not in functions:
+        raise XPathError(f"Unsupported function: {name}()")
+    return functions[name]
+
+
+class _XPathParser:
+    """Recursive descent parser compiling xpath into evaluator closures"""
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+        self.tokens: t.List[t.Tuple[str, str]] = []
+        position = 0
+        expression = expression.rstrip()
+        while position < len(expression):
+            match = XPATH_TOKEN_RE.match(expression, position)
+            if not match or match.end() == position:
+                raise XPathError(f"Invalid xpath expression: {self.expression}")
+            kind = match.lastgroup
+            self.tokens.append((kind, match.group(kind)))
+            position = match.end()
+        self.position = 0
+
+    def peek(self, offset: int = 0) -> t.Tuple[str, str]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else ("end", "")
+
+    def next(self) -> t.Tuple[str, str]:
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def accept(self, value: str) -> bool:
+        if self.peek() in (("operator", value), ("name", value)):
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, value: str) -> None:
+        if not self.accept(value):
+            raise XPathError(f"Expected '{value}' in xpath expression: {self.expression}")
+
+    def parse(self) -> Evaluator:
+        evaluator = self.parse_or()
+        if self.peek()[0] != "end":
+            raise XPathError(f"Unexpected '{self.peek()[1]}' in xpath expression: {self.expression}")
+        return evaluator
+
+    def parse_or(self) -> Evaluator:
+        left = self.parse_and()
+        while self.accept("or"):
+            right, previous = self.parse_and(), left
+            left = lambda context, left=previous, right=right: boolean_value(left(context)) or boolean_value(right(context))  # noqa: E731
+        return left
+
+    def parse_and(self) -> Evaluator:
+        left = self.parse_comparison()
+        while self.accept("and"):
+            right, previous = self.parse_comparison(), left
+            left = lambda context, left=previous, right=right: boolean_value(left(context)) and boolean_value(right(context))  # noqa: E731
+        return left
+
+    def parse_comparison(self) -> Evaluator:
+        left = self.parse_union()
+        while self.peek()[0] == "operator" and self.peek()[1] in ("=", "!=", "<", ">", "<=", ">="):
+            operator = self.next()[1]
+            right, previous = self.parse_union(), left
+            left = lambda context, left=previous, right=right, operator=operator: _compare(operator, left(context), right(context))  # noqa: E731
+        return left
+
+    def parse_union(self) -> Evaluator:
+        left = self.parse_path()
+        while self.accept("|"):
+            right, previous = self.parse_path(), left
+            left = lambda context, left=previous, right=right: _document_order(_node_set(left(context)) + _node_set(right(context)))  # noqa: E731
+        return left
+
+    def parse_path(self) -> Evaluator:
+        kind, value = self.peek()
+        if (kind, value) in (("operator", "/"), ("operator", "//")):
+            self.next()
+            steps = [] if value == "/" else [self.descendant_or_self_step()]
+            if value == "//" or self.starts_step():
+                steps += self.parse_relative_path()
+            return self.path_evaluator(lambda context: [_root(context[0])], steps)
+        if kind in ("literal", "number") or (kind, value) == ("operator", "(") or (kind == "name" and self.peek(1) == ("operator", "(") and value not in ("text", "node")):
+            primary = self.parse_filter()
+            if self.peek() in (("operator", "/"), ("operator", "//")):
+                return self.path_evaluator(primary, self.parse_relative_path(continued=True))
+            return primary
+        return self.path_evaluator(lambda context: [context[0]], self.parse_relative_path())
+
+    def starts_step(self) -> bool:
+        kind, value = self.peek()
+        return kind == "name" or value in (".", "..", "@", "*")
+
+    def parse_filter(self) -> Evaluator:
+        kind, value = self.next()
+        if kind == "literal":
+            primary: Evaluator = lambda context, value=value[1:-1]: value  # noqa: E731
+        elif kind == "number":
+            primary = lambda context, value=float(value): value  # noqa: E731
+        elif value == "(":
+            primary = self.parse_or()
+            self.expect(")")
+        else:
+            self.expect("(")
+            args = []
+            if not self.accept(")"):
+                args.append(self.parse_or())
+                while self.accept(","):
+                    args.append(self.parse_or())
+                self.expect(")")
+            primary = _function(value, args)
+        predicates = self.parse_predicates()
+        if not predicates:
+            return primary
+        return lambda context: _apply_predicates(_node_set(primary(context)), predicates)
+
+    def parse_relative_path(self, continued: bool = False) -> t.List[t.Callable[[t.List[Node]], t.List[Node]]]:
+        steps = []
+        if not continued:
+            steps.append(self.parse_step())
+        while self.peek() in (("operator", "/"), ("operator", "//")):
+            if self.next()[1] == "//":
+                steps.append(self.descendant_or_self_step())
+            steps.append(self.parse_step())
+        return steps
+
+    @staticmethod
+    def descendant_or_self_step() -> t.Callable[[t.List[Node]], t.List[Node]]:
+        return _step("descendant-or-self", "node()", [])
+
+    def parse_step(self) -> t.Callable[[t.List[Node]], t.List[Node]]:
+        if self.accept("."):
+            return _step("self", "node()", [])
+        if self.accept(".."):
+            return _step("parent", "node()", [])
+        axis = "child"
+        if self.accept("@"):
+            axis = "attribute"
+        elif self.peek()[0] == "name" and self.peek(1) == ("operator", "::"):
+            axis = self.next()[1]
+            self.next()
+            if axis not in XPATH_AXES:
+                raise XPathError(f"Unsupported axis: {axis}")
+        kind, value = self.next()
+        if (kind, value) == ("operator", "*"):
+            test = "*"
+        elif kind == "name":
+            test = value
+            if value in ("text", "node") and self.accept("("):
+                self.expect(")")
+                test = f"{value}()"
+        else:
+            raise XPathError(f"Unexpected '{value}' in xpath expression: {self.expression}")
+        return _step(axis, test, self.parse_predicates())
+
+    def parse_predicates(self) -> t.List[Evaluator]:
+        predicates = []
+        while self.accept("["):
+            predicates.append(self.parse_or())
+            self.expect("]")
+        return predicates
+
+    @staticmethod
+    def path_evaluator(start: Evaluator, steps: t.List[t.Callable[[t.List[Node]], t.List[Node]]]) -> Evaluator:
+        def evaluate(context: Context) -> t.List[Node]:
+            nodes = _node_set(start(context))
+            for step in steps:
+                nodes = step(nodes)
+            return nodes
+
+        return evaluate
+
+
+def _root(node: Node) -> Node:
+    for node in (node, *node.ancestors()):
+        if node.parent is None:
+            return node
+    return node
+
+
+def _apply_predicates(nodes: t.List[Node], predicates: t.List[Evaluator]) -> t.List[Node]:
+    for predicate in predicates:
+        size = len(nodes)
+        selected = []
+        for position, node in enumerate(nodes, start=1):
+            result = predicate((node, position, size))
+            if result == position if isinstance(result, float) else boolean_value(result):
+                selected.append(node)
+        nodes = selected
+    return nodes
+
+
+def _step(axis: str, test: str, predicates: t.List[Evaluator]) -> t.Callable[[t.List[Node]], t.List[Node]]:
+    node_test = _node_test(axis, test)
+
+    def step(nodes: t.List[Node]) -> t.List[Node]:
+        result = []
+        for node in nodes:
+            result.extend(_apply_predicates([candidate for candidate in _axis(axis, node) if node_test(candidate)], predicates))
+        return _document_order(result) if len(nodes) > 1 or axis in ("ancestor", "ancestor-or-self", "preceding-sibling") else result
+
+    return step
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_xpath_expression(expression: str) -> Evaluator:
+    return _XPathParser(expression).parse()
+
+
+def xpath_evaluate(expression: str, context_node: Node) -> XPathValue:
+    return compile_xpath_expression(expression)((context_node, 1, 1))
+
+
+def xpath_select(expression: str, context_node: Node) -> t.List[Element]:
+    """Elements found by xpath (document.evaluate with ORDERED_NODE_SNAPSHOT_TYPE)"""
+    return [node for node in _node_set(xpath_evaluate(expression, context_node)) if isinstance(node, Element)]
+
+
+### CSS ###
+
+CSS_TOKEN_RE = re.compile(
+    r"""
+    (?P<combinator>\s*[>+~,]\s*|\s+)
+    |(?P<tag>[a-zA-Z][\w-]*|\*)
+    |\#(?P<id>[\w-]+)
+    |\.(?P<class>[\w-]+)
+    |\[\s*(?P<attribute>[\w-]+)\s*(?:(?P<operator>[~|^$*]?=)\s*(?:"(?P<double_quoted>(?:[^"\\]|\\.)*)"|'(?P<single_quoted>(?:[^'\\]|\\.)*)'|(?P<bare>[\w-]+))\s*)?\]
+    |:(?P<pseudo>scope)
+    """,
+    re.X,
+)
+CSS_OPERATORS: t.Dict[str, t.Callable[[str, str], bool]] = {
+    "=": lambda actual, expected: actual == expected,
+    "*=": lambda actual, expected: bool(expected) and expected in actual,
+    "^=": lambda actual, expected: bool(expected) and actual.startswith(expected),
+    "$=": lambda actual, expected: bool(expected) and actual.endswith(expected),
+    "~=": lambda actual, expected: expected in actual.split(),
+    "|=": lambda actual, expected: actual == expected or actual.startswith(expected + "-"),
+}
+Compound = t.List[t.Callable[[Element, Element], bool]]  # checks of (element, scope)
+Complex = t.List[t.Tuple[str, Compound]]  # (combinator before compound, compound)
+
+
+def _css_attribute_check(name: str, operator: t.Optional[str], value: str) -> t.Callable[[Element, Element], bool]:
+    if operator is None:
+        return lambda element, scope: name in element.attributes
+    compare = CSS_OPERATORS[operator]
+    return lambda element, scope: name in element.attributes and compare(element.attributes[name], value)
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_css_selector(selector: str) -> t.List[Complex]:
+    selectors: t.List[Complex] = []
+    current: Complex = []
+    compound: t.Optional[Compound] = None
+    combinator = " "
+    position = 0
+    selector = selector.strip()
+    while position < len(selector):
+        match = CSS_TOKEN_RE.match(selector, position)
+        if not match:
+            raise ValueError(f"Invalid css selector: {selector}")
+        position = match.end()
+        if match.group("combinator") is not None:
+            if compound is None:
+                raise ValueError(f"Invalid css selector: {selector}")
+            current.append((combinator, compound))
+            compound, combinator = None, match.group("combinator").strip() or " "
+            if combinator == ",":
+                selectors.append(current)
+                current, combinator = [], " "
+            continue
+        if compound is None:
+            compound = []
+        if match.group("tag"):
+            tag = match.group("tag").lower()
+            if tag != "*":
+                compound.append(lambda element, scope, tag=tag: element.tag == tag)
+        elif match.group("id"):
+            compound.append(_css_attribute_check("id", "=", match.group("id")))
+        elif match.group("class"):
+            compound.append(_css_attribute_check("class", "~=", match.group("class")))
+        elif match.group("attribute"):
+            raw_value = next((value for value in match.group("double_quoted", "single_quoted", "bare") if value is not None), "")
+            compound.append(_css_attribute_check(match.group("attribute").lower(), match.group("operator"), re.sub(r"\\(.)", r"\1", raw_value)))
+        else:
+            compound.append(lambda element, scope: element is scope)
+    if compound is None:
+        raise ValueError(f"Invalid css selector: {selector}")
+    current.append((combinator, compound))
+    selectors.append(current)
+    return selectors
+
+
+def _css_matches(element: Element, selector: Complex, index: int, scope: Element) -> bool:
+    combinator, compound = selector[index]
+    if isinstance(element, Document) and not (element is scope and compound):
+        return False
+    if not all(check(element, scope) for check in compound):
+        return False
+    if index == 0:
+        return True
+    combinator = selector[index][0]
+    if combinator == ">":
+        return element.parent is not None and _css_matches(element.parent, selector, index - 1, scope)
+    if combinator == " ":
+        return any(_css_matches(ancestor, selector, index - 1, scope) for ancestor in element.ancestors())
+    siblings = [sibling for sibling in element.parent.children if isinstance(sibling, Element)] if element.parent is not None else []
+    previous = siblings[: next(position for position, sibling in enumerate(siblings) if sibling is element)]
+    if combinator == "+":
+        return bool(previous) and _css_matches(previous[-1], selector, index - 1, scope)
+    return any(_css_matches(sibling, selector, index - 1, scope) for sibling in previous)
+
+
+def css_select(selector: str, context: Element) -> t.List[Element]:
+    """Elements found by css selector (querySelectorAll of the context, :scope is the context element)"""
+    selectors = compile_css_selector(selector)
+    return [element for element in context.element_descendants() if any(_css_matches(element, complex_selector, len(complex_selector) - 1, context) for complex_selector in selectors)]
@@ -0,0 +1,451 @@
+import base64
+import itertools
+import logging
+import re
+import struct
+import time
+import typing as t
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+from urllib.request import url2pathname
+
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.common.options import ArgOptions
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webdriver import WebDriver
+
+import definitions
+from core import js_scripts
+from core.auth_cache import GET_STORAGE_SCRIPT, SET_STORAGE_SCRIPT
+from core.fake_dom import Document, Element, XPathError, css_select, parse_html, xpath_select
+from utils.config import get_frozen_config
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"  # W3C web element reference
+BOOLEAN_ATTRIBUTES = {"checked", "disabled", "hidden", "multiple", "readonly", "required", "selected", "autofocus"}
+ELEMENT_METHOD_SCRIPT_RE = re.compile(r"return arguments\[0\]\.(\w+)\(.*\);?", re.S)  # BaseClass.execute_script
+
+
+def _png(width: int, height: int) -> bytes:
+    """Blank gray png image"""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    rows = b"".join(b"\x00" + b"\xee" * width for _ in range(height))
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+SCREENSHOT = base64.b64encode(_png(64, 36)).decode()
+
+
+class FakeDriverError(Exception):
+    def __init__(self, error: str, message: str) -> None:
+        super().__init__(message)
+        self.error = error
+        self.message = message
+
+
+@dataclass
+class FakeWindow:
+    url: str = "about:blank"
+    document: Document = field(default_factory=Document)
+    source: str = ""
+    history: t.List[str] = field(default_factory=list)  # loaded urls, oldest first
+    session_storage: t.Dict[str, t.Dict[str, str]] = field(default_factory=dict)  # origin -> items, sessionStorage is per tab
+
+
+class FakeCommandExecutor:
+    """
+    Stand-in of RemoteConnection which executes W3C commands in-process against in-memory DOM of static html pages.
+    Page scripts are not executed: scripts of core.js_scripts (and other scripts of the framework) are emulated in python,
+    any other script fails with "javascript error". Every command may be delayed to emulate browser/grid round-trip.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, pages: t.Dict[str, Path], latency_ms: float = 0, command_latency_ms: t.Optional[t.Dict[str, float]] = None) -> None:
+        """
+        :param pages: dict - url path -> html file served for it (file:// urls are loaded directly)
+        :param latency_ms: float - emulated round-trip of every command
+        :param command_latency_ms: dict - command name (selenium Command value) -> its round-trip
+        """
+        self.pages = pages
+        self.latency_ms = latency_ms
+        self.command_latency_ms = command_latency_ms or {}
+        self.windows: t.Dict[str, FakeWindow] = {}
+        self.current_window = ""
+        self.cookies: t.Dict[str, t.Dict[str, t.Any]] = {}
+        self.local_storage: t.Dict[str, t.Dict[str, str]] = {}  # origin -> items, localStorage is shared by the tabs
+        self.window_rect = {"x": 0, "y": 0, "width": 1920, "height": 1080}
+        self.elements: t.Dict[str, Element] = {}
+        self.element_ids: t.Dict[int, str] = {}
+        self._ids = itertools.count(1)
+
+    def execute(self, command: str, params: t.Optional[t.Dict] = None) -> t.Dict[str, t.Any]:
+        latency_ms = self.command_latency_ms.get(command, self.latency_ms)
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        handler = self._handlers.get(command)
+        try:
+            if handler is None:
+                raise FakeDriverError("unknown command", f"Command is not supported by fake driver: {command}")
+            return {"value": handler(self, params or {})}
+        except FakeDriverError as e:
+            return {"status": e.error, "value": {"error": e.error, "message": e.message}}
+
+    def close(self) -> None:
+        pass
+
+    # state
+
+    @property
+    def window(self) -> FakeWindow:
+        if self.current_window not in self.windows:
+            raise FakeDriverError("no such window", "Current window is closed")
+        return self.windows[self.current_window]
+
+    @staticmethod
+    def origin(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    def _storage(self) -> t.Tuple[t.Dict[str, str], t.Dict[str, str]]:
+        """localStorage and sessionStorage of the current page origin"""
+        origin = self.origin(self.window.url)
+        return self.local_storage.setdefault(origin, {}), self.window.session_storage.setdefault(origin, {})
+
+    def _new_window(self) -> str:
+        handle = uuid.uuid4().hex.upper()
+        self.windows[handle] = FakeWindow()
+        return handle
+
+    def _load(self, url: str) -> None:
+        parsed = urlparse(url)
+        path = Path(url2pathname(parsed.path)) if parsed.scheme == "file" else self.pages.get(parsed.path or "/")
+        if path is None and url != "about:blank":
+            self.logger.warning("Fake driver has no page for url: %s", url)
+        source = path.read_text(encoding="utf-8") if path is not None else ""
+        window = self.window
+        stale_ids = [element_id for element_id, element in self.elements.items() if self._document(element) is window.document]
+        for element_id in stale_ids:
+            self.element_ids.pop(id(self.elements.pop(element_id)), None)
+        window.url, window.source, window.document = url, source, parse_html(source)
+        window.history.append(url)
+
+    @staticmethod
+    def _document(element: Element) -> Element:
+        for node in (element, *element.ancestors()):
+            if node.parent is None:
+                return node
+        return element
+
+    def _reference(self, element: Element) -> t.Dict[str, str]:
+        element_id = self.element_ids.get(id(element))
+        if element_id is None:
+            element_id = self.element_ids[id(element)] = f"fake-element-{next(self._ids)}"
+            self.elements[element_id] = element
+        return {ELEMENT_KEY: element_id}
+
+    def _element(self, element_id: str) -> Element:
+        element = self.elements.get(element_id)
+        if element is None or self._document(element) is not self.window.document:
+            raise FakeDriverError("stale element reference", f"Element {element_id} is not attached to the page document")
+        return element
+
+    def _wrap(self, value: t.Any) -> t.Any:
+        if isinstance(value, Element):
+            return self._reference(value)
+        if isinstance(value, (list, tuple)):
+            return [self._wrap(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self._wrap(item) for key, item in value.items()}
+        return value
+
+    def _unwrap(self, value: t.Any) -> t.Any:
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                return self._element(value[ELEMENT_KEY])
+            return {key: self._unwrap(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._unwrap(item) for item in value]
+        return value
+
+    # DOM helpers
+
+    def _find(self, using: str, value: str, context: Element) -> t.List[Element]:
+        try:
+            if using == "xpath":
+                return xpath_select(value, context)
+            if using == "css selector":
+                return css_select(value, context)
+            if using == "tag name":
+                return [element for element in context.element_descendants() if element.tag == value.lower()]
+        except (XPathError, ValueError) as e:
+            raise FakeDriverError("invalid selector", str(e))
+        raise FakeDriverError("invalid argument", f"Unsupported locator strategy: {using}")
+
+    def _property(self, element: Element, name: str) -> t.Any:
+        if name == "value":
+            return element.value
+        if name == "checked":
+            return element.checked
+        if name in ("innerText", "text"):
+            return element.inner_text
+        if name == "textContent":
+            return element.string_value
+        if name == "tagName":
+            return element.tag.upper()
+        if name == "className":
+            return element.attributes.get("class", "")
+        if name in ("src", "href"):
+            return urljoin(self.window.url, element.attributes[name]) if name in element.attributes else ""
+        if name in BOOLEAN_ATTRIBUTES:
+            return name in element.attributes
+        return element.attributes.get(name)
+
+    def _attribute(self, element: Element, name: str) -> t.Optional[str]:
+        """WebElement.get_attribute: property if it is set, attribute otherwise"""
+        name = name.lower()
+        if name in BOOLEAN_ATTRIBUTES or name == "checked":
+            return "true" if (element.checked if name == "checked" else name in element.attributes) else None
+        if name == "class":
+            return element.attributes.get("class")
+        if name in ("value", "src", "href") and (name == "value" or name in element.attributes):
+            return self._property(element, name)
+        return element.attributes.get(name)
+
+    def _read(self, element: Element, attribute: str) -> t.Any:
+        """read() of GET_ELEMENTS_VALUES script"""
+        if attribute == "text":
+            return element.inner_text
+        if attribute in ("value", "checked", "innerText", "textContent", "tagName", "className", "src", "href", "id"):
+            return self._property(element, attribute)
+        return element.attributes.get(attribute)
+
+    def _state_holds(self, xpath: str, state: str) -> bool:
+        elements = self._find("xpath", xpath, self.window.document)
+        if state == "appear":
+            return bool(elements)
+        if state == "disappear":
+            return not elements
+        if state == "visible":
+            return bool(elements) and elements[0].is_displayed
+        if state == "invisible":
+            return not elements or not elements[0].is_displayed
+        raise FakeDriverError("javascript error", f"Unknown element state: {state}")
+
+    # scripts
+
+    def _script_get_elements_values(self, fields: t.Dict[str, t.List[str]], root_xpath: t.Optional[str]) -> t.Any:
+        def read_fields(context: Element) -> t.Dict[str, t.Any]:
+            result: t.Dict[str, t.Any] = {"values": {}, "missing": [], "hidden": []}
+            for name, (xpath, attribute) in fields.items():
+                elements = self._find("xpath", xpath, context)
+                if not elements:
+                    result["missing"].append(name)
+                elif attribute == "text" and not elements[0].is_displayed:
+                    result["hidden"].append(name)
+                result["values"][name] = self._read(elements[0], attribute) if elements else None
+            return result
+
+        if not root_xpath:
+            return read_fields(self.window.document)
+        return [read_fields(root) for root in self._find("xpath", root_xpath, self.window.document)]
+
+    def _script_set_input_value(self, element: Element, value: str) -> str:
+        element.value = value
+        return element.value
+
+    def _script_wait_for_elements_state(self, xpaths: t.List[str], state: str, timeout_ms: int) -> t.List[bool]:
+        statuses = [self._state_holds(xpath, state) for xpath in xpaths]
+        if not all(statuses):
+            # static page doesn't change while the script runs: one polling interval, the caller checks again until its own timeout
+            time.sleep(min(definitions.polling_timeout * 1000, timeout_ms) / 1000)
+        return statuses
+
+    def _script_wait_page_settle(self, quiet_ms: int, timeout_ms: int) -> bool:
+        time.sleep(min(quiet_ms, timeout_ms) / 1000)
+        return True
+
+    def _script_check_cached_element(self, element: Element, xpath: str, state: str) -> bool:
+        elements = self._find("xpath", xpath, self.window.document)
+        if not elements or elements[0] is not element:
+            return False
+        return state == "present" or (element.is_displayed and (state == "visible" or "disabled" not in element.attributes))
+
+    def _script_open_new_window(self) -> None:
+        self._new_window()
+
+    def _script_clear_storage(self) -> None:
+        for storage in self._storage():
+            storage.clear()
+
+    def _script_get_storage(self) -> t.Dict[str, t.Dict[str, str]]:
+        local, session = self._storage()
+        return {"local": dict(local), "session": dict(session)}
+
+    def _script_set_storage(self, local_storage: t.Dict[str, str], session_storage: t.Dict[str, str]) -> None:
+        local, session = self._storage()
+        local.update(local_storage)
+        session.update(session_storage)
+
+    _scripts: t.Dict[str, t.Callable[..., t.Any]] = {
+        js_scripts.GET_ELEMENTS_VALUES: _script_get_elements_values,
+        js_scripts.SET_INPUT_VALUE: _script_set_input_value,
+        js_scripts.FOCUS_AND_SELECT: lambda self, element: None,
+        js_scripts.INSTALL_PAGE_TRACKER: lambda self: None,  # page scripts are not executed, nothing to track
+        js_scripts.CHECK_CACHED_ELEMENT: _script_check_cached_element,
+        js_scripts.OPEN_NEW_WINDOW: _script_open_new_window,
+        js_scripts.CLEAR_STORAGE: _script_clear_storage,
+        js_scripts.RELOAD_BROKEN_IMAGES: lambda self: None,  # requests are not blocked, images are never broken
+        js_scripts.GET_DOM_SNAPSHOT: lambda self: self.window.source,  # page scripts are not executed, so DOM is the loaded source
+        GET_STORAGE_SCRIPT: _script_get_storage,
+        SET_STORAGE_SCRIPT: _script_set_storage,
+    }
+    _async_scripts: t.Dict[str, t.Callable[..., t.Any]] = {
+        js_scripts.WAIT_FOR_ELEMENTS_STATE: _script_wait_for_elements_state,
+        js_scripts.WAIT_PAGE_SETTLE: _script_wait_page_settle,
+    }
+
+    def _run_script(self, script: str, args: t.List[t.Any], is_async: bool) -> t.Any:
+        handler = (self._async_scripts if is_async else self._scripts).get(script)
+        if handler is not None:
+            return handler(self, *args)
+        # selenium atoms of WebElement.get_attribute/is_displayed and get_property fallback
+        if script.startswith("/* getAttribute */"):
+            return self._attribute(args[0], args[1])
+        if script.startswith("/* isDisplayed */"):
+            return args[0].is_displayed
+        if script == "return arguments[0][arguments[1]]":
+            return self._property(args[0], args[1])
+        match = ELEMENT_METHOD_SCRIPT_RE.fullmatch(script.strip())
+        if match and match.group(1) in ("scrollIntoView", "focus", "blur"):
+            return None
+        if match and match.group(1) == "click":
+            return self._click(args[0])
+        raise FakeDriverError("javascript error", f"Script is not supported by fake driver: {script[:100]}")
+
+    # element actions
+
+    def _click(self, element: Element) -> None:
+        if element.tag == "input" and element.attributes.get("type", "").lower() in ("checkbox", "radio"):
+            element.checked = not element.checked if element.attributes["type"].lower() == "checkbox" else True
+        link = next((node for node in (element, *element.ancestors()) if isinstance(node, Element) and node.tag == "a" and "href" in node.attributes), None)
+        if link is not None and not link.attributes["href"].startswith(("#", "javascript:")):
+            self._load(urljoin(self.window.url, link.attributes["href"]))
+
+    @staticmethod
+    def _type(element: Element, text: str) -> None:
+        modifier, selected = False, False
+        value = element.value
+        for char in text:
+            if char in (Keys.CONTROL, Keys.COMMAND):
+                modifier = True
+            elif char == Keys.NULL:
+                modifier = False
+            elif modifier and char.lower() == "a":
+                selected = True
+            elif char in (Keys.BACKSPACE, Keys.DELETE):
+                value, selected = ("" if selected else value[:-1] if char == Keys.BACKSPACE else value), False
+            elif "\ue000" <= char <= "\uf8ff":  # other special keys (ENTER, arrows, etc.)
+                continue
+            elif not modifier:
+                value, selected = ("" if selected else value) + char, False
+        element.value = value
+
+    # command handlers
+
+    def _new_session(self, params: t.Dict) -> t.Dict[str, t.Any]:
+        self.current_window = self._new_window()
+        return {"sessionId": uuid.uuid4().hex, "capabilities": {"browserName": "fake", "browserVersion": "1.0", "platformName": "any"}}
+
+    def _find_element(self, params: t.Dict) -> t.Dict[str, str]:
+        elements = self._find_elements(params)
+        if not elements:
+            raise FakeDriverError("no such element", f"Unable to locate element: {params['value']}")
+        return elements[0]
+
+    def _find_elements(self, params: t.Dict) -> t.List[t.Dict[str, str]]:
+        context = self._element(params["id"]) if "id" in params else self.window.document
+        return [self._reference(element) for element in self._find(params["using"], params["value"], context)]
+
+    def _switch_to_window(self, params: t.Dict) -> None:
+        if params["handle"] not in self.windows:
+            raise FakeDriverError("no such window", f"No window with handle: {params['handle']}")
+        self.current_window = params["handle"]
+
+    def _close_window(self, params: t.Dict) -> t.List[str]:
+        self.windows.pop(self.current_window, None)
+        return list(self.windows)
+
+    def _new_window_command(self, params: t.Dict) -> t.Dict[str, str]:
+        return {"handle": self._new_window(), "type": params.get("type", "tab")}
+
+    def _get_named_cookie(self, params: t.Dict) -> t.Dict[str, t.Any]:
+        if params["name"] not in self.cookies:
+            raise FakeDriverError("no such cookie", f"No cookie with name: {params['name']}")
+        return self.cookies[params["name"]]
+
+    def _set_window_rect(self, params: t.Dict) -> t.Dict[str, int]:
+        self.window_rect.update({key: value for key, value in params.items() if value is not None})
+        return self.window_rect
+
+    _handlers: t.Dict[str, t.Callable[["FakeCommandExecutor", t.Dict], t.Any]] = {
+        Command.NEW_SESSION: _new_session,
+        Command.QUIT: lambda self, params: None,
+        Command.GET: lambda self, params: self._load(params["url"]),
+        Command.REFRESH: lambda self, params: self._load(self.window.url),
+        Command.GET_CURRENT_URL: lambda self, params: self.window.url,
+        Command.GET_TITLE: lambda self, params: self.window.document.title,
+        Command.GET_PAGE_SOURCE: lambda self, params: self.window.source,
+        Command.FIND_ELEMENT: _find_element,
+        Command.FIND_ELEMENTS: _find_elements,
+        Command.FIND_CHILD_ELEMENT: _find_element,
+        Command.FIND_CHILD_ELEMENTS: _find_elements,
+        Command.GET_ELEMENT_TEXT: lambda self, params: self._element(params["id"]).inner_text,
+        Command.GET_ELEMENT_TAG_NAME: lambda self, params: self._element(params["id"]).tag,
+        Command.GET_ELEMENT_ATTRIBUTE: lambda self, params: self._element(params["id"]).attributes.get(params["name"]),
+        Command.GET_ELEMENT_PROPERTY: lambda self, params: self._property(self._element(params["id"]), params["name"]),
+        Command.GET_ELEMENT_RECT: lambda self, params: {"x": 0, "y": 0, "width": 100, "height": 20} if self._element(params["id"]).is_displayed else {"x": 0, "y": 0, "width": 0, "height": 0},
+        Command.IS_ELEMENT_ENABLED: lambda self, params: "disabled" not in self._element(params["id"]).attributes,
+        Command.IS_ELEMENT_SELECTED: lambda self, params: self._element(params["id"]).checked or "selected" in self._element(params["id"]).attributes,
+        Command.CLICK_ELEMENT: lambda self, params: self._click(self._element(params["id"])),
+        Command.CLEAR_ELEMENT: lambda self, params: setattr(self._element(params["id"]), "value", ""),
+        Command.SEND_KEYS_TO_ELEMENT: lambda self, params: self._type(self._element(params["id"]), params["text"]),
+        Command.ELEMENT_SCREENSHOT: lambda self, params: self._element(params["id"]) and SCREENSHOT,
+        Command.SCREENSHOT: lambda self, params: SCREENSHOT,
+        Command.W3C_EXECUTE_SCRIPT: lambda self, params: self._wrap(self._run_script(params["script"], self._unwrap(params.get("args", [])), is_async=False)),
+        Command.W3C_EXECUTE_SCRIPT_ASYNC: lambda self, params: self._wrap(self._run_script(params["script"], self._unwrap(params.get("args", [])), is_async=True)),
+        Command.W3C_GET_CURRENT_WINDOW_HANDLE: lambda self, params: self.window and self.current_window,
+        Command.W3C_GET_WINDOW_HANDLES: lambda self, params: list(self.windows),
+        Command.SWITCH_TO_WINDOW: _switch_to_window,
+        Command.CLOSE: _close_window,
+        Command.NEW_WINDOW: _new_window_command,
+        Command.GET_ALL_COOKIES: lambda self, params: list(self.cookies.values()),
+        Command.GET_COOKIE: _get_named_cookie,
+        Command.ADD_COOKIE: lambda self, params: self.cookies.__setitem__(params["cookie"]["name"], params["cookie"]),
+        Command.DELETE_COOKIE: lambda self, params: self.cookies.pop(params["name"], None) and None,
+        Command.DELETE_ALL_COOKIES: lambda self, params: self.cookies.clear(),
+        Command.SET_WINDOW_RECT: _set_window_rect,
+        Command.GET_WINDOW_RECT: lambda self, params: self.window_rect,
+        Command.SET_TIMEOUTS: lambda self, params: None,
+        Command.GET_LOG: lambda self, params: [],  # page scripts are not executed, so logs are always empty
+        Command.W3C_ACTIONS: lambda self, params: None,
+        Command.W3C_CLEAR_ACTIONS: lambda self, params: None,
+    }
+
+
+class FakeWebDriver(WebDriver):
+    """Selenium remote WebDriver connected to FakeCommandExecutor: real client side (WebElement, waits, ActionChains), no browser"""
+
+    def __init__(self, pages: t.Dict[str, Path], latency_ms: float = 0, command_latency_ms: t.Optional[t.Dict[str, float]] = None) -> None:
+        super().__init__(command_executor=FakeCommandExecutor(pages, latency_ms, command_latency_ms), options=ArgOptions())
+
+    @classmethod
+    def from_config(cls) -> "FakeWebDriver":
+        fake_options = get_frozen_config().get("fake_driver", None) or {}
+        pages = {url_path: definitions.root_path / file_path for url_path, file_path in (fake_options.get("pages", None) or {}).items()}
+        return cls(pages, float(fake_options.get("latency_ms", 0) or 0), dict(fake_options.get("command_latency_ms", None) or {}))
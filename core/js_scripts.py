@@ -0,0 +1,159 @@
+"""
+JavaScript snippets executed in the browser by BaseClass.
+Scripts are kept here (and not inlined) so every script has a single definition which may be recognized by name.
+"""
+
+# Async script. Waits until all elements (xpaths) are in the given state or timeout expires.
+# Condition is re-checked on every DOM mutation (and on a short interval for css-only changes),
+# so the wait returns right after the page reaches the state.
+# arguments: xpaths list, state ("appear", "disappear", "visible", "invisible"), timeout in ms
+# result: list of booleans - state per xpath
+WAIT_FOR_ELEMENTS_STATE = """
+const [xpaths, state, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const find = (xpath) => document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const isVisible = (el) => !!el && !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length) && window.getComputedStyle(el).visibility !== "hidden";
+const holds = (xpath) => {
+    const el = find(xpath);
+    switch (state) {
+        case "appear": return !!el;
+        case "disappear": return !el;
+        case "visible": return isVisible(el);
+        case "invisible": return !isVisible(el);
+    }
+    throw new Error("Unknown element state: " + state);
+};
+const check = () => xpaths.map(holds);
+let statuses = check();
+if (statuses.every(Boolean)) {
+    done(statuses);
+} else {
+    const finish = () => { observer.disconnect(); clearInterval(interval); clearTimeout(timer); done(statuses); };
+    const recheck = () => { statuses = check(); if (statuses.every(Boolean)) finish(); };
+    const observer = new MutationObserver(recheck);
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    const interval = setInterval(recheck, 100);
+    const timer = setTimeout(() => { statuses = check(); finish(); }, timeoutMs);
+}
+"""
+
+# Reads text or attributes of several elements at once.
+# arguments: fields {name: [xpath, "text" or attribute/property name]}, optional root xpath
+# without root xpath - fields are resolved from the document, result: {values: {name: value}, missing: [names], hidden: [names]}
+# with root xpath - fields are resolved relatively to every root element, result: list of {values, missing, hidden}
+# "hidden" lists text fields whose element is not visible (yet), their text is not final
+GET_ELEMENTS_VALUES = """
+const [fields, rootXpath] = arguments;
+const find = (xpath, context) => document.evaluate(xpath, context, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const isVisible = (el) => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length) && window.getComputedStyle(el).visibility !== "hidden";
+const read = (el, attribute) => attribute === "text" ? el.innerText : (attribute in el ? el[attribute] : el.getAttribute(attribute));
+const readFields = (context) => {
+    const result = {values: {}, missing: [], hidden: []};
+    for (const [name, [xpath, attribute]] of Object.entries(fields)) {
+        const el = find(xpath, context);
+        if (el === null) result.missing.push(name);
+        else if (attribute === "text" && !isVisible(el)) result.hidden.push(name);
+        result.values[name] = el === null ? null : read(el, attribute);
+    }
+    return result;
+};
+if (!rootXpath) return readFields(document);
+const roots = document.evaluate(rootXpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+return Array.from({length: roots.snapshotLength}, (_, i) => readFields(roots.snapshotItem(i)));
+"""
+
+# Sets value of input/textarea through the native value setter (so frameworks like React see the change)
+# and dispatches input and change events.
+# arguments: element, value
+# result: resulting value of the element
+SET_INPUT_VALUE = """
+const [el, value] = arguments;
+const prototype = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+Object.getOwnPropertyDescriptor(prototype, "value").set.call(el, value);
+el.dispatchEvent(new Event("input", {bubbles: true}));
+el.dispatchEvent(new Event("change", {bubbles: true}));
+return el.value;
+"""
+
+# Focuses element and selects its content, so inserted text replaces it.
+# arguments: element
+FOCUS_AND_SELECT = """
+const el = arguments[0];
+el.focus();
+if (typeof el.select === "function") el.select();
+"""
+
+# Injects pending fetch/XHR counter and DOM change observer into the document once (window.__pageTracker).
+# It is installed before keyboard actions, so requests started by them are counted, and in chromium sessions
+# which wait for the page on every new document (Page.addScriptToEvaluateOnNewDocument), so their navigations are tracked from their start.
+INSTALL_PAGE_TRACKER = """
+if (!window.__pageTracker) {
+    const tracker = window.__pageTracker = {pending: 0, lastChange: Date.now()};
+    const originalFetch = window.fetch;
+    if (originalFetch) {
+        window.fetch = function (...args) {
+            tracker.pending++;
+            return originalFetch.apply(this, args).finally(() => { tracker.pending--; tracker.lastChange = Date.now(); });
+        };
+    }
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function (...args) {
+        tracker.pending++;
+        this.addEventListener("loadend", () => { tracker.pending--; tracker.lastChange = Date.now(); }, {once: true});
+        return originalSend.apply(this, args);
+    };
+    new MutationObserver(() => { tracker.lastChange = Date.now(); }).observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+"""
+
+# Async script. Waits until the page is quiet: document is loaded, there are no pending fetch/XHR requests
+# and DOM was not changed for the quiet period. Installs the page tracker if the document doesn't have it yet
+# (requests started before the installation are not tracked).
+# arguments: quiet period in ms, timeout in ms
+# result: bool - whether page settled before timeout
+WAIT_PAGE_SETTLE = (
+    """
+const [quietMs, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+"""
+    + INSTALL_PAGE_TRACKER
+    + """
+const tracker = window.__pageTracker;
+const started = Date.now();
+const check = () => {
+    const now = Date.now();
+    if (document.readyState === "complete" && tracker.pending <= 0 && now - Math.max(tracker.lastChange, started) >= quietMs) return done(true);
+    if (now - started >= timeoutMs) return done(false);
+    setTimeout(check, 50);
+};
+check();
+"""
+)
+
+# Checks the cached element of the element cache: it is still the first match of its xpath
+# (pages reuse nodes for other content) and is in the state required by the lookup.
+# arguments: element, xpath, state ("present", "visible" or "clickable")
+# result: bool
+CHECK_CACHED_ELEMENT = """
+const [el, xpath, state] = arguments;
+if (document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue !== el) return false;
+if (state === "present") return true;
+const visible = !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length) && window.getComputedStyle(el).visibility !== "hidden";
+return visible && (state === "visible" || !el.disabled);
+"""
+
+# Opens new blank browser tab (window handle is taken from the driver afterwards).
+OPEN_NEW_WINDOW = "window.open('');"
+
+# Clears web storage of the current origin.
+CLEAR_STORAGE = "window.localStorage.clear(); window.sessionStorage.clear();"
+
+# Re-requests images which failed to load while they were blocked (DriverHelper.allow_resources).
+RELOAD_BROKEN_IMAGES = "document.querySelectorAll('img').forEach((img) => { if (img.complete && !img.naturalWidth) img.src = img.src; });"
+
+# Serializes current (live) DOM of the page with its doctype.
+# result: html string
+GET_DOM_SNAPSHOT = """
+const doctype = document.doctype ? new XMLSerializer().serializeToString(document.doctype) : "";
+return doctype + document.documentElement.outerHTML;
+"""
@@ -0,0 +1,172 @@
+import functools
+import re
+import sys
+import typing as t
+
+from selenium.webdriver.common.by import By
+
+# simple xpath: steps of tag (or *) with attribute predicates only
+XPATH_STEP_RE = re.compile(r"(//|/)([a-zA-Z][\w-]*|\*)((?:\[[^\[\]]*\])*)")
+XPATH_PREDICATE_RE = re.compile(r"\[([^\[\]]*)\]")
+XPATH_VALUE = r"""(?:'([^']*)'|"([^"]*)")"""
+XPATH_PREDICATES = [
+    (re.compile(rf"@([a-zA-Z_][\w-]*)\s*=\s*{XPATH_VALUE}"), "="),
+    (re.compile(rf"contains\(\s*@([a-zA-Z_][\w-]*)\s*,\s*{XPATH_VALUE}\s*\)"), "*="),
+    (re.compile(rf"starts-with\(\s*@([a-zA-Z_][\w-]*)\s*,\s*{XPATH_VALUE}\s*\)"), "^="),
+]
+XPATH_ATTRIBUTE_EXISTS_RE = re.compile(r"@([a-zA-Z_][\w-]*)")
+
+
+def is_union(xpath: str) -> bool:
+    """Whether xpath is a union of several paths ("//a | //b"): top level "|" outside of predicates and string literals"""
+    depth, quote = 0, None
+    for char in xpath:
+        if quote is not None:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char in "[(":
+            depth += 1
+        elif char in "])":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+    return False
+
+
+def _css_string(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _css_predicate(predicate: str) -> t.Optional[t.Tuple[str, str, str]]:
+    """Translate single xpath predicate to (attribute, operator, value), None if it has no css equivalent"""
+    predicate = predicate.strip()
+    for predicate_re, operator in XPATH_PREDICATES:
+        match = predicate_re.fullmatch(predicate)
+        if match:
+            value = match.group(2) if match.group(2) is not None else match.group(3)
+            if not value and operator != "=":
+                return None  # contains(@a, '') is true even without attribute, css never matches empty substring
+            return match.group(1), operator, value
+    match = XPATH_ATTRIBUTE_EXISTS_RE.fullmatch(predicate)
+    if match:
+        return match.group(1), "", ""
+    return None
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_xpath(xpath: str) -> t.Tuple[str, str]:
+    """
+    Translate xpath to the fastest equivalent selenium strategy: id, css selector or (if there is no equivalent) xpath itself.
+    Only descendant/child steps of tags with attribute predicates (=, contains, starts-with, existence) are translated.
+    :return: tuple - (By.*, value)
+    """
+    if not xpath.startswith("//"):
+        return By.XPATH, xpath
+    position = 0
+    selectors = []
+    for step in XPATH_STEP_RE.finditer(xpath):
+        if step.start() != position:
+            return By.XPATH, xpath
+        position = step.end()
+        selector = "" if step.group(2) == "*" else step.group(2)
+        for predicate in XPATH_PREDICATE_RE.findall(step.group(3)):
+            css_predicate = _css_predicate(predicate)
+            if css_predicate is None:
+                return By.XPATH, xpath
+            attribute, operator, value = css_predicate
+            selector += f"[{attribute}{operator}{_css_string(value)}]" if operator else f"[{attribute}]"
+        selectors.append((step.group(1), selector or "*"))
+    if position != len(xpath) or not selectors:
+        return By.XPATH, xpath
+    if len(selectors) == 1:
+        id_match = re.fullmatch(r'\*?\[id="([\w-]+)"\]', selectors[0][1])
+        if id_match:
+            return By.ID, id_match.group(1)
+    css = selectors[0][1] + "".join((" " if axis == "//" else " > ") + selector for axis, selector in selectors[1:])
+    return By.CSS_SELECTOR, css
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_relative_xpath(path: str) -> t.Tuple[str, str]:
+    """
+    Strategy to find element by xpath path relative to already resolved parent element.
+    :param path: str - path starting with "//" (descendant) or "/" (child)
+    """
+    if path.startswith("//"):
+        by, value = compile_xpath(path)
+        prefix = ":scope "
+    elif path.startswith("/"):
+        by, value = compile_xpath("/" + path)
+        prefix = ":scope > "
+    else:
+        return By.XPATH, "." + path
+    if by == By.XPATH:
+        return By.XPATH, "." + path
+    if by == By.ID:
+        return By.CSS_SELECTOR, prefix + f'[id="{value}"]'
+    return By.CSS_SELECTOR, prefix + value
+
+
+class Locator:
+    """
+    XPath locator which is resolved by the fastest equivalent strategy (see compile_xpath).
+    Locator may be a child of other locator: its xpath is parent xpath + own path, so it may be found
+    inside the parent element when it is already resolved in the element cache and is the only match of its xpath,
+    instead of searching from the document root. Union parent ("//a | //b") is wrapped in parentheses, union child path is not allowed.
+    Behaves like its xpath in string context, so it may be used everywhere xpath strings are used.
+    """
+
+    __slots__ = ("path", "parent", "xpath")
+
+    def __init__(self, path: str, parent: t.Optional["Locator"] = None) -> None:
+        if parent is not None and is_union(path):
+            raise ValueError(f"Child locator can't be a union of paths: {path}")
+        self.path = sys.intern(path)
+        self.parent = parent
+        if parent is None:
+            self.xpath = self.path
+        else:
+            self.xpath = sys.intern((f"({parent.xpath})" if is_union(parent.xpath) else parent.xpath) + path)
+
+    def child(self, path: t.Union[str, "Locator"]) -> "Locator":
+        return Locator(str(path), parent=self)
+
+    @property
+    def strategy(self) -> t.Tuple[str, str]:
+        return compile_xpath(self.xpath)
+
+    @property
+    def relative_strategy(self) -> t.Tuple[str, str]:
+        """Strategy to find the locator inside resolved parent element"""
+        return compile_relative_xpath(self.path)
+
+    def __str__(self) -> str:
+        return self.xpath
+
+    def __repr__(self) -> str:
+        return f"Locator({self.xpath!r})"
+
+    def __add__(self, other: t.Union[str, "Locator"]) -> "Locator":
+        # predicates and steps extend own path, so the parent chain is kept
+        return Locator(self.path + str(other), parent=self.parent)
+
+    def __radd__(self, other: str) -> "Locator":
+        return Locator(str(other) + self.xpath)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Locator) and other.xpath == self.xpath
+
+    def __hash__(self) -> int:
+        return hash(self.xpath)
+
+
+LocatorType = t.Union[str, Locator]
+
+
+def to_selenium_locator(locator: LocatorType) -> t.Tuple[str, str]:
+    """(By.*, value) for selenium find_element: strings are xpaths, Locators use compiled strategy"""
+    if isinstance(locator, Locator):
+        return locator.strategy
+    return By.XPATH, locator
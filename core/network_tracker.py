@@ -0,0 +1,119 @@
+import json
+import logging
+import time
+import typing as t
+import weakref
+from dataclasses import asdict, dataclass
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+@dataclass
+class RequestRecord:
+    url: str
+    method: str
+    resource_type: str
+    started: float  # CDP monotonic timestamp, seconds
+    status: t.Optional[int] = None
+    duration_ms: float = 0
+    bytes: int = 0
+    failed: bool = False
+
+
+class NetworkTracker:
+    """
+    Tracks browser requests by CDP Network domain events from chrome performance log
+    (driver should be started with performance logging, see DriverHelper.init_local_driver).
+    Keeps requests in flight for network idle waits and finished requests for per-test statistics.
+    Tracker refers to its driver weakly, so the registry entry goes away together with the driver.
+    """
+
+    logger = logging.getLogger(__name__)
+    _trackers: "weakref.WeakKeyDictionary[WebDriver, NetworkTracker]" = weakref.WeakKeyDictionary()
+
+    def __init__(self, driver: WebDriver) -> None:
+        self._driver = weakref.ref(driver)
+        self.in_flight: t.Dict[str, RequestRecord] = {}
+        self.finished: t.List[RequestRecord] = []
+        self.last_activity = time.monotonic()
+
+    @classmethod
+    def attach(cls, driver: WebDriver) -> "NetworkTracker":
+        cls._trackers[driver] = cls(driver)
+        return cls._trackers[driver]
+
+    @classmethod
+    def get(cls, driver: WebDriver) -> t.Optional["NetworkTracker"]:
+        return cls._trackers.get(driver)
+
+    @classmethod
+    def detach(cls, driver: WebDriver) -> None:
+        cls._trackers.pop(driver, None)
+
+    @property
+    def driver(self) -> WebDriver:
+        driver = self._driver()
+        if driver is None:
+            raise ReferenceError("Driver of the network tracker is closed")
+        return driver
+
+    def pump(self) -> None:
+        """Read new events from the performance log (log is drained by reading, so tracker should be its only reader)"""
+        for entry in self.driver.get_log("performance"):
+            message = json.loads(entry["message"])["message"]
+            handler = self._handlers.get(message["method"])
+            if handler:
+                handler(self, message["params"])
+                self.last_activity = time.monotonic()
+
+    def _on_request_will_be_sent(self, params: t.Dict) -> None:
+        if params["requestId"] in self.in_flight:  # redirect of the request in flight
+            return
+        request = params["request"]
+        self.in_flight[params["requestId"]] = RequestRecord(request["url"], request["method"], params.get("type", "Other"), params["timestamp"])
+
+    def _on_response_received(self, params: t.Dict) -> None:
+        record = self.in_flight.get(params["requestId"])
+        if record:
+            record.status = params["response"]["status"]
+
+    def _on_loading_finished(self, params: t.Dict) -> None:
+        record = self.in_flight.pop(params["requestId"], None)
+        if record:
+            record.duration_ms = round((params["timestamp"] - record.started) * 1000, 1)
+            record.bytes = int(params.get("encodedDataLength", 0))
+            self.finished.append(record)
+
+    def _on_loading_failed(self, params: t.Dict) -> None:
+        record = self.in_flight.pop(params["requestId"], None)
+        if record:
+            record.duration_ms = round((params["timestamp"] - record.started) * 1000, 1)
+            record.failed = True
+            self.finished.append(record)
+
+    _handlers: t.Dict[str, t.Callable[["NetworkTracker", t.Dict], None]] = {
+        "Network.requestWillBeSent": _on_request_will_be_sent,
+        "Network.responseReceived": _on_response_received,
+        "Network.loadingFinished": _on_loading_finished,
+        "Network.loadingFailed": _on_loading_failed,
+    }
+
+    @property
+    def idle_time(self) -> float:
+        """Seconds without requests in flight (0 if there are any)"""
+        return 0 if self.in_flight else time.monotonic() - self.last_activity
+
+    def reset_stats(self) -> None:
+        self.pump()
+        self.finished = []
+
+    def stats(self, slowest_count: int = 10) -> t.Dict[str, t.Any]:
+        """Statistics of requests finished since the last reset"""
+        self.pump()
+        return {
+            "requests": len(self.finished),
+            "failed": sum(record.failed for record in self.finished),
+            "bytes": sum(record.bytes for record in self.finished),
+            "in_flight": len(self.in_flight),
+            "slowest": [asdict(record) for record in sorted(self.finished, key=lambda record: record.duration_ms, reverse=True)[:slowest_count]],
+        }
@@ -0,0 +1,209 @@
+import html
+import logging
+import threading
+import time
+import typing as t
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from utils.config import get_frozen_config
+
+
+@dataclass
+class Frame:
+    timestamp: float  # seconds since epoch (CDP frame metadata)
+    data: str  # base64 jpeg
+
+
+@dataclass
+class StepMark:
+    title: str
+    started: float  # seconds since epoch
+    finished: t.Optional[float] = None
+    depth: int = 0
+
+
+class Screencast:
+    """
+    Records CDP Page.startScreencast frames of local chrome on a background thread (trio loop of selenium bidi_connection).
+    Frames are throttled to max_fps and kept in a bounded per-test buffer, allure steps of the test thread are marked
+    with their start and end time. Failed test gets a filmstrip of the frames aligned to the steps, buffer of passed test is just discarded.
+    Only the page target selenium bidi_connection attaches to (the first tab of the session) is recorded,
+    tabs opened by the test (open_new_tab) are not in the filmstrip.
+    Screencast refers to its driver weakly (only the recording connection holds it until the browser is closed),
+    so the registry entry goes away together with the driver, detach() drops it and the frames right away.
+    """
+
+    logger = logging.getLogger(__name__)
+    enabled = False
+    _screencasts: "weakref.WeakKeyDictionary[WebDriver, Screencast]" = weakref.WeakKeyDictionary()
+    _steps = threading.local()
+
+    def __init__(self, driver: WebDriver) -> None:
+        options = self.get_options()
+        self._driver = weakref.ref(driver)
+        self.min_interval = 1 / float(options.get("max_fps", 5) or 5)
+        self.max_width = int(options.get("max_width", 800))
+        self.max_height = int(options.get("max_height", 600))
+        self.quality = int(options.get("quality", 50))
+        self.frames: t.Deque[Frame] = deque(maxlen=int(options.get("max_frames", 600)))
+        self._frames_lock = threading.Lock()  # frames are written by the recording thread, cleared and read by the test thread
+        self.received = 0
+        self._trio_token = None
+        self._cancel_scope = None
+        self._thread: t.Optional[threading.Thread] = None
+
+    @classmethod
+    def get_options(cls) -> t.Dict[str, t.Any]:
+        return get_frozen_config().get("screencast", None) or {}
+
+    @classmethod
+    def configure(cls) -> None:
+        cls.enabled = bool(cls.get_options().get("enabled", False))
+
+    @classmethod
+    def attach(cls, driver: WebDriver) -> "Screencast":
+        cls._screencasts[driver] = cls(driver)
+        cls._screencasts[driver].start()
+        return cls._screencasts[driver]
+
+    @classmethod
+    def get(cls, driver: WebDriver) -> t.Optional["Screencast"]:
+        return cls._screencasts.get(driver)
+
+    @classmethod
+    def detach(cls, driver: WebDriver) -> None:
+        screencast = cls._screencasts.pop(driver, None)
+        if screencast:
+            screencast.stop()
+            with screencast._frames_lock:
+                screencast.frames.clear()
+
+    # recording
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="screencast", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        if self._trio_token is None or self._cancel_scope is None:
+            return  # not connected yet, recording ends with the browser
+        import trio
+
+        try:
+            trio.from_thread.run_sync(self._cancel_scope.cancel, trio_token=self._trio_token)
+        except trio.RunFinishedError:
+            pass
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        import trio
+
+        try:
+            trio.run(self._record)
+        except Exception:
+            # connection is closed together with the browser
+            self.logger.debug("Screencast stopped", exc_info=True)
+
+    async def _record(self) -> None:
+        import trio
+
+        self._trio_token = trio.lowlevel.current_trio_token()
+        with trio.CancelScope() as self._cancel_scope:
+            driver = self._driver()
+            if driver is None:
+                return
+            async with driver.bidi_connection() as connection:
+                session, devtools = connection.session, connection.devtools
+                await session.execute(devtools.page.enable())
+                await session.execute(devtools.page.start_screencast(format_="jpeg", quality=self.quality, max_width=self.max_width, max_height=self.max_height))
+                last_kept = 0.0
+                async for event in session.listen(devtools.page.ScreencastFrame):
+                    # every frame has to be acknowledged, otherwise chrome stops sending them
+                    await session.execute(devtools.page.screencast_frame_ack(event.session_id))
+                    self.received += 1
+                    timestamp = float(event.metadata.timestamp or time.time())
+                    with self._frames_lock:
+                        if timestamp - last_kept >= self.min_interval or not self.frames:
+                            last_kept = timestamp
+                            self.frames.append(Frame(timestamp, event.data))
+                        else:
+                            self.frames[-1] = Frame(timestamp, event.data)  # keep the latest state of the interval
+
+    # test and steps
+
+    @classmethod
+    def _step_marks(cls) -> t.List[StepMark]:
+        if not hasattr(cls._steps, "marks"):
+            cls._steps.marks = []
+            cls._steps.open = []
+        return cls._steps.marks
+
+    @classmethod
+    def start_test(cls, driver: WebDriver) -> None:
+        """Discard frames and steps of the previous test"""
+        cls._step_marks().clear()
+        cls._steps.open = []
+        screencast = cls.get(driver)
+        if screencast:
+            with screencast._frames_lock:
+                screencast.frames.clear()
+
+    @classmethod
+    def step_started(cls, title: str) -> None:
+        if not cls.enabled:
+            return
+        marks = cls._step_marks()
+        mark = StepMark(title, time.time(), depth=len(cls._steps.open))
+        marks.append(mark)
+        cls._steps.open.append(mark)
+
+    @classmethod
+    def step_finished(cls) -> None:
+        if not cls.enabled:
+            return
+        cls._step_marks()
+        if cls._steps.open:
+            cls._steps.open.pop().finished = time.time()
+
+    def aligned_frames(self, frames_per_step: int = 2) -> t.List[t.Tuple[t.Optional[StepMark], t.List[Frame]]]:
+        """
+        Frames of the test grouped by the innermost step shown at the frame time (None - out of the steps),
+        every group keeps its first frames and the last one (state after the step)
+        """
+        marks = list(self._step_marks())
+        with self._frames_lock:
+            frames_snapshot = list(self.frames)
+        groups: t.List[t.Tuple[t.Optional[StepMark], t.List[Frame]]] = []
+        for frame in frames_snapshot:
+            active = [mark for mark in marks if mark.started <= frame.timestamp and (mark.finished is None or frame.timestamp <= mark.finished)]
+            step = max(active, key=lambda mark: (mark.depth, mark.started)) if active else None
+            if groups and groups[-1][0] is step:
+                groups[-1][1].append(frame)
+            else:
+                groups.append((step, [frame]))
+        return [(step, frames if len(frames) <= frames_per_step else [*frames[: frames_per_step - 1], frames[-1]]) for step, frames in groups]
+
+    def filmstrip(self, title: str, frames_per_step: int = 2) -> t.Optional[str]:
+        """Self-contained html page with the frames captioned by their steps, None if there are no frames"""
+        groups = self.aligned_frames(frames_per_step)
+        if not groups:
+            return None
+        rows = []
+        for step, frames in groups:
+            caption = html.escape(step.title if step else "(out of steps)")
+            indent = step.depth if step else 0
+            images = "".join(
+                f'<figure><img src="data:image/jpeg;base64,{frame.data}"><figcaption>{datetime.fromtimestamp(frame.timestamp).strftime("%H:%M:%S.%f")[:-3]}</figcaption></figure>' for frame in frames
+            )
+            rows.append(f'<section style="margin-left:{indent * 16}px"><h4>{caption}</h4><div class="frames">{images}</div></section>')
+        return (
+            "<!DOCTYPE html><html><head><meta charset='utf-8'><title>" + html.escape(title) + "</title><style>"
+            "body{font-family:sans-serif;margin:8px}h4{margin:8px 0 4px}.frames{display:flex;gap:8px;overflow-x:auto}"
+            "figure{margin:0}img{max-width:480px;border:1px solid #ccc}figcaption{font-size:11px;color:#666}"
+            "</style></head><body>" + "".join(rows) + "</body></html>"
+        )
@@ -0,0 +1,141 @@
+import json
+import threading
+import time
+import typing as t
+from contextlib import nullcontext
+from functools import wraps
+from pathlib import Path
+
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+from utils.config import get_frozen_config
+
+T = t.TypeVar("T")
+BUCKETS = ("sleep", "polling", "webdriver_wait", "commands", "screenshots", "framework", "other")
+
+
+class _Frame:
+    """Measured block: its own time goes to the bucket, time of the nested blocks goes to their buckets"""
+
+    __slots__ = ("bucket", "started", "nested")
+
+    def __init__(self, bucket: str) -> None:
+        self.bucket = bucket
+
+    def __enter__(self) -> None:
+        TimeAccounting._stack().append(self)
+        self.nested = 0.0
+        self.started = time.perf_counter()
+
+    def __exit__(self, *args: t.Any) -> None:
+        elapsed = time.perf_counter() - self.started
+        stack = TimeAccounting._stack()
+        stack.pop()
+        if stack:
+            stack[-1].nested += elapsed
+        buckets = getattr(TimeAccounting._local, "buckets", None)
+        if buckets is not None:
+            buckets[self.bucket] += elapsed - self.nested
+
+
+class TimeAccounting:
+    """
+    Splits duration of every test into buckets: explicit sleeps, polling (pauses of the waits loops and in-page waits),
+    WebDriverWait, WebDriver commands, screenshots, framework (own time of log_exception/allure_step wrapped helpers)
+    and other (test code, pytest and fixtures). Nested blocks are measured exclusively, so buckets sum up to test duration.
+    Results are kept per test, saved per worker at session end and merged into one report.
+    """
+
+    enabled = False
+    _local = threading.local()
+    _tests: t.Dict[str, t.Dict[str, float]] = {}
+    _tests_lock = threading.Lock()
+    _null = nullcontext()
+
+    @classmethod
+    def configure(cls) -> None:
+        cls.enabled = bool((get_frozen_config().get("time_accounting", None) or {}).get("enabled", False))
+
+    @classmethod
+    def _stack(cls) -> t.List[_Frame]:
+        if not hasattr(cls._local, "stack"):
+            cls._local.stack = []
+        return cls._local.stack
+
+    @classmethod
+    def measure(cls, bucket: str) -> t.ContextManager[None]:
+        return _Frame(bucket) if cls.enabled else cls._null
+
+    @classmethod
+    def timed(cls, bucket: str) -> t.Callable:
+        """Decorator measuring function into the bucket"""
+
+        def decorator(func: t.Callable) -> t.Callable:
+            @wraps(func)
+            def wrapper(*args: t.Tuple, **kwargs: t.Dict) -> T:
+                if not cls.enabled:
+                    return func(*args, **kwargs)
+                with _Frame(bucket):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    @classmethod
+    def attach(cls, driver: WebDriver) -> None:
+        """Measure commands of the driver (async scripts are in-page waits, so they are accounted as polling)"""
+        executor = driver.command_executor
+        execute = executor.execute
+
+        @wraps(execute)
+        def timed_execute(command: str, params: t.Optional[t.Dict] = None) -> t.Dict:
+            with _Frame("polling" if command == Command.W3C_EXECUTE_SCRIPT_ASYNC else "commands"):
+                return execute(command, params)
+
+        executor.execute = timed_execute
+
+    @classmethod
+    def start_test(cls) -> None:
+        cls._local.buckets = dict.fromkeys(BUCKETS, 0.0)
+        cls._local.started = time.perf_counter()
+
+    @classmethod
+    def finish_test(cls, node_id: str) -> None:
+        buckets = cls._local.buckets
+        cls._local.buckets = None
+        buckets["other"] += time.perf_counter() - cls._local.started - sum(buckets.values())
+        with cls._tests_lock:
+            cls._tests[node_id] = {bucket: round(seconds, 4) for bucket, seconds in buckets.items()}
+
+    @staticmethod
+    def summarize(tests: t.Dict[str, t.Dict[str, float]]) -> t.Dict[str, t.Any]:
+        totals = {bucket: round(sum(test.get(bucket, 0) for test in tests.values()), 3) for bucket in BUCKETS}
+        return {"total": round(sum(totals.values()), 3), "buckets": dict(sorted(totals.items(), key=lambda item: item[1], reverse=True)), "tests": tests}
+
+    @classmethod
+    def save(cls, file_path: Path) -> None:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(json.dumps(cls._tests, indent=2), encoding="utf-8")
+
+    @classmethod
+    def merge(cls, folder: Path) -> t.Dict[str, t.Any]:
+        """Summary of the tests of all worker files in the folder"""
+        tests: t.Dict[str, t.Dict[str, float]] = {}
+        for file_path in sorted(folder.glob("*.json")):
+            tests.update(json.loads(file_path.read_text(encoding="utf-8")))
+        return cls.summarize(tests)
+
+
+class TimedWebDriverWait(WebDriverWait):
+    """WebDriverWait accounted to webdriver_wait bucket (commands made by conditions are accounted as commands)"""
+
+    def until(self, *args: t.Any, **kwargs: t.Any) -> t.Any:
+        with TimeAccounting.measure("webdriver_wait"):
+            return super().until(*args, **kwargs)
+
+    def until_not(self, *args: t.Any, **kwargs: t.Any) -> t.Any:
+        with TimeAccounting.measure("webdriver_wait"):
+            return super().until_not(*args, **kwargs)
@@ -3,6 +3,10 @@ from pathlib import Path
 
 short_timeout = 10
 long_timeout = 120
+polling_timeout = 0.25  # polling interval of the waits when in-page (event driven) waits are not available
+settle_timeout = 3  # max wait for the page to settle after keyboard actions
+settle_quiet_time = 0.3  # page is settled when it has no DOM changes and requests for this time
+script_wait_timeout = 10  # max duration of a single in-page wait, longer waits are split (keep below the session script timeout)
 
 root_path = Path(__file__).resolve().parent
 resources_folder = root_path / "resources"
@@ -1,11 +1,16 @@
+import typing as t
+from urllib.parse import urljoin
+
 from selenium.common.exceptions import *
 from selenium.webdriver.remote.webdriver import WebDriver
 
 import definitions
 from core.allure_helper import allure_step
+from core.auth_cache import AuthCache
 from core.base_class import BaseClass
-from resources.pages_locators import base_page
-from utils.config import get_config
+from core.driver_helper import DriverHelper
+from resources.pages_locators import base_page, inventory_page
+from utils.config import get_frozen_config
 
 
 class BasePage(BaseClass):
@@ -17,13 +22,40 @@ class BasePage(BaseClass):
     def __init__(self, driver: WebDriver) -> None:
         super(BasePage, self).__init__(driver)
 
+    def allow_resources(self, *resource_types: str) -> t.ContextManager[None]:
+        """Opt back in resource types blocked by the lean profile ("image", "font", "media", "stylesheet")"""
+        return DriverHelper.allow_resources(self.driver, *resource_types)
+
     @allure_step("I login to application by user {user_name}")
     def login(self, user_name: str) -> None:
-        self.open(get_config().base_url)
+        if AuthCache.is_enabled() and self.login_with_cached_state(user_name):
+            return
+        self.open(get_frozen_config().base_url)
         self.validate_element_appear(base_page.input_with_id("user-name"), wait=definitions.long_timeout, need_assert=True)
         self.type_text(base_page.input_with_id("user-name"), user_name)
-        self.type_text(base_page.input_with_id("password"), get_config().test_users_credentials[user_name], confidential=True)
+        self.type_text(base_page.input_with_id("password"), get_frozen_config().test_users_credentials[user_name], confidential=True)
         self.click(base_page.input_with_id("login-button"))
+        # wait for login result, but cache successful logins only
+        if AuthCache.is_enabled() and self.wait_element_appear(inventory_page.inventory_list + " | " + base_page.login_box_error_message, wait=definitions.short_timeout) and self.check_obj_exists(inventory_page.inventory_list):
+            AuthCache.capture(user_name, self.driver)
+
+    def login_with_cached_state(self, user_name: str) -> bool:
+        """
+        Open inventory page with injected authenticated state of the user.
+        :return: bool - False if there is no cached state or it didn't work (state is invalidated then)
+        """
+        if AuthCache.get(user_name) is None:
+            return False
+        try:
+            self.open(get_frozen_config().base_url)  # cookies and storage could be set for the opened origin only
+            if AuthCache.restore(user_name, self.driver):
+                self.open(urljoin(get_frozen_config().base_url, "inventory.html"))
+                if self.wait_element_appear(inventory_page.inventory_list, wait=definitions.short_timeout):
+                    return True
+        except WebDriverException:
+            self.logger.warning("Failed to inject authenticated state of user: %s", user_name, exc_info=True)
+        AuthCache.invalidate(user_name)
+        return False
 
     @allure_step("I logout from application")
     def logout(self) -> None:
@@ -32,6 +64,7 @@ class BasePage(BaseClass):
         inventory_page = InventoryPage(self.driver)
         inventory_page.select_sidemenu("Logout")
         self.validate_element_appear(base_page.input_with_id("user-name"), wait=definitions.long_timeout, need_assert=True)
+        AuthCache.logout(self.driver)
 
     @allure_step("I check login box error message: '{error_message}'")
     def check_login_box_error_message(self, error_message: str) -> None:
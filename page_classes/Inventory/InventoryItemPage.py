@@ -9,16 +9,28 @@ from page_classes.BasePage import BasePage
 from resources.pages_locators import inventory_item_page
 
 
+def normalize_item_details(item_info: t.Dict[str, t.Optional[str]]) -> t.Dict[str, t.Optional[str]]:
+    """Image file name instead of its url and stripped texts, fields the item doesn't have stay None"""
+    if item_info.get("img") is not None:
+        item_info["img"] = Path(item_info["img"]).name
+    for name in ("name", "desc"):
+        if item_info.get(name) is not None:
+            item_info[name] = item_info[name].strip()
+    return item_info
+
+
 class InventoryItemPage(BasePage):
     def __init__(self, driver: WebDriver) -> None:
         super(BasePage, self).__init__(driver)
 
     @allure_step("I get item details.")
     def get_item_details(self) -> t.Dict[str, str]:
-        item_info = {
-            "img": Path(self._get_attribute("src", inventory_item_page.item_img)).name,
-            "name": self.get_text(inventory_item_page.item_name).strip(),
-            "desc": self.get_text(inventory_item_page.item_desc).strip(),
-            "price": self.get_text(inventory_item_page.item_price),
-        }
-        return item_info
+        item_info = self.get_values(
+            {
+                "img": (inventory_item_page.item_img, "src"),
+                "name": (inventory_item_page.item_name, "text"),
+                "desc": (inventory_item_page.item_desc, "text"),
+                "price": (inventory_item_page.item_price, "text"),
+            }
+        )
+        return normalize_item_details(item_info)
@@ -1,5 +1,4 @@
 import typing as t
-from pathlib import Path
 
 from selenium.common.exceptions import *
 from selenium.webdriver.remote.webdriver import WebDriver
@@ -7,10 +6,13 @@ from selenium.webdriver.remote.webdriver import WebDriver
 import definitions
 from core.allure_helper import allure_step
 from page_classes.BasePage import BasePage
+from page_classes.Inventory.InventoryItemPage import normalize_item_details
 from resources.pages_locators import base_page, inventory_item_page, inventory_page
 
 
 class InventoryPage(BasePage):
+    element_cache_enabled = True  # cart buttons and sidemenu are used repeatedly during the test
+
     def __init__(self, driver: WebDriver) -> None:
         super(BasePage, self).__init__(driver)
 
@@ -44,13 +46,29 @@ class InventoryPage(BasePage):
     @allure_step("I get item '{item_name}' details.")
     def get_item_details(self, item_name: str) -> t.Dict[str, str]:
         self.validate_element_appear(inventory_page.inventory_item(item_name), need_assert=True)
-        item_info = {
-            "img": Path(self._get_attribute("src", inventory_page.inventory_item_img(item_name))).name,
-            "name": self.get_text(inventory_page.inventory_item_name(item_name)).strip(),
-            "desc": self.get_text(inventory_page.inventory_item_desc(item_name)).strip(),
-            "price": self.get_text(inventory_page.inventory_item_price(item_name)),
-        }
-        return item_info
+        item_info = self.get_values(
+            {
+                "img": (inventory_page.inventory_item_img(item_name), "src"),
+                "name": (inventory_page.inventory_item_name(item_name), "text"),
+                "desc": (inventory_page.inventory_item_desc(item_name), "text"),
+                "price": (inventory_page.inventory_item_price(item_name), "text"),
+            }
+        )
+        return normalize_item_details(item_info)
+
+    @allure_step("I get all items details.")
+    def get_items_details(self) -> t.List[t.Dict[str, t.Optional[str]]]:
+        self.validate_element_appear(inventory_page.inventory_items, need_assert=True)
+        items_info = self.get_values_list(
+            inventory_page.inventory_items,
+            {
+                "img": ("." + inventory_page.card_img, "src"),
+                "name": ("." + inventory_page.card_name, "text"),
+                "desc": ("." + inventory_page.card_desc, "text"),
+                "price": ("." + inventory_page.card_price, "text"),
+            },
+        )
+        return [normalize_item_details(item_info) for item_info in items_info]
 
     @allure_step("I opened item '{item_name}' detailed description.")
     def open_item_page(self, item_name: str) -> None:
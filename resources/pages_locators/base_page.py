@@ -1,18 +1,26 @@
-login_box_error_message = "//*[@data-test='error']"
+import functools
+import sys
 
+from core.locator import Locator
 
+login_box_error_message = Locator("//*[@data-test='error']")
+
+
+@functools.lru_cache(maxsize=256)
 def descendant_text(text: str, contains: bool = True) -> str:
     if contains:
-        return f"[descendant::text()[contains(.,'{text}')]]"
-    return f"[descendant::text()='{text}']"
+        return sys.intern(f"[descendant::text()[contains(.,'{text}')]]")
+    return sys.intern(f"[descendant::text()='{text}']")
 
 
+@functools.lru_cache(maxsize=256)
 def inner_text(text: str, contains: bool = True) -> str:
     if contains:
-        return f"[text()[contains(.,'{text}')]]"
-    return f"[text()='{text}']"
+        return sys.intern(f"[text()[contains(.,'{text}')]]")
+    return sys.intern(f"[text()='{text}']")
 
 
+@functools.lru_cache(maxsize=256)
 def descendant_text_with_quotes(text: str, contains: bool = True) -> str:
     if "'" in text:
         parts = text.split("'")
@@ -20,9 +28,10 @@ def descendant_text_with_quotes(text: str, contains: bool = True) -> str:
         xpath_expression = f"contains(.,{concat_parts})" if contains else f".={concat_parts}"
     else:
         xpath_expression = f"contains(.,'{text}')" if contains else f".='{text}'"
-    return f"[descendant::text()[{xpath_expression}]]"
+    return sys.intern(f"[descendant::text()[{xpath_expression}]]")
 
 
+@functools.lru_cache(maxsize=256)
 def inner_text_with_quotes(text: str, contains: bool = True) -> str:
     if "'" in text:
         parts = text.split("'")
@@ -30,16 +39,19 @@ def inner_text_with_quotes(text: str, contains: bool = True) -> str:
         xpath_expression = f"contains(.,{concat_parts})" if contains else f".={concat_parts}"
     else:
         xpath_expression = f"contains(.,'{text}')" if contains else f".='{text}'"
-    return f"[text()[{xpath_expression}]]"
+    return sys.intern(f"[text()[{xpath_expression}]]")
 
 
-def input_with_id(_id: str) -> None:
-    return f"//input[contains(@id,'{_id}')]"
+@functools.lru_cache(maxsize=256)
+def input_with_id(_id: str) -> Locator:
+    return Locator(f"//input[contains(@id,'{_id}')]")
 
 
-def button_with_id(_id: str) -> None:
-    return f"//button[contains(@id,'{_id}')]"
+@functools.lru_cache(maxsize=256)
+def button_with_id(_id: str) -> Locator:
+    return Locator(f"//button[contains(@id,'{_id}')]")
 
 
-def button_with_text(text: str, contains: bool = False) -> str:
-    return "//button" + descendant_text(text, contains)
+@functools.lru_cache(maxsize=256)
+def button_with_text(text: str, contains: bool = False) -> Locator:
+    return Locator("//button" + descendant_text(text, contains))
@@ -1,36 +1,55 @@
+import functools
+
+from core.locator import Locator
 from resources.pages_locators import base_page
 
-sidemenu_wrap = "//div[@class='bm-menu-wrap']"
-shopping_cart = "//div[@id='shopping_cart_container']"
+inventory_list = Locator("//div[@data-test='inventory-list']")
+inventory_items = Locator("//div[@data-test='inventory-item']")
+sidemenu_wrap = Locator("//div[@class='bm-menu-wrap']")
+shopping_cart = Locator("//div[@id='shopping_cart_container']")
+
+# inventory item card parts (relative to the card)
+card_img = "//img[@class='inventory_item_img']"
+card_name = "//div[@data-test='inventory-item-name']"
+card_desc = "//div[@data-test='inventory-item-desc']"
+card_price = "//div[@data-test='inventory-item-price']"
 
 
-def sidemenu_item(sidemenu_name: str) -> str:
-    return "//nav/a" + base_page.inner_text(sidemenu_name)
+@functools.lru_cache(maxsize=64)
+def sidemenu_item(sidemenu_name: str) -> Locator:
+    return Locator("//nav/a" + base_page.inner_text(sidemenu_name))
 
 
-def inventory_item(item_name: str) -> str:
-    return "//div[@data-test='inventory-item']" + base_page.descendant_text(item_name)
+@functools.lru_cache(maxsize=128)
+def inventory_item(item_name: str) -> Locator:
+    return inventory_items + base_page.descendant_text(item_name)
 
 
-def inventory_item_img(item_name: str) -> str:
-    return inventory_item(item_name) + "//img[@class='inventory_item_img']"
+@functools.lru_cache(maxsize=128)
+def inventory_item_img(item_name: str) -> Locator:
+    return inventory_item(item_name).child(card_img)
 
 
-def inventory_item_name(item_name: str) -> str:
-    return inventory_item(item_name) + "//div[@data-test='inventory-item-name']"
+@functools.lru_cache(maxsize=128)
+def inventory_item_name(item_name: str) -> Locator:
+    return inventory_item(item_name).child(card_name)
 
 
-def inventory_item_desc(item_name: str) -> str:
-    return inventory_item(item_name) + "//div[@data-test='inventory-item-desc']"
+@functools.lru_cache(maxsize=128)
+def inventory_item_desc(item_name: str) -> Locator:
+    return inventory_item(item_name).child(card_desc)
 
 
-def inventory_item_price(item_name: str) -> str:
-    return inventory_item(item_name) + "//div[@data-test='inventory-item-price']"
+@functools.lru_cache(maxsize=128)
+def inventory_item_price(item_name: str) -> Locator:
+    return inventory_item(item_name).child(card_price)
 
 
-def inventory_item_add_button(item_name: str) -> str:
-    return inventory_item(item_name) + base_page.button_with_text("Add to cart")
+@functools.lru_cache(maxsize=128)
+def inventory_item_add_button(item_name: str) -> Locator:
+    return inventory_item(item_name).child(base_page.button_with_text("Add to cart"))
 
 
-def inventory_item_remove_button(item_name: str) -> str:
-    return inventory_item(item_name) + base_page.button_with_text("Remove")
+@functools.lru_cache(maxsize=128)
+def inventory_item_remove_button(item_name: str) -> Locator:
+    return inventory_item(item_name).child(base_page.button_with_text("Remove"))
@@ -0,0 +1,59 @@
+"""Unit tests of the framework internals: no browser, no pages"""
+import typing as t
+from pathlib import Path
+
+import pytest
+
+from core.fake_webdriver import FakeWebDriver
+
+PAGES = Path(__file__).parents[2] / "benchmarks" / "pages"
+
+
+class CdpFakeDriver(FakeWebDriver):
+    """Fake driver which records chromium CDP commands, the ones reading or clearing browser state are emulated"""
+
+    def __init__(self, pages: t.Optional[t.Dict[str, Path]] = None) -> None:
+        super().__init__(pages or {})
+        self.cdp_commands: t.List[t.Tuple[str, t.Dict[str, t.Any]]] = []
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+        self.cdp_commands.append((cmd, cmd_args))
+        executor = self.command_executor
+        if cmd == "Page.getNavigationHistory":
+            history = executor.window.history
+            return {"currentIndex": len(history) - 1, "entries": [{"id": number, "url": url} for number, url in enumerate(history)]}
+        if cmd == "Network.clearBrowserCookies":
+            executor.cookies.clear()
+        elif cmd == "Storage.clearDataForOrigin":
+            executor.local_storage.pop(cmd_args["origin"], None)
+            for window in executor.windows.values():
+                window.session_storage.pop(cmd_args["origin"], None)
+        return {}
+
+
+@pytest.fixture(autouse=True)
+def driver() -> t.Iterator[None]:
+    """Replaces the browser of the root conftest"""
+    yield None
+
+
+@pytest.fixture(autouse=True)
+def pages_init() -> t.Iterator[None]:
+    yield
+
+
+@pytest.fixture()
+def fake_driver() -> t.Iterator[FakeWebDriver]:
+    """Fake driver with the inventory page of the benchmarks loaded"""
+    fake = FakeWebDriver({})
+    fake.get((PAGES / "inventory.html").as_uri())
+    yield fake
+    fake.quit()
+
+
+@pytest.fixture()
+def cdp_driver() -> t.Iterator[CdpFakeDriver]:
+    fake = CdpFakeDriver()
+    fake.get((PAGES / "inventory.html").as_uri())
+    yield fake
+    fake.quit()
@@ -0,0 +1,115 @@
+import json
+import threading
+from types import SimpleNamespace
+
+from utils.allure_index import HistoryStore, ReportBuilder, ResultsIndex, ResultsIndexWriter, update_report, watch
+
+
+def write_result(results_dir, uuid, history_id, status, start, attachment=None):
+    result = {"uuid": uuid, "historyId": history_id, "fullName": f"tests.{history_id}", "name": history_id, "status": status, "start": start, "stop": start + 10}
+    result["statusDetails"] = {"message": f"{history_id} {status}", "trace": ""}
+    result["steps"] = [{"name": "step", "status": status, "steps": [], "attachments": [{"name": "screen", "source": attachment, "type": "image/png"}] if attachment else []}]
+    if attachment:
+        (results_dir / attachment).write_bytes(b"png")
+    (results_dir / f"{uuid}-result.json").write_text(json.dumps(result), encoding="utf-8")
+    return result
+
+
+def index_result(writer, result):
+    writer.report_result(SimpleNamespace(**{key: result[key] for key in ("uuid", "historyId", "fullName", "name", "status", "start", "stop")}))
+
+
+def read_script(file_path):
+    text = file_path.read_text(encoding="utf-8")
+    return json.loads(text[text.index("(") + 1 : text.rindex(")")])
+
+
+def test_index_reads_only_appended_entries(tmp_path):
+    writer = ResultsIndexWriter(tmp_path / "index" / "gw0.jsonl", "gw0")
+    index_result(writer, write_result(tmp_path, "a1", "test_a", "failed", 100))
+    index = ResultsIndex(tmp_path)
+    assert index.update() == ["test_a"]
+    assert index.update() == []
+
+    index_result(writer, write_result(tmp_path, "b1", "test_b", "passed", 150))
+    index_result(writer, write_result(tmp_path, "a2", "test_a", "passed", 200))  # rerun
+    with (tmp_path / "index" / "gw1.jsonl").open("a", encoding="utf-8") as partial:
+        partial.write('{"uuid": "c1"')  # line which is being written
+    assert index.update() == ["test_b", "test_a"]
+    assert index.tests["test_a"]["uuid"] == "a2"
+    writer.file.close()
+
+    index.save()
+    restored = ResultsIndex(tmp_path)
+    assert restored.update() == []
+    assert restored.summary()["statistic"]["passed"] == 2
+
+
+def test_index_without_writer_scans_results(tmp_path):
+    write_result(tmp_path, "a1", "test_a", "failed", 100)
+    write_result(tmp_path, "a2", "test_a", "passed", 200)
+    write_result(tmp_path, "b1", "test_b", "broken", 150)
+    index = ResultsIndex(tmp_path)
+    assert sorted(index.update()) == ["test_a", "test_b"]
+    assert {history_id: test["uuid"] for history_id, test in index.tests.items()} == {"test_a": "a2", "test_b": "b1"}
+    assert index.summary()["failed"] == ["tests.test_b"]
+    assert index.update() == []
+
+
+def test_report_writes_only_changed_tests(tmp_path):
+    results_dir, report_dir = tmp_path / "results", tmp_path / "report"
+    results_dir.mkdir()
+    writer = ResultsIndexWriter(results_dir / "index" / "main.jsonl", "main")
+    index, builder = ResultsIndex(results_dir), ReportBuilder(report_dir, results_dir, {"test_a": [["passed", 7]]})
+    index_result(writer, write_result(results_dir, "a1", "test_a", "failed", 100, attachment="a1-attachment.png"))
+    index_result(writer, write_result(results_dir, "b1", "test_b", "passed", 150))
+    assert update_report(index, builder) == 2
+    test_a = report_dir / "data" / "tests" / f"{builder.test_key('test_a')}.js"
+    test_b = report_dir / "data" / "tests" / f"{builder.test_key('test_b')}.js"
+    assert (report_dir / "index.html").is_file()
+    assert (report_dir / "data" / "attachments" / "a1-attachment.png").read_bytes() == b"png"
+    assert read_script(test_a)["steps"][0]["attachments"][0]["source"] == "a1-attachment.png"
+    test_b.write_text("reportTest({});", encoding="utf-8")  # marker: the entry must not be rewritten
+
+    index_result(writer, write_result(results_dir, "a2", "test_a", "passed", 200))
+    writer.file.close()
+    assert update_report(index, builder) == 1
+    assert read_script(test_a)["message"] == "test_a passed"
+    assert test_b.read_text(encoding="utf-8") == "reportTest({});"
+    report_index = read_script(report_dir / "data" / "index.js")
+    assert report_index["summary"]["statistic"]["passed"] == 2
+    assert {test["name"]: test["history"] for test in report_index["tests"]} == {"test_a": [["passed", 7]], "test_b": []}
+
+    assert update_report(ResultsIndex(results_dir), builder) == 0  # state was saved after the report
+
+
+def test_watch_stops(tmp_path):
+    write_result(tmp_path, "a1", "test_a", "passed", 100)
+    stop = threading.Event()
+    stop.set()
+    watch(ResultsIndex(tmp_path), ReportBuilder(tmp_path / "report", tmp_path), 60, stop)
+    assert len(read_script(tmp_path / "report" / "data" / "index.js")["tests"]) == 1
+
+
+def test_history_of_previous_builds(tmp_path):
+    store = HistoryStore(tmp_path / "history.jsonl.gz", max_builds=2)
+    assert store.materialize(tmp_path / "empty") == 0
+    assert store.statuses() == {}
+    for build_order, status in enumerate(("passed", "failed", "passed"), start=1):
+        store.append(build_order, {"test_a": {"uuid": f"u{build_order}", "status": status, "start": 0, "stop": 5}}, "http://reports/b")
+
+    assert store.statuses() == {"test_a": [["passed", 3], ["failed", 2]]}  # last max_builds builds, newest first
+    assert store.materialize(tmp_path / "history") == 2
+    history = json.loads((tmp_path / "history" / "history.json").read_text(encoding="utf-8"))
+    trend = json.loads((tmp_path / "history" / "history-trend.json").read_text(encoding="utf-8"))
+    assert [item["uid"] for item in history["test_a"]["items"]] == ["u3", "u2"]
+    assert history["test_a"]["items"][0]["reportUrl"] == "http://reports/b/#testresult/u3"
+    assert history["test_a"]["statistic"]["failed"] == 1
+    assert [build["buildOrder"] for build in trend] == [3, 2]
+
+
+def test_store_is_compacted(tmp_path):
+    store = HistoryStore(tmp_path / "history.jsonl.gz", max_builds=2)
+    for build_order in range(1, 6):
+        store.append(build_order, {})
+    assert [build["buildOrder"] for build in store.read()] == [4, 5]
@@ -0,0 +1,74 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from core.auth_cache import GET_STORAGE_SCRIPT, SET_STORAGE_SCRIPT, AuthCache
+from core.fake_webdriver import FakeWebDriver
+
+LOGIN_PAGE = Path(__file__).parents[2] / "benchmarks" / "pages" / "login.html"
+
+
+@pytest.fixture(autouse=True)
+def auth_cache(monkeypatch):
+    monkeypatch.setattr(AuthCache, "_states", {})
+    monkeypatch.setattr(AuthCache, "get_ttl", staticmethod(lambda: 300))
+
+
+def login(driver, cookie_expiry=None):
+    cookie = {"name": "session-username", "value": "standard_user", "path": "/"}
+    if cookie_expiry:
+        cookie["expiry"] = cookie_expiry
+    driver.add_cookie(cookie)
+    driver.execute_script(SET_STORAGE_SCRIPT, {"cart-contents": "[4]"}, {"tab": "1"})
+
+
+def new_session():
+    driver = FakeWebDriver({})
+    driver.get(LOGIN_PAGE.as_uri())
+    return driver
+
+
+def test_capture_and_restore(fake_driver):
+    login(fake_driver)
+    state = AuthCache.capture("standard_user", fake_driver)
+    assert [cookie["name"] for cookie in state.cookies] == ["session-username"]
+    assert (state.local_storage, state.session_storage) == ({"cart-contents": "[4]"}, {"tab": "1"})
+    assert 299 < state.expires_at - time.time() <= 300
+
+    other_session = new_session()
+    assert AuthCache.restore("standard_user", other_session)
+    assert other_session.get_cookie("session-username")["value"] == "standard_user"
+    assert other_session.execute_script(GET_STORAGE_SCRIPT)["local"] == {"cart-contents": "[4]"}
+    assert not AuthCache.restore("problem_user", other_session)
+
+
+def test_state_expires(fake_driver, monkeypatch):
+    login(fake_driver, cookie_expiry=int(time.time()) + 60)
+    expires_at = AuthCache.capture("standard_user", fake_driver).expires_at
+    assert expires_at <= time.time() + 60  # cookies expire before ttl
+    monkeypatch.setattr(time, "time", lambda: expires_at + 1)
+    assert AuthCache.get("standard_user") is None
+    assert not AuthCache.restore("standard_user", new_session())
+    assert "standard_user" not in AuthCache._states
+
+
+def test_invalidate(fake_driver):
+    login(fake_driver)
+    AuthCache.capture("standard_user", fake_driver)
+    AuthCache.invalidate("standard_user")
+    assert AuthCache.get("standard_user") is None
+    AuthCache.invalidate("standard_user")  # already invalidated
+
+
+def test_logout_invalidates_user_of_the_session(fake_driver):
+    login(fake_driver)
+    AuthCache.capture("standard_user", fake_driver)
+    other_session = new_session()
+    AuthCache.restore("standard_user", other_session)
+    AuthCache.capture("problem_user", fake_driver)  # another user logged in the first session
+
+    AuthCache.logout(other_session)
+    assert AuthCache.get("standard_user") is None
+    assert AuthCache.get("problem_user") is not None
+    AuthCache.logout(other_session)  # nothing is cached for the session anymore
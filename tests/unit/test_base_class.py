@@ -0,0 +1,56 @@
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from core import js_scripts
+from core.base_class import BaseClass
+
+
+def test_page_tracker_is_added_to_new_documents_once(cdp_driver):
+    page = BaseClass(cdp_driver)
+    assert cdp_driver.cdp_commands == []  # sessions which don't wait for the page don't get the tracker
+    page.wait_page_settle(max_wait=1)
+    page.install_page_tracker()
+    assert cdp_driver.cdp_commands == [("Page.addScriptToEvaluateOnNewDocument", {"source": js_scripts.INSTALL_PAGE_TRACKER})]
+
+
+def test_page_tracker_without_cdp(fake_driver):
+    page = BaseClass(fake_driver)
+    assert page.wait_page_settle(max_wait=1)
+    assert fake_driver not in BaseClass._new_document_trackers
+
+
+@pytest.mark.parametrize(
+    "batch, expected_waits",
+    [
+        (False, [["//div[@id='root']"], ["//button[@id='react-burger-menu-btn']"]]),  # timeout per xpath (default)
+        (True, [["//div[@id='root']", "//button[@id='react-burger-menu-btn']"]]),  # one shared timeout
+    ],
+)
+def test_validate_elements_state_timeouts(fake_driver, monkeypatch, batch, expected_waits):
+    page = BaseClass(fake_driver)
+    waits = []
+    wait_elements_state = page.wait_elements_state
+
+    def recording_wait(xpaths, state, wait):
+        waits.append(list(xpaths))
+        return wait_elements_state(xpaths, state, wait)
+
+    monkeypatch.setattr(page, "wait_elements_state", recording_wait)
+    page.validate_element_appear("//div[@id='root']", "//button[@id='react-burger-menu-btn']", wait=1, batch=batch)
+    assert waits == expected_waits
+
+
+@pytest.mark.parametrize(
+    "batch, message",
+    [
+        (False, "Element with xpath '//div[@id='missing']' don't appear. Timeout: 0.2s"),
+        (True, "Some of elements don't appear. Timeout: 0.2s\n    [OK] //div[@id='root']\n    [FAILED] //div[@id='missing']"),
+    ],
+)
+def test_validate_elements_state_failure(fake_driver, batch, message):
+    page = BaseClass(fake_driver)
+    with pytest.raises(TimeoutException) as error:
+        page.validate_elements_state(["//div[@id='root']", "//div[@id='missing']"], "appear", wait=0.2, batch=batch)
+    assert error.value.msg == message
+    with pytest.raises(AssertionError, match="custom"):
+        page.validate_elements_state(["//div[@id='missing']"], "appear", need_assert=True, assert_message="custom", wait=0.2, batch=batch)
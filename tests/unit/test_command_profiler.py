@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from core.command_profiler import CommandProfiler, payload_size
+from core.fake_webdriver import SCREENSHOT
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "about:blank",
+        {"url": "https://www.saucedemo.com/inventory.html"},
+        {"script": "return arguments[0].click();", "args": [{"element-6066-11e4-a52e-4f735466cecf": "f.1.e.12"}]},
+        [{"element-6066-11e4-a52e-4f735466cecf": f"f.1.e.{number}"} for number in range(100)],
+        {"values": {"name": "Backpack", "price": 29.99, "in_cart": False}, "missing": [], "hidden": ["badge"]},
+    ],
+)
+def test_payload_size_estimates_json_size(value):
+    size = len(json.dumps(value))
+    assert size * 0.8 <= payload_size(value) <= size * 1.2
+
+
+def test_payload_size_of_large_values():
+    page_source = "<div>" * 1_000_000
+    assert payload_size({"value": page_source}) >= len(page_source)
+    assert payload_size([list(range(10))] * 10_000) > 10_000 * 10  # extrapolated from the first items
+    assert payload_size([[[[["x" * 1000]]]]]) < 1000  # too deep to be measured
+
+
+def test_profiled_commands(fake_driver):
+    profiler = CommandProfiler.attach(fake_driver)
+    fake_driver.get_screenshot_as_base64()
+    fake_driver.get("about:blank")
+    screenshot, get = profiler.records
+    assert (screenshot.command, screenshot.response_bytes) == ("screenshot", len(SCREENSHOT) + 2)
+    assert get.request_bytes < screenshot.response_bytes
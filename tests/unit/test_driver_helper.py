@@ -0,0 +1,156 @@
+import fnmatch
+import gc
+import weakref
+from concurrent.futures import Future
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from core.auth_cache import GET_STORAGE_SCRIPT, SET_STORAGE_SCRIPT
+from core.driver_helper import DriverHelper, DriverState
+from core.fake_webdriver import FakeWebDriver
+from core.network_tracker import NetworkTracker
+from core.screencast import Frame, Screencast
+from page_classes.BasePage import BasePage
+from tests.unit.conftest import PAGES, CdpFakeDriver
+
+
+@pytest.mark.parametrize(
+    "url, blocked",
+    [
+        ("https://www.saucedemo.com/static/media/bike-light.png", True),
+        ("https://www.saucedemo.com/static/media/bike-light.png?v=2", True),
+        ("https://cdn.example.com/fonts/roboto.woff2?display=swap", True),
+        ("https://www.saucedemo.com/inventory.html", False),
+        ("https://www.saucedemo.com/api/items?format=png", False),
+    ],
+)
+def test_resource_url_patterns(url, blocked):
+    # blocked url patterns of chrome have "*" wildcard only, "?" is literal
+    patterns = DriverHelper.resource_url_patterns(["image", "font"])
+    assert any(fnmatch.fnmatchcase(url, pattern.replace("?", "[?]")) for pattern in patterns) is blocked
+
+
+def test_unknown_resource_type():
+    with pytest.raises(ValueError, match="Unknown resource types: \\['images'\\]"):
+        DriverHelper.resource_url_patterns(["image", "images"])
+
+
+def blocked_urls(cdp_driver):
+    return [cmd_args["urls"] for cmd, cmd_args in cdp_driver.cdp_commands if cmd == "Network.setBlockedURLs"]
+
+
+def test_allow_resources(cdp_driver, monkeypatch):
+    monkeypatch.setattr(DriverHelper, "_state", DriverState())
+    blocked = DriverHelper.resource_url_patterns(["image", "font"]) + ["*google-analytics.com*"]
+    DriverHelper.block_urls(cdp_driver, blocked)
+    with BasePage(cdp_driver).allow_resources("image"):
+        allowed = DriverHelper.get_state().blocked_url_patterns
+        assert allowed == DriverHelper.resource_url_patterns(["font"]) + ["*google-analytics.com*"]
+        assert not any(fnmatch.fnmatchcase("https://www.saucedemo.com/static/media/bike-light.png?v=2", pattern.replace("?", "[?]")) for pattern in allowed)
+    assert DriverHelper.get_state().blocked_url_patterns == blocked
+    assert blocked_urls(cdp_driver) == [blocked, allowed, blocked]
+
+
+def test_allow_resources_which_are_not_blocked(cdp_driver, monkeypatch):
+    monkeypatch.setattr(DriverHelper, "_state", DriverState())
+    DriverHelper.block_urls(cdp_driver, DriverHelper.resource_url_patterns(["font"]))
+    with BasePage(cdp_driver).allow_resources("image", "media"):
+        pass
+    assert len(blocked_urls(cdp_driver)) == 1  # nothing to unblock, blocked urls are not touched
+    with pytest.raises(ValueError):
+        with BasePage(cdp_driver).allow_resources("images"):
+            pass
+
+
+def app_storage(driver):
+    driver.get("https://www.saucedemo.com/inventory.html")
+    return driver.execute_script(GET_STORAGE_SCRIPT)
+
+
+@pytest.mark.parametrize("driver_class", [FakeWebDriver, CdpFakeDriver])
+def test_reset_clears_app_origin_storage(driver_class):
+    driver = driver_class({"/inventory.html": PAGES / "inventory.html", "/": PAGES / "login.html"})
+    app_storage(driver)
+    driver.execute_script(SET_STORAGE_SCRIPT, {"cart-contents": "[4]"}, {"tab": "1"})
+    driver.add_cookie({"name": "session-username", "value": "standard_user"})
+    DriverHelper.reset_driver_state(driver)
+    assert driver.current_url == "about:blank"
+    assert driver.get_cookies() == []
+    assert app_storage(driver) == {"local": {}, "session": {}}
+
+
+def test_reset_clears_storage_of_visited_origins():
+    driver = CdpFakeDriver({"/inventory.html": PAGES / "inventory.html", "/": PAGES / "login.html"})
+    app_storage(driver)
+    driver.execute_script(SET_STORAGE_SCRIPT, {"cart-contents": "[4]"}, {})
+    driver.get("https://auth.example.com/")  # test left the app origin, its storage isn't reachable by scripts of the page
+    driver.switch_to.new_window("tab")
+    driver.get("https://shop.example.com/")
+    DriverHelper.reset_driver_state(driver)
+    cleared = [cmd_args["origin"] for cmd, cmd_args in driver.cdp_commands if cmd == "Storage.clearDataForOrigin"]
+    assert cleared == ["https://auth.example.com", "https://shop.example.com", "https://www.saucedemo.com"]
+    assert len(driver.window_handles) == 1
+    assert app_storage(driver)["local"] == {}
+
+
+def test_network_tracker_does_not_keep_driver():
+    driver = FakeWebDriver({})
+    tracker = NetworkTracker.attach(driver)
+    assert NetworkTracker.get(driver) is tracker and tracker.driver is driver
+    driver_ref = weakref.ref(driver)
+    del driver
+    gc.collect()
+    assert driver_ref() is None
+    assert tracker not in NetworkTracker._trackers.values()
+
+
+def test_network_tracker_detach(fake_driver):
+    NetworkTracker.attach(fake_driver)
+    NetworkTracker.detach(fake_driver)
+    assert NetworkTracker.get(fake_driver) is None
+
+
+def test_screencast_does_not_keep_driver():
+    driver = FakeWebDriver({})
+    screencast = Screencast._screencasts[driver] = Screencast(driver)  # registered as attach() does, without the recording thread
+    driver_ref = weakref.ref(driver)
+    del driver
+    gc.collect()
+    assert driver_ref() is None
+    assert screencast not in Screencast._screencasts.values()
+
+
+def test_screencast_detach_drops_frames(fake_driver):
+    screencast = Screencast._screencasts[fake_driver] = Screencast(fake_driver)
+    screencast.frames.append(Frame(0, "frame"))
+    Screencast.detach(fake_driver)
+    assert Screencast.get(fake_driver) is None
+    assert not screencast.frames
+
+
+class QuitRecordingDriver(FakeWebDriver):
+    def __init__(self) -> None:
+        super().__init__({})
+        self.quitted = False
+
+    def quit(self) -> None:
+        self.quitted = True
+        super().quit()
+
+
+def reject_session_name(cls, scenario_name):
+    raise WebDriverException("Session name is rejected by the grid")
+
+
+def test_prefetched_driver_is_quit_when_it_cannot_be_taken(monkeypatch):
+    prefetched, started = QuitRecordingDriver(), QuitRecordingDriver()
+    future = Future()
+    future.set_result(prefetched)
+    monkeypatch.setattr(DriverHelper, "_state", DriverState(prefetched_driver=future))
+    monkeypatch.setattr(DriverHelper, "set_session_name", classmethod(reject_session_name))
+    monkeypatch.setattr(DriverHelper, "start_driver", classmethod(lambda cls, name: started))
+    monkeypatch.setattr(DriverHelper, "prefetch_driver", classmethod(lambda cls: None))
+    assert DriverHelper.get_driver("test") is started
+    assert prefetched.quitted and not started.quitted
+    assert DriverHelper.get_state().driver_uses == 1
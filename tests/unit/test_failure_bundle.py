@@ -0,0 +1,35 @@
+import threading
+import time
+import zipfile
+from io import BytesIO
+
+from core.failure_bundle import FailureBundle
+
+
+def test_collect(fake_driver):
+    artifacts = FailureBundle.collect(fake_driver)
+    assert artifacts["errors"] == {}
+    assert artifacts["url"].endswith("inventory.html") and artifacts["screenshot"].startswith(b"\x89PNG")
+    with zipfile.ZipFile(BytesIO(FailureBundle.pack(artifacts))) as bundle:
+        assert {"screenshot.png", "dom.html", "meta.json"} <= set(bundle.namelist())
+
+
+def test_collectors_out_of_time_are_finished_before_return(fake_driver, monkeypatch):
+    monkeypatch.setattr(FailureBundle, "get_options", classmethod(lambda cls: {"timeout": 0.1}))
+    running = []
+    lock = threading.Lock()
+
+    def slow_command(*args, **kwargs):
+        with lock:
+            running.append(threading.current_thread().name)
+        time.sleep(0.3)
+        with lock:
+            running.remove(threading.current_thread().name)
+        return "slow"
+
+    monkeypatch.setattr(fake_driver, "get_screenshot_as_png", slow_command)
+    monkeypatch.setattr(fake_driver, "execute_script", slow_command)
+    artifacts = FailureBundle.collect(fake_driver)
+    assert running == []  # no collector sends commands after collect() returns
+    assert {"screenshot", "dom"} <= set(artifacts["errors"])
+    assert "url" in artifacts
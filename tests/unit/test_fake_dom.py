@@ -0,0 +1,141 @@
+import pytest
+
+from core.fake_dom import XPathError, css_select, parse_html, xpath_evaluate, xpath_select
+
+PAGE = """
+<html>
+<head><title> Swag Labs </title><style>.x {}</style></head>
+<body>
+  <div id="inventory_container" class="inventory_list">
+    <div class="inventory_item" data-index="1">
+      <div class="inventory_item_name">Sauce Labs Backpack</div>
+      <div class="inventory_item_price">$29.99</div>
+      <button id="add-to-cart-sauce-labs-backpack" class="btn btn_primary">Add to cart</button>
+    </div>
+    <div class="inventory_item" data-index="2">
+      <div class="inventory_item_name">Sauce Labs  Bike
+        Light</div>
+      <div class="inventory_item_price">$9.99</div>
+      <button id="remove-sauce-labs-bike-light" class="btn btn_secondary" disabled>Remove</button>
+    </div>
+  </div>
+  <span id="hidden_span" style="display: none">hidden text</span>
+  <input type="hidden" id="token" value="secret">
+  <img src="backpack.png" alt="Backpack">
+</body>
+</html>
+"""
+
+
+@pytest.fixture(scope="module")
+def document():
+    return parse_html(PAGE)
+
+
+def ids(elements):
+    return [element.attributes.get("id") or element.attributes.get("data-index") or element.tag for element in elements]
+
+
+@pytest.mark.parametrize(
+    "xpath, expected",
+    [
+        ("//div[@id='inventory_container']", ["inventory_container"]),
+        ("//div[@class='inventory_item']", ["1", "2"]),
+        ("/html/body/img", ["img"]),
+        ("//button[contains(@id, 'add-to-cart')]", ["add-to-cart-sauce-labs-backpack"]),
+        ("//button[starts-with(@id, 'remove')]", ["remove-sauce-labs-bike-light"]),
+        ("//button[contains(@class, 'btn_secondary')]", ["remove-sauce-labs-bike-light"]),
+        ("//button[text()='Remove']", ["remove-sauce-labs-bike-light"]),
+        ("//div[normalize-space()='Sauce Labs Bike Light']/..", ["2"]),
+        ("//div[contains(text(), 'Backpack')]/following-sibling::button", ["add-to-cart-sauce-labs-backpack"]),
+        ("//button/preceding-sibling::div[1]", ["div", "div"]),
+        ("//button[@disabled]/ancestor::div[@data-index]", ["2"]),
+        ("//div[@class='inventory_item'][2]", ["2"]),
+        ("//div[@class='inventory_item'][last()]", ["2"]),
+        ("//div[@class='inventory_item'][position() < 2]", ["1"]),
+        ("(//button)[1]", ["add-to-cart-sauce-labs-backpack"]),
+        ("(//div[@class='inventory_item'])[last()]//button", ["remove-sauce-labs-bike-light"]),
+        ("//div[@data-index > 1]", ["2"]),
+        ("//div[not(@class)]", []),
+        ("//div[count(button) = 1 and @data-index = '1']", ["1"]),
+        ("//div[@data-index='1'] | //button[@disabled]", ["1", "remove-sauce-labs-bike-light"]),
+        ("//button[@disabled] | //div[@data-index='1']", ["1", "remove-sauce-labs-bike-light"]),
+        ("//nothing", []),
+    ],
+)
+def test_xpath_select(document, xpath, expected):
+    assert ids(xpath_select(xpath, document)) == expected
+
+
+def test_xpath_select_relative_to_context(document):
+    second_item = xpath_select("//div[@data-index='2']", document)[0]
+    assert ids(xpath_select(".//button", second_item)) == ["remove-sauce-labs-bike-light"]
+    assert ids(xpath_select("./div[1]/..", second_item)) == ["2"]
+    assert len(xpath_select("//button", second_item)) == 2  # absolute path starts from the document
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("count(//button)", 2.0),
+        ("string(//div[@class='inventory_item_price'])", "$29.99"),
+        ("normalize-space(//div[@data-index='2']/div[1])", "Sauce Labs Bike Light"),
+        ("concat(//img/@alt, '-', string-length('abc'))", "Backpack-3"),
+        ("boolean(//img[@alt])", True),
+        ("//img/@src = 'backpack.png'", True),
+        ("//div[@class='inventory_item_price'] = '$9.99'", True),
+    ],
+)
+def test_xpath_evaluate(document, expression, expected):
+    assert xpath_evaluate(expression, document) == expected
+
+
+@pytest.mark.parametrize("expression", ["//div[unknown()]", "//div[", "//div[@id='a']]", "1 + //div"])
+def test_xpath_errors(document, expression):
+    with pytest.raises(XPathError):
+        xpath_select(expression, document)
+
+
+@pytest.mark.parametrize(
+    "selector, expected",
+    [
+        ("#inventory_container", ["inventory_container"]),
+        ("div.inventory_item", ["1", "2"]),
+        (".btn.btn_primary", ["add-to-cart-sauce-labs-backpack"]),
+        ("[id*='add-to-cart']", ["add-to-cart-sauce-labs-backpack"]),
+        ("button[id^=remove]", ["remove-sauce-labs-bike-light"]),
+        ("img[src$='.png']", ["img"]),
+        ("[class~=btn_secondary]", ["remove-sauce-labs-bike-light"]),
+        ("button[disabled]", ["remove-sauce-labs-bike-light"]),
+        ("#inventory_container > div > button", ["add-to-cart-sauce-labs-backpack", "remove-sauce-labs-bike-light"]),
+        ("#inventory_container button", ["add-to-cart-sauce-labs-backpack", "remove-sauce-labs-bike-light"]),
+        (".inventory_item_name + .inventory_item_price", ["div", "div"]),
+        (".inventory_item_name ~ button", ["add-to-cart-sauce-labs-backpack", "remove-sauce-labs-bike-light"]),
+        ("[data-index='2'] button, img", ["remove-sauce-labs-bike-light", "img"]),
+        ("body > button", []),
+    ],
+)
+def test_css_select(document, selector, expected):
+    assert ids(css_select(selector, document)) == expected
+
+
+def test_css_select_scope(document):
+    first_item = css_select("[data-index='1']", document)[0]
+    assert ids(css_select(":scope > button", first_item)) == ["add-to-cart-sauce-labs-backpack"]
+    assert css_select(":scope > .inventory_item", first_item) == []
+
+
+@pytest.mark.parametrize("selector", ["", "div >", "> div", "div::before", "a[href"])
+def test_css_errors(document, selector):
+    with pytest.raises(ValueError):
+        css_select(selector, document)
+
+
+def test_rendering(document):
+    assert document.title == "Swag Labs"
+    assert xpath_select("//div[@data-index='2']/div[1]", document)[0].inner_text == "Sauce Labs Bike Light"
+    assert not xpath_select("//span[@id='hidden_span']", document)[0].is_displayed
+    assert not xpath_select("//input[@id='token']", document)[0].is_displayed
+    assert not xpath_select("//title", document)[0].is_displayed
+    assert xpath_select("//button[@disabled]", document)[0].is_displayed
+    assert xpath_select("//input", document)[0].value == "secret"
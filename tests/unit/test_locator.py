@@ -0,0 +1,96 @@
+import pytest
+from selenium.webdriver.common.by import By
+
+from core.fake_dom import css_select, parse_html, xpath_select
+from core.locator import Locator, compile_relative_xpath, compile_xpath, is_union
+
+PAGE = """
+<div data-test="inventory-list">
+  <div data-test="inventory-item" id="item-1"><a><span>Backpack</span></a><button id="add-to-cart-backpack" name="add">Add to cart</button></div>
+  <div data-test="inventory-item" id="item-2"><span>Bike Light</span><button id="remove-bike-light" class="btn remove">Remove</button></div>
+</div>
+"""
+
+COMPILE_CASES = [
+    # contains(@id) -> substring attribute selector
+    ("//button[contains(@id, 'cart')]", (By.CSS_SELECTOR, 'button[id*="cart"]')),
+    ("//div[starts-with(@id, 'item')]", (By.CSS_SELECTOR, 'div[id^="item"]')),
+    # @id only -> By.ID, with a tag it stays a css selector (tag is part of the condition)
+    ("//*[@id='remove-bike-light']", (By.ID, "remove-bike-light")),
+    ("//button[@id='remove-bike-light']", (By.CSS_SELECTOR, 'button[id="remove-bike-light"]')),
+    ("//div[@data-test='inventory-item']//button[@name]", (By.CSS_SELECTOR, 'div[data-test="inventory-item"] button[name]')),
+    ("//div[@data-test='inventory-item']/span", (By.CSS_SELECTOR, 'div[data-test="inventory-item"] > span')),
+    ("//button[@class='btn remove']", (By.CSS_SELECTOR, 'button[class="btn remove"]')),
+    # positional predicates have no css equivalent
+    ("(//button)[1]", (By.XPATH, "(//button)[1]")),
+    ("//div[@data-test='inventory-item'][2]", (By.XPATH, "//div[@data-test='inventory-item'][2]")),
+    # text predicates have no css equivalent
+    ("//button[text()='Remove']", (By.XPATH, "//button[text()='Remove']")),
+    ("//div[contains(., 'Bike')]", (By.XPATH, "//div[contains(., 'Bike')]")),
+    # unions, boolean operators, absolute paths and empty substrings stay xpath
+    ("//button[@name] | //span", (By.XPATH, "//button[@name] | //span")),
+    ("//button[@name='add' or @id='x']", (By.XPATH, "//button[@name='add' or @id='x']")),
+    ("/div/div", (By.XPATH, "/div/div")),
+    ("//button[contains(@id, '')]", (By.XPATH, "//button[contains(@id, '')]")),
+]
+
+
+@pytest.mark.parametrize(
+    "xpath, expected",
+    [
+        ("//a | //b", True),
+        ("//a|//b", True),
+        ("(//a | //b)[1]", False),
+        ("//a[@x='1' or @y='2']", False),
+        ("//a[text()='x | y']", False),
+        ('//a[contains(@class, "|")]', False),
+        ("//a[@x='1'] | //b[@y=\"2\"]", True),
+    ],
+)
+def test_is_union(xpath, expected):
+    assert is_union(xpath) is expected
+
+
+def test_child_xpath():
+    card = Locator("//div[@data-test='inventory-item']")
+    button = card.child("//button")
+    assert button.xpath == "//div[@data-test='inventory-item']//button"
+    assert button.parent is card
+    assert button.path == "//button"
+    assert (button + "[1]").parent is card
+
+
+def test_child_of_union_is_wrapped():
+    parent = Locator("//div[@id='a'] | //div[@id='b']")
+    assert parent.child("/span").xpath == "(//div[@id='a'] | //div[@id='b'])/span"
+
+
+def test_union_child_is_rejected():
+    with pytest.raises(ValueError):
+        Locator("//div").child("//a | //b")
+    with pytest.raises(ValueError):
+        Locator("//div").child("//a") + " | //b"
+
+
+@pytest.mark.parametrize("xpath, expected", COMPILE_CASES)
+def test_compile_xpath(xpath, expected):
+    assert compile_xpath(xpath) == expected
+
+
+@pytest.mark.parametrize("xpath", [xpath for xpath, (by, _) in COMPILE_CASES if by == By.CSS_SELECTOR])
+def test_compiled_css_finds_same_elements(xpath):
+    document = parse_html(PAGE)
+    assert css_select(compile_xpath(xpath)[1], document) == xpath_select(xpath, document)
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("//button[@name]", (By.CSS_SELECTOR, ":scope button[name]")),
+        ("/span", (By.CSS_SELECTOR, ":scope > span")),
+        ("//*[@id='remove-bike-light']", (By.CSS_SELECTOR, ':scope [id="remove-bike-light"]')),
+        ("//button[text()='Remove']", (By.XPATH, ".//button[text()='Remove']")),
+    ],
+)
+def test_compile_relative_xpath(path, expected):
+    assert compile_relative_xpath(path) == expected
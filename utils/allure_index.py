@@ -0,0 +1,427 @@
+"""
+Incremental allure report: finished tests are streamed into the index of the results folder while the run goes on,
+the builder folds only the new index entries into its state and rewrites only the report entries of the tests which got a new result,
+history of the builds is kept in the compact append-only store.
+
+    python -m utils.allure_index update RESULTS_DIR --report-dir DIR [--history-store PATH]
+    python -m utils.allure_index watch RESULTS_DIR --report-dir DIR [--history-store PATH] [--interval 30]
+    python -m utils.allure_index build RESULTS_DIR --report-dir DIR --history-store PATH --build-order N [--report-url URL] [--max-builds 20] [--allure-history]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import shutil
+import signal
+import sys
+import threading
+import typing as t
+from pathlib import Path
+
+import allure_commons
+
+from utils.config import get_config
+
+INDEX_FOLDER = "index"  # subfolder of the results folder, allure generate ignores it
+STATE_FILE = "state.json"
+SUMMARY_FILE = "summary.json"
+STATUSES = ("failed", "broken", "skipped", "passed", "unknown")
+RESULT_FIELDS = ("uuid", "historyId", "fullName", "name", "status", "start", "stop")
+
+logger = logging.getLogger(__name__)
+
+REPORT_PAGE = r"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Test report</title>
+<style>
+body { font-family: sans-serif; margin: 16px; }
+table { border-collapse: collapse; width: 100%; }
+th, td { padding: 4px 8px; border-bottom: 1px solid #eee; text-align: left; }
+tr.test { cursor: pointer; }
+pre { white-space: pre-wrap; background: #f7f7f7; padding: 8px; }
+.passed { color: #2e7d32; } .failed { color: #c62828; } .broken { color: #ef6c00; } .skipped { color: #757575; } .unknown { color: #6a1b9a; }
+</style>
+</head>
+<body>
+<h2 id="summary"></h2>
+<input id="filter" placeholder="Filter tests">
+<table>
+<thead><tr><th>Status</th><th>Test</th><th>Duration, s</th><th>History</th></tr></thead>
+<tbody id="tests"></tbody>
+</table>
+<div id="details"></div>
+<script>
+// data files are scripts calling reportIndex/reportTest, so the report is opened from the file system as well
+function esc(text) { const div = document.createElement("div"); div.textContent = text == null ? "" : String(text); return div.innerHTML; }
+function loadScript(src) { const script = document.createElement("script"); script.src = src + "?" + Date.now(); script.onload = () => script.remove(); document.body.appendChild(script); }
+function duration(test) { return test.start && test.stop ? ((test.stop - test.start) / 1000).toFixed(1) : ""; }
+function attachments(list) { return (list || []).map(item => ` <a href="data/attachments/${encodeURIComponent(item.source)}" target="_blank">[${esc(item.name)}]</a>`).join(""); }
+function steps(list) { return list && list.length ? "<ul>" + list.map(step => `<li><span class="${step.status}">${esc(step.name)}</span>${attachments(step.attachments)}${steps(step.steps)}</li>`).join("") + "</ul>" : ""; }
+function render() {
+  const data = window.reportData, filter = document.getElementById("filter").value.toLowerCase(), statistic = data.summary.statistic;
+  document.getElementById("summary").innerHTML = `${statistic.total} tests: ` + ["failed", "broken", "skipped", "passed", "unknown"].filter(status => statistic[status]).map(status => `<span class="${status}">${statistic[status]} ${status}</span>`).join(", ");
+  document.getElementById("tests").innerHTML = data.tests.filter(test => (test.fullName || test.name || "").toLowerCase().includes(filter)).map(test =>
+    `<tr class="test" onclick="showTest('${test.key}')"><td class="${test.status}">${test.status}</td><td>${esc(test.name)}</td><td>${duration(test)}</td>` +
+    `<td>${test.history.map(([status, build]) => `<span class="${status}" title="${esc(build)}: ${status}">&#9679;</span>`).join("")}</td></tr>`).join("");
+}
+function reportIndex(data) { window.reportData = data; render(); }
+function reportTest(test) {
+  document.getElementById("details").innerHTML = `<h3 class="${test.status}">${esc(test.name)}</h3><div>${esc(test.fullName)}</div>` +
+    (test.message || test.trace ? `<pre>${esc(test.message)}\n${esc(test.trace)}</pre>` : "") + attachments(test.attachments) + steps(test.steps);
+}
+function showTest(key) { location.hash = key; loadScript(`data/tests/${key}.js`); }
+document.getElementById("filter").oninput = render;
+loadScript("data/index.js");
+if (location.hash.length > 1) showTest(location.hash.slice(1));
+setInterval(() => loadScript("data/index.js"), 30000);  // the report is updated while the tests are running
+</script>
+</body>
+</html>
+"""
+
+
+class ResultsIndexWriter:
+    """
+    Allure plugin appending every written test result to the index file of the worker as one compact json line.
+    Lines are written through the line buffer, so the index is complete up to the last finished test.
+    """
+
+    logger = logging.getLogger(__name__)
+    _writer: t.Optional["ResultsIndexWriter"] = None
+
+    def __init__(self, file_path: Path, worker_id: str) -> None:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        self.worker_id = worker_id
+        self.file = file_path.open("a", buffering=1, encoding="utf-8")
+
+    @classmethod
+    def get_options(cls) -> t.Dict[str, t.Any]:
+        return get_config().reporting.get("results_index", None) or {}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return bool(cls.get_options().get("enabled", False))
+
+    @classmethod
+    def start(cls, results_dir: Path, worker_id: str) -> None:
+        cls._writer = cls(results_dir / INDEX_FOLDER / f"{worker_id}.jsonl", worker_id)
+        allure_commons.plugin_manager.register(cls._writer)
+
+    @classmethod
+    def stop(cls) -> None:
+        if cls._writer is None:
+            return
+        allure_commons.plugin_manager.unregister(cls._writer)
+        cls._writer.file.close()
+        cls._writer = None
+
+    @allure_commons.hookimpl
+    def report_result(self, result: t.Any) -> None:
+        entry = {key: getattr(result, key, None) for key in RESULT_FIELDS}
+        entry["status"] = entry["status"] or "unknown"
+        entry["worker"] = self.worker_id
+        try:
+            self.file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        except Exception as e:
+            self.logger.error("Failed to index allure result %s: %s", entry["fullName"], e)
+
+
+class ResultsIndex:
+    """
+    State of the builder: byte offsets of the worker index files it has read and the latest result of every test (historyId).
+    update() reads only the lines appended after the previous call, so it may be called during the run and the final call is cheap.
+    """
+
+    def __init__(self, results_dir: Path) -> None:
+        self.results_dir = Path(results_dir)
+        self.index_dir = self.results_dir / INDEX_FOLDER
+        self.state_path = self.index_dir / STATE_FILE
+        state = json.loads(self.state_path.read_text(encoding="utf-8")) if self.state_path.is_file() else {}
+        self.offsets: t.Dict[str, int] = state.get("offsets", {})
+        self.tests: t.Dict[str, t.Dict[str, t.Any]] = state.get("tests", {})
+
+    def _new_entries(self) -> t.Iterator[t.Dict[str, t.Any]]:
+        for index_file in sorted(self.index_dir.glob("*.jsonl")):
+            with index_file.open("rb") as index:
+                index.seek(self.offsets.get(index_file.name, 0))
+                for line in index:
+                    if not line.endswith(b"\n"):
+                        break  # line is being written, it is read by the next update
+                    self.offsets[index_file.name] = index.tell()
+                    yield json.loads(line)
+
+    def _scanned_entries(self) -> t.Iterator[t.Dict[str, t.Any]]:
+        """Results written without the index writer: every result file is read once"""
+        for result_file in self.results_dir.glob("*-result.json"):
+            if result_file.name in self.offsets:
+                continue
+            self.offsets[result_file.name] = 0
+            result = json.loads(result_file.read_text(encoding="utf-8"))
+            yield {key: result.get(key) for key in RESULT_FIELDS}
+
+    def update(self) -> t.List[str]:
+        """
+        Fold the new entries into the state, the latest result of the test wins (reruns). The state is saved by save()
+        :return: list - historyIds of the tests which got a new result
+        """
+        changed = []
+        entries = self._new_entries() if self.index_dir.is_dir() and any(self.index_dir.glob("*.jsonl")) else self._scanned_entries()
+        for entry in entries:
+            history_id = entry.get("historyId") or entry.get("fullName") or entry["uuid"]
+            test = self.tests.get(history_id)
+            if test and (test["uuid"] == entry["uuid"] or (test.get("start") or 0) > (entry.get("start") or 0)):
+                continue
+            self.tests[history_id] = entry
+            if history_id not in changed:
+                changed.append(history_id)
+        return changed
+
+    def summary(self) -> t.Dict[str, t.Any]:
+        statistic = dict.fromkeys(STATUSES, 0)
+        for test in self.tests.values():
+            statistic[test.get("status") if test.get("status") in statistic else "unknown"] += 1
+        statistic["total"] = len(self.tests)
+        return {"statistic": statistic, "failed": sorted(test["fullName"] for test in self.tests.values() if test.get("status") in ("failed", "broken") and test.get("fullName"))}
+
+    def save(self) -> None:
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        _write_json(self.state_path, {"offsets": self.offsets, "tests": self.tests})
+        _write_json(self.index_dir / SUMMARY_FILE, self.summary())
+
+
+class ReportBuilder:
+    """
+    Static report of the index: index.html with the list of the tests (data/index.js, one compact entry per test)
+    and the details of every test (data/tests/<key>.js, its steps, error and attachments).
+    update() writes the details and copies the attachments only of the changed tests, previously written tests are not touched.
+    """
+
+    def __init__(self, report_dir: Path, results_dir: Path, history: t.Optional[t.Dict[str, t.List[t.List[t.Any]]]] = None) -> None:
+        self.report_dir = Path(report_dir)
+        self.results_dir = Path(results_dir)
+        self.data_dir = self.report_dir / "data"
+        self.history = history or {}
+
+    @staticmethod
+    def test_key(history_id: str) -> str:
+        """File name of the test details, historyId may contain any characters"""
+        return hashlib.md5(history_id.encode("utf-8")).hexdigest()
+
+    def update(self, index: ResultsIndex, changed: t.Iterable[str]) -> int:
+        """
+        Write the details of the changed tests and the list of the tests
+        :param index: ResultsIndex - updated index
+        :param changed: list - historyIds returned by index.update()
+        :return: int - number of the written tests
+        """
+        (self.data_dir / "tests").mkdir(parents=True, exist_ok=True)
+        (self.data_dir / "attachments").mkdir(exist_ok=True)
+        if not (self.report_dir / "index.html").is_file():
+            (self.report_dir / "index.html").write_text(REPORT_PAGE, encoding="utf-8")
+        written = 0
+        for history_id in changed:
+            _write_script(self.data_dir / "tests" / f"{self.test_key(history_id)}.js", "reportTest", self._test_details(index.tests[history_id]))
+            written += 1
+        if written or not (self.data_dir / "index.js").is_file():
+            tests = [
+                {
+                    "key": self.test_key(history_id),
+                    "name": test.get("name"),
+                    "fullName": test.get("fullName"),
+                    "status": test.get("status") or "unknown",
+                    "start": test.get("start"),
+                    "stop": test.get("stop"),
+                    "history": self.history.get(history_id, []),
+                }
+                for history_id, test in index.tests.items()
+            ]
+            tests.sort(key=lambda test: (STATUSES.index(test["status"]) if test["status"] in STATUSES else len(STATUSES), test["fullName"] or ""))
+            _write_script(self.data_dir / "index.js", "reportIndex", {"summary": index.summary(), "tests": tests})
+        return written
+
+    def _test_details(self, entry: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+        result_file = self.results_dir / f"{entry['uuid']}-result.json"
+        result = json.loads(result_file.read_text(encoding="utf-8")) if result_file.is_file() else {}
+        details = {key: result.get(key, entry.get(key)) for key in RESULT_FIELDS}
+        details["message"] = (result.get("statusDetails") or {}).get("message")
+        details["trace"] = (result.get("statusDetails") or {}).get("trace")
+        details["parameters"] = [{"name": parameter.get("name"), "value": parameter.get("value")} for parameter in result.get("parameters", [])]
+        details["attachments"] = self._attachments(result.get("attachments", []))
+        details["steps"] = self._steps(result.get("steps", []))
+        return details
+
+    def _steps(self, steps: t.List[t.Dict[str, t.Any]]) -> t.List[t.Dict[str, t.Any]]:
+        return [
+            {
+                "name": step.get("name"),
+                "status": step.get("status"),
+                "start": step.get("start"),
+                "stop": step.get("stop"),
+                "attachments": self._attachments(step.get("attachments", [])),
+                "steps": self._steps(step.get("steps", [])),
+            }
+            for step in steps
+        ]
+
+    def _attachments(self, attachments: t.List[t.Dict[str, t.Any]]) -> t.List[t.Dict[str, t.Any]]:
+        copied = []
+        for attachment in attachments:
+            source = self.results_dir / attachment["source"]
+            target = self.data_dir / "attachments" / attachment["source"]
+            if not source.is_file():
+                continue
+            if not target.is_file():
+                shutil.copyfile(source, target)
+            copied.append({"name": attachment.get("name"), "source": attachment["source"], "type": attachment.get("type")})
+        return copied
+
+
+class HistoryStore:
+    """
+    Append-only history of the builds: one gzip member with one compact json line per build (its tests statuses and times),
+    appending doesn't rewrite the previous builds. The store is compacted to max_builds when it grows twice as big.
+    The report shows the statuses of the previous builds from it, allure history folder (history.json and history-trend.json)
+    is materialized from it instead of copying the folder of the previous report.
+    """
+
+    def __init__(self, path: Path, max_builds: int = 20) -> None:
+        self.path = Path(path)
+        self.max_builds = max_builds
+
+    def read(self) -> t.List[t.Dict[str, t.Any]]:
+        """Builds of the store, oldest first"""
+        if not self.path.is_file():
+            return []
+        with gzip.open(self.path, "rt", encoding="utf-8") as store:
+            return [json.loads(line) for line in store if line.strip()]
+
+    def append(self, build_order: int, tests: t.Dict[str, t.Dict[str, t.Any]], report_url: str = "") -> None:
+        build = {
+            "buildOrder": build_order,
+            "reportUrl": report_url,
+            "tests": {history_id: [test.get("status") or "unknown", test.get("start"), test.get("stop"), test.get("uuid")] for history_id, test in tests.items()},
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.path, "at", encoding="utf-8") as store:
+            store.write(json.dumps(build, separators=(",", ":")) + "\n")
+        builds = self.read()
+        if len(builds) > self.max_builds * 2:
+            self._rewrite(builds[-self.max_builds :])
+
+    def _rewrite(self, builds: t.List[t.Dict[str, t.Any]]) -> None:
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as store:
+            store.writelines(json.dumps(build, separators=(",", ":")) + "\n" for build in builds)
+        tmp_path.replace(self.path)
+
+    def statuses(self) -> t.Dict[str, t.List[t.List[t.Any]]]:
+        """
+        Statuses of every test in the last max_builds builds, newest first
+        :return: dict - historyId -> list of [status, buildOrder]
+        """
+        statuses: t.Dict[str, t.List[t.List[t.Any]]] = {}
+        for build in self.read()[-self.max_builds :][::-1]:
+            for history_id, (status, *_) in build["tests"].items():
+                statuses.setdefault(history_id, []).append([status, build["buildOrder"]])
+        return statuses
+
+    def materialize(self, history_dir: Path) -> int:
+        """
+        Write allure history of the last max_builds builds to the folder
+        :return: int - number of builds in the history
+        """
+        builds = self.read()[-self.max_builds :][::-1]  # newest first, as allure keeps them
+        history: t.Dict[str, t.Dict[str, t.Any]] = {}
+        trend = []
+        for build in builds:
+            data = dict.fromkeys(STATUSES, 0)
+            for history_id, (status, start, stop, uid) in build["tests"].items():
+                status = status if status in data else "unknown"
+                data[status] += 1
+                test = history.setdefault(history_id, {"statistic": dict.fromkeys((*STATUSES, "total"), 0), "items": []})
+                test["statistic"][status] += 1
+                test["statistic"]["total"] += 1
+                report_url = f"{build['reportUrl'].rstrip('/')}/#testresult/{uid}" if build["reportUrl"] and uid else ""
+                duration = stop - start if start is not None and stop is not None else None
+                test["items"].append({"uid": uid, "reportUrl": report_url, "status": status, "time": {"start": start, "stop": stop, "duration": duration}})
+            data["total"] = len(build["tests"])
+            trend.append({"buildOrder": build["buildOrder"], "reportName": "", "reportUrl": build["reportUrl"], "data": data})
+        history_dir.mkdir(parents=True, exist_ok=True)
+        _write_json(history_dir / "history.json", history)
+        _write_json(history_dir / "history-trend.json", trend)
+        return len(builds)
+
+
+def _write_json(file_path: Path, data: t.Any) -> None:
+    tmp_path = file_path.with_name(file_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+    tmp_path.replace(file_path)
+
+
+def _write_script(file_path: Path, callback: str, data: t.Any) -> None:
+    tmp_path = file_path.with_name(file_path.name + ".tmp")
+    tmp_path.write_text(f"{callback}({json.dumps(data, separators=(',', ':'))});\n", encoding="utf-8")
+    tmp_path.replace(file_path)
+
+
+def update_report(index: ResultsIndex, builder: ReportBuilder) -> int:
+    """
+    Fold the new results into the index and the report, the state is saved after the report is written
+    :return: int - number of the tests which got a new result
+    """
+    changed = index.update()
+    builder.update(index, changed)
+    if changed or not index.state_path.is_file():
+        index.save()
+    return len(changed)
+
+
+def watch(index: ResultsIndex, builder: ReportBuilder, interval: float, stop: threading.Event) -> None:
+    """Update the report every interval seconds until stop is set"""
+    while True:
+        changed = update_report(index, builder)
+        if changed:
+            logger.info("%s tests updated, %s tests in the report", changed, len(index.tests))
+        if stop.wait(interval):
+            return
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["update", "watch", "build"], help="update - fold the new results once, watch - update until terminated, build - final update and history of the build")
+    parser.add_argument("results_dir", type=Path, help="allure results folder (--alluredir of the run)")
+    parser.add_argument("--report-dir", type=Path, required=True, help="folder of the report")
+    parser.add_argument("--history-store", type=Path, help="history store file of the report (required by build)")
+    parser.add_argument("--build-order", type=int, help="order number of the current build in the history (required by build)")
+    parser.add_argument("--report-url", default="", help="public url of the allure report of the build (http...), allure history items link to it")
+    parser.add_argument("--max-builds", type=int, default=20, help="builds kept in the history")
+    parser.add_argument("--interval", type=float, default=30, help="seconds between the updates of watch")
+    parser.add_argument("--allure-history", action="store_true", help="build: write allure history folder of the previous builds to the results folder for allure generate")
+    args = parser.parse_args()
+    if args.command == "build" and (args.history_store is None or args.build_order is None):
+        parser.error("build requires --history-store and --build-order")
+
+    index = ResultsIndex(args.results_dir)
+    store = HistoryStore(args.history_store, args.max_builds) if args.history_store else None
+    builder = ReportBuilder(args.report_dir, args.results_dir, store.statuses() if store else None)
+    if args.command == "watch":
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())  # the update in progress is finished
+        watch(index, builder, args.interval, stop)
+        return 0
+    changed = update_report(index, builder)
+    logger.info("%s tests updated, %s tests in the report %s", changed, len(index.tests), args.report_dir)
+    if args.command == "build":
+        if args.allure_history:
+            builds = store.materialize(args.results_dir / "history")  # previous builds, allure adds the current one itself
+            logger.info("Allure history of %s previous builds written to %s", builds, args.results_dir / "history")
+        store.append(args.build_order, index.tests, args.report_url)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,8 @@ import random
 import string
 import time
 from datetime import datetime
-from typing import Tuple
+from pathlib import Path
+from typing import Optional, Tuple, Union
 
 import definitions
 
@@ -37,6 +38,24 @@ def remove_empty_logs(max_retries: int = 3, retry_delay: int = 1) -> None:
                     logger.error("Failed to delete: %s", file_full_path)
 
 
+def save_test_artifact(node_id: str, name: str, extension: str, content: Union[str, bytes]) -> Optional[Path]:
+    """Save test artifact to the test logs folder (next to the fail screenshot)
+    return: artifact filename.
+    """
+    node_id = node_id.replace("/", "_").replace(":", "_")
+    file_path = definitions.log_dir / node_id / f'{name}_{datetime.today().strftime("%Y-%m-%d_%H_%M_%S")}.{extension}'
+    try:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, bytes):
+            file_path.write_bytes(content)
+        else:
+            file_path.write_text(content, encoding="utf-8")
+        return file_path
+    except Exception as e:
+        logger.error("Exception while saving test artifact: %s", str(e), exc_info=True)
+        return None
+
+
 # contextmanager to manage timeouted actions
 class timeout:
     def __init__(self, timeout: int) -> None:
@@ -52,3 +71,7 @@ class timeout:
     @property
     def expired(self) -> bool:
         return time.time() > self.__expired_after
+
+    @property
+    def remaining(self) -> float:
+        return max(self.__expired_after - time.time(), 0)
@@ -1,4 +1,7 @@
-from dataclasses import dataclass
+import keyword
+import typing as t
+from dataclasses import dataclass, make_dataclass
+from types import MappingProxyType
 
 from _pytest.config import Config as PytestConfig
 from omegaconf import DictConfig, OmegaConf
@@ -6,10 +9,74 @@ from omegaconf import DictConfig, OmegaConf
 import definitions
 
 
+class FrozenSection:
+    """
+    Base of the frozen config sections: read-only attributes with the mapping access of DictConfig (get, [], in, keys, items).
+    Keys which can't be attributes are kept in the read-only mapping of the _extra field
+    """
+
+    __slots__ = ()
+    __dataclass_fields__: t.ClassVar[t.Dict[str, t.Any]]
+    _extra: t.Mapping[str, t.Any]
+
+    def get(self, key: str, default: t.Any = None) -> t.Any:
+        if key in self.__dataclass_fields__ and key != "_extra":
+            return getattr(self, key)
+        return self._extra.get(key, default)
+
+    def __getitem__(self, key: str) -> t.Any:
+        if key in self.__dataclass_fields__ and key != "_extra":
+            return getattr(self, key)
+        return self._extra[key]
+
+    def __contains__(self, key: str) -> bool:
+        return (key in self.__dataclass_fields__ and key != "_extra") or key in self._extra
+
+    def __iter__(self) -> t.Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.__dataclass_fields__) - 1 + len(self._extra)
+
+    def keys(self) -> t.List[str]:
+        return [key for key in self.__dataclass_fields__ if key != "_extra"] + list(self._extra)
+
+    def items(self) -> t.List[t.Tuple[str, t.Any]]:
+        return [(key, self[key]) for key in self.keys()]
+
+
+def _is_field_name(key: t.Any) -> bool:
+    return isinstance(key, str) and key.isidentifier() and not key.startswith("_") and not keyword.iskeyword(key) and not hasattr(FrozenSection, key)
+
+
+def to_frozen(value: t.Any, name: str = "config") -> t.Any:
+    """
+    Immutable copy of the resolved config value: sections become __slots__ dataclasses,
+    sections without keys which could be attributes (url paths, command names) - read-only mappings, lists - tuples
+    """
+    if isinstance(value, dict):
+        frozen = {key: to_frozen(item, f"{name}_{key}" if _is_field_name(key) else name) for key, item in value.items()}
+        fields = {key: item for key, item in frozen.items() if _is_field_name(key)}
+        if frozen and not fields:
+            return MappingProxyType(frozen)
+        section = make_dataclass(
+            "".join(part.capitalize() for part in name.split("_")) + "Section",
+            [*((key, t.Any) for key in fields), ("_extra", t.Mapping[str, t.Any])],
+            bases=(FrozenSection,),
+            frozen=True,
+            slots=True,
+        )
+        return section(**fields, _extra=MappingProxyType({key: item for key, item in frozen.items() if key not in fields}))
+    if isinstance(value, list):
+        return tuple(to_frozen(item, name) for item in value)
+    return value
+
+
 @dataclass
 class Config:
 
     config: DictConfig = OmegaConf.load(definitions.root_path / "config.yaml")
+    frozen: t.Optional[FrozenSection] = None
 
     @classmethod
     def update_config_with_cl_args(cls, config: PytestConfig) -> None:
@@ -17,7 +84,19 @@ class Config:
             cls.config,
             {key.lstrip("-"): value for key, value in OmegaConf.from_cli(config.invocation_params.args).items()},
         )
+        cls.freeze()
+
+    @classmethod
+    def freeze(cls) -> FrozenSection:
+        """Resolve the config into the snapshot read by get_frozen_config, has to be called again after changes of the config"""
+        cls.frozen = to_frozen(OmegaConf.to_container(cls.config, resolve=True))
+        return cls.frozen
 
 
 def get_config() -> DictConfig:
     return Config.config
+
+
+def get_frozen_config() -> FrozenSection:
+    """Resolved snapshot of the config for the hot paths (steps, commands, reports): plain attribute lookups instead of DictConfig ones"""
+    return Config.frozen if Config.frozen is not None else Config.freeze()
@@ -1,6 +1,8 @@
-import collections
+import functools
 import inspect
+import string
 import typing as t
+from collections.abc import Mapping
 
 import six
 
@@ -14,12 +16,105 @@ def represent(item: t.Any) -> str:
         return repr(item)
 
 
-def func_parameters(func: t.Callable[..., t.Any], *args: t.Any, **kwargs: t.Any) -> collections.OrderedDict:
+class Signature:
+    """Argument layout of the function, inspected once (at decoration time) to bind its calls cheaply"""
+
+    __slots__ = ("args", "skip_first", "defaults", "varargs", "kwonlyargs", "kwonlydefaults")
+
+    def __init__(self, func: t.Callable[..., t.Any]) -> None:
+        arg_spec = inspect.getfullargspec(func)
+        self.args = tuple(arg_spec.args)
+        self.skip_first = bool(arg_spec.args) and arg_spec.args[0] in ("cls", "self")
+        self.defaults = dict(zip(arg_spec.args[-len(arg_spec.defaults) :], arg_spec.defaults)) if arg_spec.defaults else {}
+        self.varargs = arg_spec.varargs
+        self.kwonlyargs = tuple(arg_spec.kwonlyargs)
+        self.kwonlydefaults = arg_spec.kwonlydefaults or {}
+
+    def bind(self, args: t.Sequence[t.Any], kwargs: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+        """Parameters by name: positional and keyword-only arguments in order of the signature, then varargs and extra keywords"""
+        parameters = {}
+        for position, name in enumerate(self.args):
+            if position < len(args):
+                parameters[name] = args[position]
+            elif name in kwargs:
+                parameters[name] = kwargs[name]
+            elif name in self.defaults:
+                parameters[name] = self.defaults[name]
+        if self.skip_first:
+            parameters.pop(self.args[0], None)
+        for name in self.kwonlyargs:
+            if name in kwargs:
+                parameters[name] = kwargs[name]
+            elif name in self.kwonlydefaults:
+                parameters[name] = self.kwonlydefaults[name]
+        if self.varargs and len(args) > len(self.args):
+            parameters[self.varargs] = tuple(args[len(self.args) :])
+        for name, value in kwargs.items():
+            if name not in parameters and name not in self.args:
+                parameters[name] = value
+        return parameters
+
+
+@functools.lru_cache(maxsize=1024)
+def signature(func: t.Callable[..., t.Any]) -> Signature:
+    return Signature(func)
+
+
+class LazyParameters(Mapping):
+    """Represented parameters of the call, bound on the first access (allure reads them only if results are collected)"""
+
+    __slots__ = ("_signature", "_args", "_kwargs", "_parameters")
+
+    def __init__(self, signature: Signature, args: t.Sequence[t.Any], kwargs: t.Dict[str, t.Any]) -> None:
+        self._signature = signature
+        self._args = args
+        self._kwargs = kwargs
+        self._parameters: t.Optional[t.Dict[str, str]] = None
+
+    def _bound(self) -> t.Dict[str, str]:
+        if self._parameters is None:
+            self._parameters = {key: represent(value) for key, value in self._signature.bind(self._args, self._kwargs).items()}
+        return self._parameters
+
+    def __getitem__(self, key: str) -> str:
+        return self._bound()[key]
+
+    def __iter__(self) -> t.Iterator[str]:
+        return iter(self._bound())
+
+    def __len__(self) -> int:
+        return len(self._bound())
+
+
+class TitleTemplate:
     """
+    Step title with replacement fields parsed once: positional fields ({}, {0}) get represented arguments,
+    named fields get bound parameters, static titles are not formatted at all
+    """
+
+    __slots__ = ("title", "positional", "named")
+
+    def __init__(self, title: str) -> None:
+        fields = [field.split(".")[0].split("[")[0] for _, field, _, _ in string.Formatter().parse(title) if field is not None]
+        self.title = title
+        self.positional = any(field == "" or field.isdigit() for field in fields)
+        self.named = any(field and not field.isdigit() for field in fields)
+
+    def format(self, signature: Signature, args: t.Sequence[t.Any], kwargs: t.Dict[str, t.Any]) -> str:
+        if not (self.positional or self.named):
+            return self.title
+        f_args = [represent(x) for x in args] if self.positional else ()
+        f_params = signature.bind(args, kwargs) if self.named else {}
+        return self.title.format(*f_args, **f_params)
+
+
+def func_parameters(func: t.Callable[..., t.Any], *args: t.Any, **kwargs: t.Any) -> t.Dict[str, t.Any]:
+    """
+    Parameters of the call by name in order of the signature (self/cls excluded), extra keywords are the last
     >>> def helper(func):
     ...     def wrapper(*args, **kwargs):
     ...         params = func_parameters(func, *args, **kwargs)
-    ...         print(list(params.items()))
+    ...         print([(key, represent(value)) for key, value in params.items()])
     ...         return func(*args, **kwargs)
     ...     return wrapper
 
@@ -148,41 +243,4 @@ def func_parameters(func: t.Callable[..., t.Any], *args: t.Any, **kwargs: t.Any)
     [('a', '1'), ('b', '2')]
 
     """
-    parameters: t.Dict[str, t.Any] = {}
-    arg_spec = inspect.getfullargspec(func)
-
-    arg_order = list(arg_spec.args)
-    arg_order.extend(list(arg_spec.kwonlyargs))
-
-    args_dict = dict(zip(arg_spec.args, args))
-    args_dict.update(dict(zip(arg_spec.kwonlyargs, args)))
-
-    if arg_spec.defaults:
-        kwargs_defaults_dict = dict(zip(arg_spec.args[-len(arg_spec.defaults) :], arg_spec.defaults))
-        parameters.update(kwargs_defaults_dict)
-
-    if arg_spec.varargs:
-        arg_order.append(arg_spec.varargs)
-        varargs = args[len(arg_spec.args) :]
-        parameters.update({arg_spec.varargs: varargs} if varargs else {})
-
-    if arg_spec.args and arg_spec.args[0] in ["cls", "self"]:
-        args_dict.pop(arg_spec.args[0], None)
-
-    if kwargs:
-        arg_order.extend(list(kwargs.keys()))
-        parameters.update(kwargs)
-
-    parameters.update(args_dict)
-
-    if arg_spec.kwonlydefaults:
-        for arg, default in arg_spec.kwonlydefaults.items():
-            if arg not in parameters:
-                parameters[arg] = default
-
-    items = parameters.iteritems() if six.PY2 else parameters.items()
-    # sorted_items = sorted(map(lambda kv: (kv[0], represent(kv[1])), items), key=lambda x: arg_order.index(x[0]))
-    # sorted_items = sorted(map(lambda kv: (kv[0], kv[1]), items), key=lambda x: arg_order.index(x[0]))
-    sorted_items = sorted(((key, value) for key, value in items), key=lambda x: arg_order.index(x[0]))
-
-    return collections.OrderedDict(sorted_items)
+    return signature(func).bind(args, kwargs)
@@ -0,0 +1,107 @@
+import heapq
+import logging
+import queue
+import typing as t
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+
+from utils.config import get_frozen_config
+
+RECORD_MARK = "\x1e"  # starts every record of the worker files: records may span lines (tracebacks, step banners)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Puts records to the queue as they are: message is formatted by the writer thread (in-process queue only)"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class SortableFormatter(logging.Formatter):
+    """Prefixes every record with its creation time, so the worker files could be merged chronologically"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return f"{RECORD_MARK}{record.created:.6f}\t{super().format(record)}"
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """File handler writing through a big buffer: no flush after every record, the buffer is flushed when full and on close"""
+
+    def __init__(self, filename: Path, buffer_size: int) -> None:
+        self.buffer_size = buffer_size
+        super().__init__(filename, mode="w", encoding="utf-8")
+
+    def _open(self) -> t.IO[str]:
+        return Path(self.baseFilename).open(self.mode, buffering=self.buffer_size, encoding=self.encoding, errors=self.errors)
+
+    def flush(self) -> None:
+        pass  # StreamHandler.emit flushes after every record, closing of the stream flushes the buffer
+
+
+class QueueLogging:
+    """
+    Opt-in logging pipeline: the test thread only puts records to the queue (below the configured level records are not created at all),
+    a background listener formats and writes them to the buffered log file of the worker. Files of the workers are merged at session end.
+    """
+
+    _handler: t.Optional[QueueHandler] = None
+    _listener: t.Optional[QueueListener] = None
+
+    @classmethod
+    def get_options(cls) -> t.Dict[str, t.Any]:
+        return get_frozen_config().get("queue_logging", None) or {}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return bool(cls.get_options().get("enabled", False))
+
+    @classmethod
+    def start(cls, file_path: Path, level: t.Union[int, str], fmt: t.Optional[str] = None, datefmt: t.Optional[str] = None) -> None:
+        """
+        Route records of the root logger to the file through the queue
+        :param level: int or str - records below it are not created and not written
+        :param fmt: str - logging format of the records
+        :param datefmt: str - format of asctime
+        """
+        level = logging.getLevelName(level.upper()) if isinstance(level, str) else level
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = BufferedFileHandler(file_path, int(cls.get_options().get("buffer_size", 65536)))
+        file_handler.setFormatter(SortableFormatter(fmt, datefmt))
+        file_handler.setLevel(level)
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        cls._handler = DeferredQueueHandler(log_queue)
+        cls._handler.setLevel(level)
+        cls._listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        cls._listener.start()
+        root_logger = logging.getLogger()
+        root_logger.addHandler(cls._handler)
+        root_logger.setLevel(level)
+
+    @classmethod
+    def stop(cls) -> None:
+        """Write records left in the queue and close the file"""
+        if cls._listener is None:
+            return
+        logging.getLogger().removeHandler(cls._handler)
+        cls._listener.stop()
+        for handler in cls._listener.handlers:
+            handler.close()
+        cls._handler, cls._listener = None, None
+
+    @staticmethod
+    def _read_records(file_path: Path) -> t.Iterator[t.Tuple[float, str, str]]:
+        for chunk in file_path.read_text(encoding="utf-8").split(RECORD_MARK)[1:]:
+            created, _, text = chunk.partition("\t")
+            yield float(created), file_path.stem, text
+
+    @classmethod
+    def merge(cls, folder: Path, file_path: Path) -> t.Optional[Path]:
+        """Merge records of the worker files of the folder chronologically, records are prefixed with the worker id if there are several files"""
+        worker_files = sorted(folder.glob("*.log"))
+        if not worker_files:
+            return None
+        tag_workers = len(worker_files) > 1
+        with Path(file_path).open("w", encoding="utf-8") as merged:
+            for _, worker_id, text in heapq.merge(*(cls._read_records(worker_file) for worker_file in worker_files)):
+                merged.write(f"[{worker_id}] {text}" if tag_workers else text)
+        return file_path
@@ -4,10 +4,12 @@ from datetime import datetime
 from selenium.webdriver.remote.webdriver import WebDriver
 
 import definitions
+from core.time_accounting import TimeAccounting
 
 logger = logging.getLogger(__name__)
 
 
+@TimeAccounting.timed("screenshots")
 def take_screenshot(driver: WebDriver, node_id: str) -> str:
     """Make a screenshot with a name of the test, date and time
     return: screenshot filename.
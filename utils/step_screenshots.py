@@ -0,0 +1,159 @@
+import base64
+import hashlib
+import io
+import logging
+import threading
+import typing as t
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from uuid import uuid4
+
+from allure_commons import plugin_manager
+from allure_commons.model2 import Attachment, ExecutableItem
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from utils.config import get_frozen_config
+
+try:
+    from PIL import Image
+except ImportError:  # optional: perceptual dedupe, downscaling and re-encoding
+    Image = None
+
+FORMATS = {"jpeg": ("image/jpeg", "jpg"), "webp": ("image/webp", "webp"), "png": ("image/png", "png")}
+
+
+def dhash(image: "Image.Image", size: int = 8) -> int:
+    """Difference hash: brightness gradients of the image shrunk to (size + 1) x size"""
+    pixels = list(image.convert("L").resize((size + 1, size), Image.BILINEAR).getdata())
+    bits = 0
+    for row in range(size):
+        for column in range(size):
+            bits = bits << 1 | (pixels[row * (size + 1) + column] > pixels[row * (size + 1) + column + 1])
+    return bits
+
+
+class StepScreenshots:
+    """
+    Step screenshots of screen_each_step: test thread only captures the frame (raw base64 of the screenshot command)
+    and remembers the allure step, decoding, dedupe of the frames equal to the previous one of the test, downscaling,
+    re-encoding and writing of the attachment are done by the background worker. Frames are drained before the test report is written.
+    """
+
+    logger = logging.getLogger(__name__)
+    _executor: t.Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+    _pending: t.Dict[int, t.List[Future]] = {}
+    # per test thread, used by the worker only
+    _last_hash: t.Dict[int, t.Any] = {}
+    _stats: t.Dict[int, t.Dict[str, int]] = {}
+
+    @classmethod
+    def get_options(cls) -> t.Dict[str, t.Any]:
+        return get_frozen_config().reporting.get("step_screenshots", None) or {}
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return bool(cls.get_options().get("enabled", False))
+
+    @classmethod
+    def check_options(cls) -> None:
+        """Warn about the options which have no effect without Pillow"""
+        if Image is not None:
+            return
+        options = cls.get_options()
+        degraded = [
+            name
+            for name, active in (
+                ("format", options.get("format", "jpeg") != "png"),
+                ("max_width", bool(options.get("max_width", 0))),
+                ("max_distance", bool(options.get("max_distance", 0))),
+            )
+            if active
+        ]
+        if degraded:
+            cls.logger.warning("Pillow is not installed: step screenshots are attached as png, without downscaling and perceptual dedupe (ignored options: %s)", degraded)
+
+    @staticmethod
+    def _reporter() -> t.Any:
+        """AllureReporter of the allure listener (there is none if results are not collected)"""
+        for plugin in plugin_manager.get_plugins():
+            if hasattr(plugin, "allure_logger"):
+                return plugin.allure_logger
+        return None
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        # single worker keeps frames of the test in order for dedupe
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="step-screenshots")
+            return cls._executor
+
+    @classmethod
+    def capture(cls, driver: WebDriver, name: str = "step screenshot") -> None:
+        """Take screenshot of the current step and hand it over to the worker"""
+        reporter = cls._reporter()
+        step = reporter.get_last_item(ExecutableItem) if reporter is not None else None
+        if step is None:
+            return  # nothing would show it
+        frame = driver.execute(Command.SCREENSHOT)["value"]
+        key = threading.get_ident()
+        cls._pending.setdefault(key, []).append(cls._get_executor().submit(cls._process, key, frame, step, name))
+
+    @classmethod
+    def _process(cls, key: int, frame: str, step: ExecutableItem, name: str) -> None:
+        options = cls.get_options()
+        stats = cls._stats.setdefault(key, {"captured": 0, "dropped": 0, "attached": 0, "png_bytes": 0, "attached_bytes": 0})
+        png = base64.b64decode(frame)
+        stats["captured"] += 1
+        stats["png_bytes"] += len(png)
+        image = Image.open(io.BytesIO(png)) if Image is not None else None
+        if options.get("dedupe", True):
+            frame_hash = dhash(image) if image is not None else hashlib.blake2b(png, digest_size=16).digest()
+            last_hash = cls._last_hash.get(key)
+            if last_hash is not None and (frame_hash == last_hash if image is None else bin(frame_hash ^ last_hash).count("1") <= int(options.get("max_distance", 0))):
+                stats["dropped"] += 1
+                return
+            cls._last_hash[key] = frame_hash
+        body, (mime_type, extension) = png, FORMATS["png"]
+        if image is not None:
+            body, (mime_type, extension) = cls._encode(image, options), FORMATS[options.get("format", "jpeg")]
+        file_name = f"{uuid4()}-attachment.{extension}"
+        step.attachments.append(Attachment(source=file_name, name=name, type=mime_type))
+        plugin_manager.hook.report_attached_data(body=body, file_name=file_name)
+        stats["attached"] += 1
+        stats["attached_bytes"] += len(body)
+
+    @staticmethod
+    def _encode(image: "Image.Image", options: t.Dict[str, t.Any]) -> bytes:
+        max_width = int(options.get("max_width", 0) or 0)
+        if max_width and image.width > max_width:
+            image = image.resize((max_width, round(image.height * max_width / image.width)), Image.LANCZOS)
+        image_format = options.get("format", "jpeg")
+        if image_format == "jpeg":
+            image = image.convert("RGB")
+        output = io.BytesIO()
+        image.save(output, format=image_format.upper(), quality=int(options.get("quality", 70)), optimize=True)
+        return output.getvalue()
+
+    @classmethod
+    def drain(cls) -> t.Optional[t.Dict[str, int]]:
+        """
+        Wait for the frames of the current thread test to be attached and start dedupe of the next test from scratch
+        :return: dict - stats of the frames: captured, dropped (duplicates), attached, png_bytes and attached_bytes
+        """
+        key = threading.get_ident()
+        pending = cls._pending.pop(key, [])
+        wait(pending)
+        for future in pending:
+            if future.exception() is not None:
+                cls.logger.error("Failed to process step screenshot: %s", future.exception(), exc_info=future.exception())
+        cls._last_hash.pop(key, None)
+        return cls._stats.pop(key, None)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        with cls._executor_lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=True)
+                cls._executor = None